@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+GameAnalytics Backend Benchmark
+Generates reproducible synthetic datasets, starts the API in-process and
+measures every endpoint with a local load generator.
+
+Usage (from the backend directory):
+    python benchmark.py                          # 10k, 100k, 1M and 10M rows
+    python benchmark.py --scales 10000 100000 --requests 100 --concurrency 8
+    python benchmark.py --generator realistic    # analysis pipeline generator
+    python benchmark.py --clustering             # K-means methods vs the exact fit
+
+Results are written as JSON (one file per commit by default) so runs can be
+compared across commits.
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+import numpy as np
+import uvicorn
+
+import main
+from clustering_engine import ClusteringEngine
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Request bodies for POST endpoints; GET endpoints without path parameters need none
+SAMPLE_GAME = {
+    'na_sales': 1.2, 'eu_sales': 0.8, 'jp_sales': 0.3, 'other_sales': 0.2,
+    'critic_score': 82, 'user_score': 7.9, 'year': 2012
+}
+POST_PAYLOADS = {
+    '/api/predict': SAMPLE_GAME,
+    '/api/predict/batch': [SAMPLE_GAME] * 100,
+    '/api/pca/project': [SAMPLE_GAME] * 100,
+    '/api/anomalies/score': [SAMPLE_GAME] * 100,
+    '/api/clusters/assign': [SAMPLE_GAME] * 100,
+}
+
+# GET endpoints with required query or path parameters: request path for a game name of the
+# loaded dataset (the best-selling one)
+GET_PARAMS = {
+    '/api/games/search': lambda name: f"/api/games/search?{urlencode({'q': name[:8]})}",
+    '/api/games/{name:path}/similar': lambda name: f"/api/games/{quote(name, safe='')}/similar",
+}
+
+# K-means variants timed against the exact full-batch fit: (method, warm start from the exact centroids)
+CLUSTERING_VARIANTS = [('full', False), ('elkan', False), ('minibatch', False), ('minibatch', True)]
+
+
+def generate_dataset(generator, n_rows):
+    """Build a seeded synthetic dataset with one of the existing generators"""
+    if generator == 'sample':
+        return main.generate_sample_data(n_rows)
+
+    # The analysis pipeline lives in the repository root as main.py
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.append(root)
+    spec = importlib.util.spec_from_file_location('game_analytics_data_science', os.path.join(root, 'main.py'))
+    analysis = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(analysis)
+
+    analyzer = analysis.GameAnalyticsDataScience()
+    analyzer._generate_realistic_data(n_rows)
+    return analyzer.df
+
+
+def current_rss_mb():
+    """Resident set size of this process (Linux), falling back to peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    divisor = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+def benchmark_targets():
+    """Every route of the app that can be called without parameters or has entries in GET_PARAMS"""
+    targets, skipped = [], []
+    for route in main.app.routes:
+        methods = getattr(route, 'methods', None) or set()
+        path = getattr(route, 'path', '')
+        if 'GET' in methods and path in GET_PARAMS:
+            targets.append(('GET', path, None))
+        elif not path.startswith('/') or '{' in path or path.startswith(('/docs', '/redoc', '/openapi')):
+            skipped.append(path)
+        elif 'GET' in methods:
+            targets.append(('GET', path, None))
+        elif 'POST' in methods and path in POST_PAYLOADS:
+            targets.append(('POST', path, POST_PAYLOADS[path]))
+        else:
+            skipped.append(path)
+    return targets, skipped
+
+
+def start_server():
+    """Run the FastAPI app with uvicorn on a free local port in a background thread"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread, port
+
+
+def run_load(port, method, path, payload, n_requests, concurrency):
+    """Send n_requests split across keep-alive connections and collect latencies"""
+    body = json.dumps(payload) if payload is not None else None
+    headers = {'Content-Type': 'application/json'} if body else {}
+
+    def worker(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                content = response.read()
+                samples.append((time.perf_counter() - start, response.status, len(content)))
+            except (OSError, http.client.HTTPException):
+                # The server drops the connection on unhandled errors; count it and reconnect
+                samples.append((time.perf_counter() - start, 599, 0))
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=600)
+        conn.close()
+        return samples
+
+    shares = [n_requests // concurrency + (1 if i < n_requests % concurrency else 0) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = [sample for batch in pool.map(worker, [s for s in shares if s]) for sample in batch]
+    wall_time = time.perf_counter() - started
+
+    latencies = np.array([sample[0] for sample in samples]) * 1000
+    return {
+        'method': method,
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        'mean_ms': round(float(latencies.mean()), 3),
+        'throughput_rps': round(len(samples) / wall_time, 2),
+        'response_bytes': samples[-1][2],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmark(args):
+    server, thread, port = start_server()
+    targets, skipped = benchmark_targets()
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'generator': args.generator,
+        'requests_per_endpoint': args.requests,
+        'concurrency': args.concurrency,
+        'skipped_endpoints': skipped,
+        'import_seconds': main.warmup.import_seconds,
+        'scales': []
+    }
+
+    try:
+        for n_rows in args.scales:
+            print(f"\n📦 {n_rows:,} rows ({args.generator} generator)")
+            started = time.perf_counter()
+            data = generate_dataset(args.generator, n_rows)
+            generation_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            main.load_and_process_data(data)
+            startup_time = time.perf_counter() - started
+            del data
+            print(f"   generated in {generation_time:.2f}s, models ready in {startup_time:.2f}s")
+
+            scale = {
+                'rows': n_rows,
+                'generation_s': round(generation_time, 3),
+                'startup_s': round(startup_time, 3),
+                'rss_mb': round(current_rss_mb(), 1),
+                'endpoints': {}
+            }
+            name = main.df.loc[main.df['Global_Sales'].idxmax(), 'Name']
+            for method, path, payload in targets:
+                request_path = GET_PARAMS[path](name) if path in GET_PARAMS else path
+                run_load(port, method, request_path, payload, args.warmup, 1)
+                stats = run_load(port, method, request_path, payload, args.requests, args.concurrency)
+                scale['endpoints'][f'{method} {path}'] = stats
+                print(f"   {method:4} {path:28} p50 {stats['p50_ms']:9.2f}ms  "
+                      f"p99 {stats['p99_ms']:9.2f}ms  {stats['throughput_rps']:8.1f} req/s"
+                      f"{'  ⚠️ ' + str(stats['errors']) + ' errors' if stats['errors'] else ''}")
+
+            scale['peak_rss_mb'] = round(peak_rss_mb(), 1)
+            results['scales'].append(scale)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+    output = args.output or os.path.join('benchmark_results', f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {output}")
+    return results
+
+
+def run_clustering_benchmark(args):
+    """Wall time and inertia of every K-means method relative to the exact full-batch fit"""
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'generator': args.generator,
+        'scales': []
+    }
+
+    for n_rows in args.scales:
+        data = generate_dataset(args.generator, n_rows)
+        X = main.StandardScaler().fit_transform(data.reindex(columns=main.FEATURES).fillna(0).to_numpy(dtype=float))
+        del data
+        n_clusters = max(2, min(6, n_rows // 100))
+        print(f"\n📦 {n_rows:,} rows, k={n_clusters}")
+
+        scale = {'rows': n_rows, 'clusters': n_clusters, 'methods': {}}
+        exact = None
+        for method, warm in CLUSTERING_VARIANTS:
+            engine = ClusteringEngine(n_clusters, method=method)
+            engine.fit(X, init=exact.cluster_centers_ if warm else None)
+            if exact is None:
+                exact = engine
+            name = f"{method}{'_warm' if warm else ''}"
+            scale['methods'][name] = stats = {
+                'seconds': round(engine.fit_seconds_, 3),
+                'inertia': engine.inertia_,
+                'iterations': int(engine.n_iter_),
+                'inertia_ratio': round(engine.inertia_ / exact.inertia_, 5),
+                'speedup': round(exact.fit_seconds_ / engine.fit_seconds_, 2)
+            }
+            print(f"   {name:15} {stats['seconds']:8.3f}s  x{stats['speedup']:<6}  "
+                  f"inertia x{stats['inertia_ratio']:.5f}  ({stats['iterations']} iterations)")
+        results['scales'].append(scale)
+
+    output = args.output or os.path.join('benchmark_results', f"clustering-{results['commit']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to: {output}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the GameAnalytics API')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='dataset sizes in rows')
+    parser.add_argument('--generator', choices=['sample', 'realistic'], default='sample',
+                        help="'sample' = backend generate_sample_data, "
+                             "'realistic' = GameAnalyticsDataScience._generate_realistic_data")
+    parser.add_argument('--requests', type=int, default=50, help='measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=3, help='unmeasured requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4, help='parallel client connections')
+    parser.add_argument('--clustering', action='store_true',
+                        help='benchmark the K-means methods against the exact fit instead of the endpoints')
+    parser.add_argument('--output', help='JSON output path (default: benchmark_results/<commit>.json)')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    print("🎮 GameAnalytics Backend Benchmark")
+    print("=" * 40)
+    args = parse_args()
+    if args.clustering:
+        run_clustering_benchmark(args)
+    else:
+        run_benchmark(args)
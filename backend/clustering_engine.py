@@ -0,0 +1,145 @@
+"""
+K-means engine shared by the API and the analysis pipeline.
+
+One interface over three fitting strategies, chosen per call site:
+
+- 'full': exact Lloyd iterations over every row
+- 'elkan': the same exact fit with Elkan's triangle-inequality bounds,
+  which skip most distance computations once the centroids settle
+- 'minibatch': MiniBatchKMeans updates on uniformly drawn batches of rows
+  until the centroids stop moving, so the fit cost does not grow with the
+  rows (only the final assignment pass does); the result is approximate.
+  Batches are drawn here and fed to ``partial_fit``: ``fit`` draws every
+  batch with a weighted choice over all rows, O(n) per step
+
+'auto' uses the exact fit up to MINIBATCH_MIN_ROWS rows and mini-batches
+above. Seeds come from k-means++ run on a random sample of at most
+``init_sample`` rows instead of all of them, or from the centroids of a
+previous run (warm start). Warm-starting from as many centroids as
+clusters fits a single initialization; a previous run with fewer clusters
+is extended with k-means++ seeds, ``n_init`` times.
+"""
+
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+# Above this many rows 'auto' switches to mini-batch k-means
+MINIBATCH_MIN_ROWS = 200_000
+
+# Rows per chunk of the final assignment pass (bounds the n x k distance matrix)
+ASSIGN_CHUNK = 65536
+
+METHODS = ('auto', 'full', 'elkan', 'minibatch')
+
+
+def kmeans_plusplus(X, n_clusters, centers=None, random_state=None):
+    """k-means++ seeds over the rows of ``X``, continuing from ``centers`` when given"""
+    rng = np.random.default_rng(random_state)
+    X = np.asarray(X, dtype=np.float64)
+    seeds = [] if centers is None else list(np.asarray(centers, dtype=np.float64)[:n_clusters])
+    if not seeds:
+        seeds.append(X[rng.integers(len(X))])
+
+    # Squared distance of every row to its nearest seed, updated with each new seed
+    closest = np.full(len(X), np.inf)
+    for seed in seeds:
+        closest = np.minimum(closest, ((X - seed) ** 2).sum(axis=1))
+    while len(seeds) < n_clusters:
+        total = closest.sum()
+        row = rng.choice(len(X), p=closest / total) if total > 0 else rng.integers(len(X))
+        seeds.append(X[row])
+        closest = np.minimum(closest, ((X - X[row]) ** 2).sum(axis=1))
+    return np.array(seeds)
+
+
+class ClusteringEngine:
+    """K-means with a selectable fitting strategy, sampled k-means++ seeding and warm starts"""
+
+    def __init__(self, n_clusters, method='auto', n_init=1, init_sample=10000, batch_size=4096,
+                 max_steps=1000, tol=1e-4, random_state=42):
+        if method not in METHODS:
+            raise ValueError(f"Unknown clustering method: {method}")
+        self.n_clusters = n_clusters
+        self.method = method
+        self.n_init = n_init
+        self.init_sample = init_sample
+        self.batch_size = batch_size
+        self.max_steps = max_steps
+        self.tol = tol
+        self.random_state = random_state
+
+    def resolve_method(self, n_rows):
+        if self.method == 'auto':
+            return 'minibatch' if n_rows > MINIBATCH_MIN_ROWS else 'full'
+        return self.method
+
+    def _seeds(self, X, init, rng):
+        """Initial centroids: k-means++ on a sample, continued from ``init`` when given"""
+        sample = X
+        if len(X) > self.init_sample:
+            sample = X[rng.choice(len(X), self.init_sample, replace=False)]
+        return kmeans_plusplus(sample, self.n_clusters, init, random_state=rng)
+
+    def _fit_exact(self, X, seeds):
+        model = KMeans(n_clusters=self.n_clusters, init=seeds, n_init=1,
+                       algorithm='elkan' if self.method_ == 'elkan' else 'lloyd', random_state=self.random_state).fit(X)
+        return model.cluster_centers_, model.labels_, float(model.inertia_), model.n_iter_
+
+    def _fit_minibatch(self, X, seeds, rng):
+        model = MiniBatchKMeans(n_clusters=self.n_clusters, init=seeds, n_init=1, batch_size=self.batch_size,
+                                random_state=self.random_state)
+        # Stop once a step moves the centroids less than tol x the mean feature variance
+        tolerance = self.tol * X[rng.integers(len(X), size=min(len(X), self.init_sample))].var(axis=0).mean()
+        centers = seeds
+        for step in range(1, self.max_steps + 1):
+            model.partial_fit(X[rng.integers(len(X), size=self.batch_size)])
+            shift = ((model.cluster_centers_ - centers) ** 2).sum()
+            centers = model.cluster_centers_.copy()
+            if shift <= tolerance:
+                break
+        labels, inertia = self._assign(X, centers)
+        return centers, labels, inertia, step
+
+    @staticmethod
+    def _assign(X, centers):
+        """Nearest centroid of every row and the total squared distance, chunk by chunk"""
+        labels = np.empty(len(X), dtype=np.int32)
+        inertia = 0.0
+        center_norms = (centers * centers).sum(axis=1)
+        for start in range(0, len(X), ASSIGN_CHUNK):
+            chunk = X[start:start + ASSIGN_CHUNK]
+            squared = (chunk * chunk).sum(axis=1)[:, None] - 2 * chunk @ centers.T + center_norms
+            nearest = squared.argmin(axis=1)
+            labels[start:start + ASSIGN_CHUNK] = nearest
+            inertia += np.maximum(squared[np.arange(len(chunk)), nearest], 0).sum()
+        return labels, float(inertia)
+
+    def fit(self, X, init=None):
+        """Fit on ``X``; ``init`` are centroids of a previous run to start from"""
+        started = time.perf_counter()
+        X = np.asarray(X, dtype=np.float64)
+        rng = np.random.default_rng(self.random_state)
+        self.method_ = self.resolve_method(len(X))
+
+        # A complete warm start is one initialization; otherwise keep the best of n_init seedings
+        complete = init is not None and len(init) >= self.n_clusters
+        best = None
+        for _ in range(1 if complete else self.n_init):
+            seeds = self._seeds(X, init, rng)
+            fitted = self._fit_minibatch(X, seeds, rng) if self.method_ == 'minibatch' else self._fit_exact(X, seeds)
+            if best is None or fitted[2] < best[2]:
+                best = fitted
+
+        self.cluster_centers_, self.labels_, self.inertia_, self.n_iter_ = best
+        self.warm_started_ = init is not None
+        self.fit_seconds_ = time.perf_counter() - started
+        return self
+
+    def fit_predict(self, X, init=None):
+        return self.fit(X, init).labels_
+
+    def predict(self, X):
+        """Index of the nearest centroid of every row"""
+        return self._assign(np.asarray(X, dtype=np.float64), self.cluster_centers_)[0]
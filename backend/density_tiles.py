@@ -0,0 +1,121 @@
+"""
+Density tiles for scatter charts too large to send point by point.
+
+The chart plane is cut into a quadtree of tiles: zoom level ``z`` has
+``2 ** z`` x ``2 ** z`` tiles of ``bins`` x ``bins`` cells each, so every
+tile has the same size whatever the number of points. Points are binned
+once at the finest level with integer arithmetic and kept as a sparse table
+of non-empty (cell, category) counts; coarser levels are built from that
+table (not from the points) by shifting the cell coordinates, and every
+level is cached after its first use. Cells of one level are sorted by tile,
+so a tile is one ``searchsorted`` slice.
+
+Axes may be binned on a log scale (sales are heavy-tailed). Tile ``(0, 0)``
+is the lower-left corner of the plane.
+"""
+
+import numpy as np
+
+# Cells per tile side and the deepest zoom level (finest grid: bins * 2 ** max_zoom per side)
+TILE_BINS = 64
+MAX_ZOOM = 6
+
+
+class DensityTiles:
+    """Sparse multi-resolution 2D histograms of one scatter, with counts per category"""
+
+    def __init__(self, x, y, category, n_categories, scales=('linear', 'linear'),
+                 bins=TILE_BINS, max_zoom=MAX_ZOOM):
+        self.bins = bins
+        self.max_zoom = max_zoom
+        self.scales = scales
+        self.n_categories = n_categories
+
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        category = np.asarray(category, dtype=np.int64)
+        valid = np.isfinite(x) & np.isfinite(y) & (category >= 0) & (category < n_categories)
+        if scales[0] == 'log':
+            valid &= x > 0
+        if scales[1] == 'log':
+            valid &= y > 0
+        self.points = int(valid.sum())
+
+        u = self._transform(x[valid], scales[0])
+        v = self._transform(y[valid], scales[1])
+        self.extent = [(float(u.min()), float(u.max())) if self.points else (0.0, 1.0),
+                       (float(v.min()), float(v.max())) if self.points else (0.0, 1.0)]
+        # Degenerate axes (one distinct value) get a unit span
+        self.extent = [(lo, hi) if hi > lo else (lo - 0.5, lo + 0.5) for lo, hi in self.extent]
+
+        resolution = bins << max_zoom
+        ix = self._cells(u, self.extent[0], resolution)
+        iy = self._cells(v, self.extent[1], resolution)
+        self._levels = {max_zoom: self._aggregate(ix, iy, category[valid], np.ones(len(ix), np.int64), max_zoom)}
+
+    @staticmethod
+    def _transform(values, scale):
+        return np.log10(values) if scale == 'log' else values
+
+    @staticmethod
+    def _untransform(values, scale):
+        return 10.0 ** values if scale == 'log' else values
+
+    @staticmethod
+    def _cells(values, extent, resolution):
+        lo, hi = extent
+        cells = ((values - lo) * (resolution / (hi - lo))).astype(np.int64)
+        return np.minimum(cells, resolution - 1)
+
+    def _aggregate(self, ix, iy, category, counts, zoom):
+        """Sum counts per (cell, category) and sort the cells by tile"""
+        resolution = self.bins << zoom
+        tiles = 1 << zoom
+        tile = (ix // self.bins) * tiles + iy // self.bins
+        cell = ix * resolution + iy
+        # Sorting by tile first keeps every tile's cells contiguous
+        order_key = tile * resolution * resolution + cell
+        keys, inverse = np.unique(order_key, return_inverse=True)
+        grid = np.bincount(inverse * self.n_categories + category, weights=counts,
+                           minlength=len(keys) * self.n_categories)
+        cells = keys % (resolution * resolution)
+        return {
+            'tile': keys // (resolution * resolution),
+            'ix': cells // resolution,
+            'iy': cells % resolution,
+            'counts': grid.reshape(len(keys), self.n_categories).astype(np.int64)
+        }
+
+    def level(self, zoom):
+        """Sparse cell counts of one zoom level, derived from the next finer level on first use"""
+        if zoom not in self._levels:
+            finer = self.level(zoom + 1)
+            cell_index, category = np.nonzero(finer['counts'])
+            self._levels[zoom] = self._aggregate(
+                finer['ix'][cell_index] >> 1, finer['iy'][cell_index] >> 1, category,
+                finer['counts'][cell_index, category], zoom
+            )
+        return self._levels[zoom]
+
+    def edges(self, zoom, axis, first, count):
+        """Data-unit edges of ``count`` consecutive cells starting at cell ``first``"""
+        lo, hi = self.extent[axis]
+        step = (hi - lo) / (self.bins << zoom)
+        return self._untransform(lo + step * np.arange(first, first + count + 1), self.scales[axis])
+
+    def tile(self, zoom, tx, ty):
+        """Non-empty cells of one tile: cell edges in data units and counts per category"""
+        level = self.level(zoom)
+        tile_id = tx * (1 << zoom) + ty
+        start, stop = np.searchsorted(level['tile'], [tile_id, tile_id + 1])
+        ix = level['ix'][start:stop] - tx * self.bins
+        iy = level['iy'][start:stop] - ty * self.bins
+        counts = level['counts'][start:stop]
+        return {
+            'x_edges': self.edges(zoom, 0, tx * self.bins, self.bins),
+            'y_edges': self.edges(zoom, 1, ty * self.bins, self.bins),
+            'ix': ix,
+            'iy': iy,
+            'counts': counts,
+            'total': counts.sum(axis=1)
+        }
@@ -0,0 +1,173 @@
+"""
+Vectorized inference over every tree of a fitted scikit-learn forest.
+
+Iterating ``forest.estimators_`` in Python to collect one prediction per
+tree costs a full traversal per estimator. ``FlatForest`` packs all trees
+into contiguous node arrays once, then walks every (row, tree) pair of a
+batch in lock-step with NumPy fancy indexing, one step per tree level.
+
+The same flattened layout also scores IsolationForest path lengths, so new
+rows can be flagged as anomalies without a per-estimator loop.
+"""
+
+import numpy as np
+
+
+class FlatForest:
+    """All trees of a fitted forest stored as flat, concatenated node arrays"""
+
+    ARRAYS = ('roots', 'feature', 'threshold', 'left', 'right', 'value', 'n_node_samples', 'is_leaf', 'depth')
+
+    def __init__(self, forest, chunk_size=4096):
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        # Bagging ensembles (IsolationForest) grow each tree on a feature subset
+        tree_features = getattr(forest, 'estimators_features_', [None] * len(trees))
+        node_counts = np.array([tree.node_count for tree in trees])
+
+        self.n_trees = len(trees)
+        self.chunk_size = chunk_size
+        self.roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.intp)
+
+        feature, threshold, left, right, value, n_node_samples = [], [], [], [], [], []
+        for tree, offset, features in zip(trees, self.roots, tree_features):
+            is_leaf = tree.children_left < 0
+            node_ids = np.arange(tree.node_count) + offset
+            tree_feature = np.where(is_leaf, 0, tree.feature)
+            feature.append(tree_feature if features is None else np.asarray(features)[tree_feature])
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            value.append(tree.value[:, 0, 0])
+            n_node_samples.append(tree.n_node_samples)
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.value = np.concatenate(value)
+        self.n_node_samples = np.concatenate(n_node_samples)
+        self.is_leaf = self.left == np.arange(len(self.left))
+        self.depth = self._node_depths()
+
+    def arrays(self):
+        """Node arrays by name, e.g. to publish them to shared memory"""
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def from_arrays(cls, arrays, chunk_size=4096):
+        """Rebuild from ``arrays()`` output without the fitted forest; arrays are not copied"""
+        flat = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(flat, name, arrays[name])
+        flat.n_trees = len(flat.roots)
+        flat.chunk_size = chunk_size
+        return flat
+
+    def _node_depths(self):
+        """Depth of every node, filled level by level from the roots"""
+        depth = np.zeros(len(self.left), dtype=np.intp)
+        frontier, level = self.roots, 0
+        while frontier.size:
+            depth[frontier] = level
+            inner = frontier[~self.is_leaf[frontier]]
+            frontier = np.concatenate([self.left[inner], self.right[inner]])
+            level += 1
+        return depth
+
+    def apply(self, X):
+        """Return the leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        # Trees are grown on float32 inputs, so compare in the same precision
+        X = np.asarray(X, dtype=np.float32)
+        leaves = np.empty((len(X), self.n_trees), dtype=np.intp)
+
+        for start in range(0, len(X), self.chunk_size):
+            X_chunk = X[start:start + self.chunk_size]
+            nodes = np.tile(self.roots, len(X_chunk))
+            rows = np.repeat(np.arange(len(X_chunk)), self.n_trees)
+            active = np.arange(len(nodes))
+
+            # One step per tree level; (row, tree) pairs drop out on reaching a leaf
+            while active.size:
+                current = nodes[active]
+                descending = ~self.is_leaf[current]
+                active, current = active[descending], current[descending]
+                go_left = X_chunk[rows[active], self.feature[current]] <= self.threshold[current]
+                nodes[active] = np.where(go_left, self.left[current], self.right[current])
+
+            leaves[start:start + self.chunk_size] = nodes.reshape(len(X_chunk), self.n_trees)
+
+        return leaves
+
+    def predict_all(self, X):
+        """Per-tree predictions for a batch, shape (n_rows, n_trees)"""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        """Forest mean prediction, identical to ``forest.predict``"""
+        return self.predict_all(X).mean(axis=1)
+
+
+def calibrate_intervals(flat_forest, X_cal, y_cal, coverage=0.9):
+    """
+    Fit a scale factor mapping the spread across trees to interval coverage.
+
+    Uses split-conformal calibration on held-out rows with the tree standard
+    deviation as the normalizer, so ``mean +/- q * std`` covers ``coverage``
+    of unseen targets.
+    """
+    per_tree = flat_forest.predict_all(X_cal)
+    mean = per_tree.mean(axis=1)
+    spread = per_tree.std(axis=1)
+    eps = max(float(np.median(spread)) * 1e-3, 1e-9)
+
+    scores = np.abs(np.asarray(y_cal) - mean) / (spread + eps)
+    level = min(1.0, np.ceil((len(scores) + 1) * coverage) / len(scores))
+    q = float(np.quantile(scores, level))
+
+    return {
+        'coverage': coverage,
+        'scale': q,
+        'eps': eps,
+        'n_calibration': int(len(scores))
+    }
+
+
+def predict_with_intervals(flat_forest, X, calibration):
+    """Mean prediction, tree spread and calibrated interval for every row"""
+    per_tree = flat_forest.predict_all(X)
+    mean = per_tree.mean(axis=1)
+    spread = per_tree.std(axis=1)
+    half_width = calibration['scale'] * (spread + calibration['eps'])
+    tail = (1 - calibration['coverage']) / 2 * 100
+
+    return {
+        'mean': mean,
+        'std': spread,
+        'lower': np.maximum(mean - half_width, 0.0),
+        'upper': mean + half_width,
+        'tree_quantiles': np.percentile(per_tree, [tail, 100 - tail], axis=1)
+    }
+
+
+def average_path_length(n_samples):
+    """Expected path length of an unsuccessful BST search over n_samples points"""
+    n_samples = np.asarray(n_samples, dtype=np.float64)
+    lengths = np.zeros_like(n_samples)
+    lengths[n_samples == 2] = 1.0
+    large = n_samples > 2
+    n = n_samples[large]
+    lengths[large] = 2.0 * (np.log(n - 1.0) + np.euler_gamma) - 2.0 * (n - 1.0) / n
+    return lengths
+
+
+def isolation_scores(flat_forest, X, isolation_forest):
+    """
+    IsolationForest ``decision_function`` computed on the flattened trees.
+
+    Negative values are anomalies, matching the fitted model's threshold.
+    """
+    leaves = flat_forest.apply(X)
+    path_lengths = flat_forest.depth[leaves] + average_path_length(flat_forest.n_node_samples[leaves])
+    normalizer = flat_forest.n_trees * average_path_length([isolation_forest.max_samples_])[0]
+    scores = -(2.0 ** (-path_lengths.sum(axis=1) / normalizer))
+    return scores - isolation_forest.offset_
@@ -1,20 +1,80 @@
+import time
 
-from fastapi import FastAPI
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import json
 from typing import List, Dict, Any
 import uvicorn
 import os
+import copy
+import hashlib
+import pickle
+
+from metrics import MetricsRegistry, MetricsMiddleware, PhaseTimer, timed
+from warmup import Warmup, ReadinessGate
+from response_cache import ResponseCacheMiddleware
+
+# Heavy dependencies are bound by import_dependencies() during the warmup, so in
+# lazy startup mode the server binds before pandas and scikit-learn are loaded
+pd = np = None
+StandardScaler = RandomForestRegressor = IsolationForest = None
+train_test_split = r2_score = mean_absolute_error = None
+FlatForest = calibrate_intervals = predict_with_intervals = isolation_scores = None
+PCAEngine = fingerprint = SharedState = TrendEngine = windowed_aggregates = DensityTiles = NameIndex = None
+TitleDeduplicator = NeighborIndex = tree_state_supported = ClusteringEngine = None
+
+# 'eager' loads data and models at import time, 'lazy' in a background warmup after binding,
+# 'shared' attaches to data and models published by the multi-worker launcher (start.py)
+STARTUP_MODE = os.environ.get('GAMEANALYTICS_STARTUP', 'eager')
+
+# K-means fitting strategy: 'auto' (exact, mini-batch above 200k rows), 'full', 'elkan' or 'minibatch'
+CLUSTERING_METHOD = os.environ.get('GAMEANALYTICS_CLUSTERING', 'auto')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_MODE == 'lazy' and warmup.status == 'pending':
+        warmup.start_background(import_dependencies, load_and_process_data)
+    yield
+
+app = FastAPI(title="GameAnalytics API", version="1.0.0", lifespan=lifespan)
+
+# Prometheus-style metrics, scraped from /metrics
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'gameanalytics_request_duration_seconds', 'Request latency by route, method and status',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+)
+response_size = metrics.histogram(
+    'gameanalytics_response_size_bytes', 'Response body size by route and method',
+    buckets=[256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+)
+requests_in_flight = metrics.gauge('gameanalytics_requests_in_flight', 'Requests currently being served')
+model_latency = metrics.histogram(
+    'gameanalytics_model_predict_seconds', 'Model inference time per call by model',
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5]
+)
+cache_requests = metrics.counter('gameanalytics_cache_requests_total', 'Cache lookups by cache and result (hit/miss)')
+startup_phase = metrics.gauge('gameanalytics_startup_phase_seconds', 'Duration of the last data load by phase')
+dataset_rows = metrics.gauge('gameanalytics_dataset_rows', 'Rows in the loaded dataset')
+import_duration = metrics.gauge('gameanalytics_import_seconds', 'Import time of the app and its heavy dependencies')
+warmup_duration = metrics.gauge('gameanalytics_warmup_seconds', 'Time from warmup start until the service was ready')
+
+warmup = Warmup(import_gauge=import_duration, duration_gauge=warmup_duration)
+
+# Data endpoint responses are cached and pre-compressed once per data version
+app.add_middleware(
+    ResponseCacheMiddleware,
+    version=lambda: (data_version, data_loaded_at),
+    counter=cache_requests,
+)
 
-app = FastAPI(title="GameAnalytics API", version="1.0.0")
+# Data endpoints answer 503 until the models are ready
+app.add_middleware(ReadinessGate, warmup=warmup)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -25,21 +85,118 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing header with the per-request breakdown (off by default)
+SERVER_TIMING = os.environ.get('GAMEANALYTICS_SERVER_TIMING', '0') == '1'
+
+app.add_middleware(
+    MetricsMiddleware,
+    latency=request_latency,
+    response_size=response_size,
+    in_flight=requests_in_flight,
+    server_timing=SERVER_TIMING,
+)
+
 # Global variables for cached data and models
 df = None
-scaler = StandardScaler()
+scaler = None
 kmeans_model = None
 pca_model = None
 rf_model = None
+flat_forest = None
+interval_calibration = None
+prediction_summary = None
+cluster_profiles = None
+anomaly_model = None
+flat_anomaly_forest = None
+ranked_anomalies = None
+trend_tables = None
+name_index = None
+game_names = None
+neighbor_indexes = None
+shared_state = None
+
+# Content hash of the served dataset and when it was loaded (ETag / Last-Modified)
+data_version = None
+data_loaded_at = None
+
+# Aggregates shared by the dashboard sections, rebuilt when the data version changes
+aggregates_cache = None
+
+# Model input features, in the order the scaler and models expect them
+FEATURES = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Critic_Score', 'User_Score', 'Year']
+
+# Fitted models persisted between restarts, keyed by a fingerprint of their inputs
+ARTIFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts')
+
+# Nominal coverage of the prediction intervals returned by the predict endpoints
+PREDICTION_COVERAGE = 0.9
+
+# Entities with precomputed yearly trends (API name -> column) and the forecast horizon in years
+TREND_ENTITIES = {'platform': 'Platform', 'genre': 'Genre', 'publisher': 'Publisher'}
+TREND_HORIZON = 5
+
+# Largest rolling window accepted by the ?window= parameter, in years
+MAX_WINDOW = 20
+
+# Most results returned by /api/games/search
+MAX_SEARCH_RESULTS = 50
+
+# Genres and platforms listed in every cluster profile
+TOP_CLUSTER_CATEGORIES = 3
 
-def load_and_process_data():
-    """Load and preprocess the video game sales data from Kaggle dataset"""
-    global df, scaler, kmeans_model, pca_model, rf_model
+# Most neighbors returned by /api/games/{name}/similar
+MAX_SIMILAR = 50
+
+# Scatter charts served as density tiles: x and y columns and their binning scales, colored by Cluster
+DENSITY_CHARTS = {
+    'sales-score': (('Global_Sales', 'Critic_Score'), ('log', 'linear')),
+    'pca': (('PC1', 'PC2'), ('linear', 'linear'))
+}
+
+def import_dependencies():
+    """Import the scientific stack and the model code, timing each group"""
+    global pd, np, StandardScaler, RandomForestRegressor, IsolationForest
+    global train_test_split, r2_score, mean_absolute_error
+    global FlatForest, calibrate_intervals, predict_with_intervals, isolation_scores, PCAEngine, fingerprint
+    global SharedState, TrendEngine, windowed_aggregates, DensityTiles, NameIndex, TitleDeduplicator, NeighborIndex
+    global tree_state_supported, ClusteringEngine
+    
+    with warmup.import_timer('numpy'):
+        import numpy as np
+    with warmup.import_timer('pandas'):
+        import pandas as pd
+    with warmup.import_timer('sklearn'):
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.ensemble import RandomForestRegressor, IsolationForest
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import r2_score, mean_absolute_error
+    with warmup.import_timer('model_code'):
+        from forest_inference import FlatForest, calibrate_intervals, predict_with_intervals, isolation_scores
+        from pca_engine import PCAEngine, fingerprint
+        from shared_state import SharedState
+        from time_series import TrendEngine, windowed_aggregates
+        from density_tiles import DensityTiles
+        from search_index import NameIndex
+        from title_dedup import TitleDeduplicator
+        from neighbors import NeighborIndex, tree_state_supported
+        from clustering_engine import ClusteringEngine
+
+def load_and_process_data(data: 'pd.DataFrame' = None):
+    """Load and preprocess the video game sales data from Kaggle dataset
+    
+    If ``data`` is given it is used instead of the CSV (benchmarks, tests).
+    """
+    global df, scaler, kmeans_model, pca_model, rf_model, flat_forest, interval_calibration, prediction_summary, cluster_profiles
+    global anomaly_model, flat_anomaly_forest, ranked_anomalies, trend_tables, name_index, game_names, neighbor_indexes
+    global data_version, data_loaded_at
+    phases = PhaseTimer(startup_phase)
     
     # Try to load the actual Kaggle dataset
     csv_path = "vgsales.csv"  # Expected filename from Kaggle
     
-    if os.path.exists(csv_path):
+    if data is not None:
+        df = data.copy()
+    elif os.path.exists(csv_path):
         print("Loading actual Kaggle dataset...")
         df = pd.read_csv(csv_path)
         
@@ -91,39 +248,238 @@ def load_and_process_data():
                 df[col] = 0.0
             else:
                 df[col] = 'Unknown'
+    phases.lap('data_load')
+    
+    # Canonical title of every game, shared by the releases of one game under slightly different names
+    df['Title_ID'] = TitleDeduplicator().fit_transform(df['Name'])
+    phases.lap('title_dedup')
     
     # Prepare features for ML models
-    features = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Critic_Score', 'User_Score', 'Year']
-    X = df[features].fillna(0)
+    X = df[FEATURES].fillna(0)
     y = df['Global_Sales']
     
     # Scale features
-    X_scaled = scaler.fit_transform(X)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X.to_numpy())
+    phases.lap('scaler_fit')
     
-    # Train clustering model
+    # Train clustering model, warm-started from the previous run's centroids when the features are unchanged;
+    # a cold start keeps the best of 10 seedings, like KMeans' default restarts
     optimal_clusters = min(6, len(df) // 100)  # Adjust based on data size
-    kmeans_model = KMeans(n_clusters=optimal_clusters, random_state=42)
-    df['Cluster'] = kmeans_model.fit_predict(X_scaled)
+    kmeans_model = ClusteringEngine(n_clusters=optimal_clusters, method=CLUSTERING_METHOD, n_init=10)
+    features_key = fingerprint(X_scaled)
+    df['Cluster'] = kmeans_model.fit_predict(X_scaled, init=previous_centroids(features_key, optimal_clusters))
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    np.savez(os.path.join(ARTIFACTS_DIR, 'kmeans_centroids.npz'), fingerprint=features_key,
+             centroids=kmeans_model.cluster_centers_)
+    cluster_profiles = build_cluster_profiles()
+    phases.lap('kmeans')
     
-    # Train PCA model
-    pca_model = PCA(n_components=3)
-    pca_features = pca_model.fit_transform(X_scaled)
+    # PCA is fitted once and reused from disk while the scaled features are unchanged
+    pca_model = PCAEngine.load_or_fit(X_scaled, os.path.join(ARTIFACTS_DIR, 'pca.npz'), n_components=3)
+    cache_requests.inc(cache='pca_artifact', result='hit' if pca_model.from_cache_ else 'miss')
+    pca_features = pca_model.projections_
     df['PC1'] = pca_features[:, 0]
     df['PC2'] = pca_features[:, 1]
     df['PC3'] = pca_features[:, 2]
+    phases.lap('pca')
     
     # Train prediction model
-    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
-    rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42)
+    X_train, X_test = X_scaled[train_idx], X_scaled[test_idx]
+    y_train, y_test = y.values[train_idx], y.values[test_idx]
+    rf_model = RandomForestRegressor(n_estimators=100, random_state=42, oob_score=True)
     rf_model.fit(X_train, y_train)
+    phases.lap('random_forest')
+    
+    # Flatten the forest once and calibrate interval width on the held-out split
+    flat_forest = FlatForest(rf_model)
+    interval_calibration = calibrate_intervals(flat_forest, X_test, y_test, coverage=PREDICTION_COVERAGE)
+    
+    # Out-of-sample predictions and metrics, computed once so /api/predictions is a lookup
+    prediction_summary = build_prediction_summary(X_train, X_test, train_idx, test_idx, y_test)
+    phases.lap('prediction_calibration')
+    
+    # Anomaly detector (same setup as the analysis pipeline), persisted between restarts
+    anomaly_model = load_or_fit_model(
+        'isolation_forest', X_scaled,
+        lambda X: IsolationForest(contamination=0.1, random_state=42).fit(X)
+    )
+    flat_anomaly_forest = FlatForest(anomaly_model)
+    df['Anomaly_Score'] = isolation_scores(flat_anomaly_forest, X_scaled, anomaly_model)
+    df['Is_Anomaly'] = df['Anomaly_Score'] < 0
+    ranked_anomalies = df[df['Is_Anomaly']].sort_values('Anomaly_Score')
+    phases.lap('isolation_forest')
+    
+    # KD-trees over the scaled features and the PCA projections for similar-game lookups,
+    # persisted with the models
+    neighbor_indexes = {
+        'features': load_or_fit_model('neighbors_features', X_scaled, NeighborIndex),
+        'pca': load_or_fit_model('neighbors_pca', pca_features, NeighborIndex)
+    }
+    phases.lap('neighbors')
+    
+    # Yearly series, trends and forecasts of every platform, genre and publisher for /api/trends
+    trend_tables = build_trend_tables()
+    phases.lap('trends')
+    
+    # Trigram index over the distinct game names for /api/games/search
+    names = pd.Categorical(df['Name'])
+    game_names = names.categories
+    name_index = NameIndex.build(game_names, names.codes)
+    phases.lap('search_index')
+    data_version, data_loaded_at = dataset_version(df), time.time()
+    dataset_rows.set(len(df))
     
     print(f"📊 Data processed: {len(df)} games, {df['Platform'].nunique()} platforms, {df['Genre'].nunique()} genres")
 
-def generate_sample_data():
+def dataset_version(frame: 'pd.DataFrame') -> str:
+    """Short content hash of every served column, used as the data version"""
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes(), digest_size=8)
+    digest.update(','.join(frame.columns).encode())
+    return digest.hexdigest()
+
+def previous_centroids(key, n_clusters):
+    """Centroids saved by the previous KMeans fit on the same features (fingerprint ``key``), if any"""
+    path = os.path.join(ARTIFACTS_DIR, 'kmeans_centroids.npz')
+    if os.path.exists(path):
+        with np.load(path) as stored:
+            if str(stored['fingerprint']) == key and len(stored['centroids']) == n_clusters:
+                cache_requests.inc(cache='kmeans_warm_start', result='hit')
+                return stored['centroids']
+    # Other data: a cold k-means++ fit, best of the engine's n_init seedings
+    cache_requests.inc(cache='kmeans_warm_start', result='miss')
+    return None
+
+def load_or_fit_model(name, X, fit):
+    """Load a pickled model fitted on the same features, or fit it and persist it"""
+    path = os.path.join(ARTIFACTS_DIR, f'{name}.pkl')
+    key = fingerprint(X)
+    
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            stored = pickle.load(f)
+        if stored['fingerprint'] == key:
+            cache_requests.inc(cache=f'{name}_artifact', result='hit')
+            return stored['model']
+    
+    cache_requests.inc(cache=f'{name}_artifact', result='miss')
+    model = fit(X)
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump({'fingerprint': key, 'model': model}, f)
+    return model
+
+def build_prediction_summary(X_train, X_test, train_idx, test_idx, y_test):
+    """Store out-of-sample predictions for every row and honest model metrics"""
+    y_test_pred = flat_forest.predict(X_test)
+    
+    # Training rows are scored by the trees that did not see them (out-of-bag). sklearn predicts 0
+    # for rows every tree bootstrapped; those are scored by the whole forest instead
+    oob_pred = rf_model.oob_prediction_
+    in_bag = np.zeros((len(rf_model.estimators_), len(X_train)), dtype=bool)
+    for tree, samples in enumerate(rf_model.estimators_samples_):
+        in_bag[tree, samples] = True
+    unscored = in_bag.all(axis=0)
+    if unscored.any():
+        oob_pred = oob_pred.copy()
+        oob_pred[unscored] = flat_forest.predict(X_train[unscored])
+    
+    out_of_sample = np.empty(len(df))
+    out_of_sample[train_idx] = oob_pred
+    out_of_sample[test_idx] = y_test_pred
+    df['Predicted_Sales'] = out_of_sample
+    df['Prediction_Split'] = 'oob'
+    df.iloc[test_idx, df.columns.get_loc('Prediction_Split')] = 'test'
+    
+    # Feature importance
+    importance_data = [
+        {'feature': feature, 'importance': round(importance, 3)}
+        for feature, importance in zip(FEATURES, rf_model.feature_importances_)
+    ]
+    importance_data.sort(key=lambda x: x['importance'], reverse=True)
+    
+    # Model performance on the held-out test split
+    performance_metrics = {
+        'r2_score': round(r2_score(y_test, y_test_pred), 3),
+        'mae': round(mean_absolute_error(y_test, y_test_pred), 3),
+        'mse': round(np.mean((y_test - y_test_pred) ** 2), 3),
+        'oob_r2_score': round(rf_model.oob_score_, 3),
+        'evaluated_on': 'test',
+        'test_size': len(test_idx)
+    }
+    
+    # Prediction vs actual for top games
+    top_games = df.nlargest(min(50, len(df)), 'Global_Sales')
+    prediction_data = [
+        {
+            'name': game['Name'],
+            'actual': round(game['Global_Sales'], 2),
+            'predicted': round(game['Predicted_Sales'], 2),
+            'genre': game['Genre']
+        } for game in top_games[['Name', 'Global_Sales', 'Predicted_Sales', 'Genre']].to_dict('records')
+    ]
+    
+    return {
+        'featureImportance': importance_data,
+        'performanceMetrics': performance_metrics,
+        'predictionData': prediction_data
+    }
+
+def build_cluster_profiles():
+    """Size, centroid in feature units, mean sales and score, top genres and platforms of every cluster"""
+    n_clusters = kmeans_model.n_clusters
+    labels = df['Cluster'].to_numpy()
+    
+    # One grouped pass for the per-cluster sizes and means
+    summary = df.groupby('Cluster').agg(
+        games=('Global_Sales', 'size'),
+        avgSales=('Global_Sales', 'mean'),
+        avgScore=('Critic_Score', 'mean')
+    )
+    centroids = scaler.inverse_transform(kmeans_model.cluster_centers_)
+    
+    def top_categories(column):
+        # Games per (cluster, category) from one bincount over the category codes
+        categorical = pd.Categorical(df[column])
+        n_categories = len(categorical.categories)
+        valid = categorical.codes >= 0
+        table = np.bincount(
+            labels[valid] * n_categories + categorical.codes[valid], minlength=n_clusters * n_categories
+        ).reshape(n_clusters, n_categories)
+        top = np.argsort(-table, axis=1, kind='stable')[:, :TOP_CLUSTER_CATEGORIES]
+        return [
+            [{'name': categorical.categories[code], 'games': int(table[cluster, code])}
+             for code in top[cluster] if table[cluster, code]]
+            for cluster in range(n_clusters)
+        ]
+    
+    top_genres, top_platforms = top_categories('Genre'), top_categories('Platform')
+    return [
+        {
+            'cluster': int(cluster_id),
+            'name': f'Cluster {cluster_id}',
+            'games': int(row['games']),
+            'avgSales': round(float(row['avgSales']), 2),
+            'avgScore': round(float(row['avgScore']), 1),
+            'characteristics': f"Avg score: {row['avgScore']:.1f}",
+            'centroid': {feature: round(float(value), 3) for feature, value in zip(FEATURES, centroids[cluster_id])},
+            'topGenres': top_genres[cluster_id],
+            'topPlatforms': top_platforms[cluster_id]
+        } for cluster_id, row in zip(summary.index, summary.to_dict('records'))
+    ]
+
+def build_trend_tables():
+    """Trends and forecasts for every entity and for total sales, fitted for all columns at once"""
+    engine = TrendEngine(df)
+    tables = {name: engine.trends(column, horizon=TREND_HORIZON) for name, column in TREND_ENTITIES.items()}
+    tables['total'] = engine.total(horizon=TREND_HORIZON)
+    return tables
+
+def generate_sample_data(n_games: int = 1000):
     """Generate sample data as fallback"""
     # ... keep existing sample data generation code the same ...
     np.random.seed(42)
-    n_games = 1000
     
     data = {
         'Name': [f"Game_{i:04d}" for i in range(n_games)],
@@ -142,30 +498,182 @@ def generate_sample_data():
     
     return pd.DataFrame(data)
 
-# Load data on startup
-load_and_process_data()
+warmup.record_import('app', time.perf_counter() - _import_started)
+
+def publish_shared_state(manifest_path=None):
+    """Publish the loaded dataset and model arrays to shared memory for worker processes"""
+    arrays = {'df/__index__': df.index.to_numpy()}
+    categories = {}
+    for column in df.columns:
+        if pd.api.types.is_numeric_dtype(df[column]):
+            arrays[f'df/{column}'] = df[column].to_numpy()
+        else:
+            # Text columns are shared as categorical codes; the labels travel in the manifest
+            categorical = pd.Categorical(df[column])
+            arrays[f'df/{column}'] = categorical.codes
+            categories[column] = categorical.categories
+    
+    arrays.update({f'forest/{name}': array for name, array in flat_forest.arrays().items()})
+    arrays.update({f'anomaly_forest/{name}': array for name, array in flat_anomaly_forest.arrays().items()})
+    arrays.update({f'pca/{name}': array for name, array in pca_model.arrays().items()})
+    arrays.update({f'search/{name}': array for name, array in name_index.arrays().items()})
+    for space, index in neighbor_indexes.items():
+        arrays.update({f'neighbors/{space}/{name}': array for name, array in index.arrays().items()})
+    if not tree_state_supported():
+        print("⚠️ Unknown KDTree state layout, workers will rebuild the neighbor trees")
+    
+    # KMeans labels duplicate df['Cluster'], so the estimator is shipped without them
+    clusterer = copy.copy(kmeans_model)
+    clusterer.labels_ = None
+    
+    objects = {
+        'columns': list(df.columns),
+        'categories': categories,
+        'scaler': scaler,
+        'kmeans': clusterer,
+        'isolation_forest': anomaly_model,
+        'neighbor_states': {space: index.state() for space, index in neighbor_indexes.items()},
+        'pca_fingerprint': pca_model.fingerprint_,
+        'interval_calibration': interval_calibration,
+        'prediction_summary': prediction_summary,
+        'cluster_profiles': cluster_profiles,
+        'trend_tables': trend_tables,
+        'data_version': data_version,
+        'data_loaded_at': data_loaded_at
+    }
+    return SharedState.publish(arrays, objects, manifest_path)
+
+def attach_shared_state(manifest_path: str = None):
+    """Serve the dataset and models published by the launcher, mapped read-only"""
+    global df, scaler, kmeans_model, pca_model, rf_model, flat_forest, interval_calibration, prediction_summary, cluster_profiles
+    global anomaly_model, flat_anomaly_forest, ranked_anomalies, trend_tables, name_index, game_names, neighbor_indexes
+    global shared_state, data_version, data_loaded_at
+    
+    shared_state = SharedState.attach(manifest_path or os.environ['GAMEANALYTICS_SHARED_STATE'])
+    objects = shared_state.objects
+    columns = shared_state.group('df')
+    categories = objects['categories']
+    
+    df = pd.DataFrame({
+        column: pd.Categorical.from_codes(columns[column], categories[column])
+        if column in categories else columns[column]
+        for column in objects['columns']
+    }, index=pd.Index(columns['__index__']), copy=False)
+    
+    scaler = objects['scaler']
+    kmeans_model = objects['kmeans']
+    kmeans_model.labels_ = columns['Cluster']
+    pca_model = PCAEngine.from_arrays(shared_state.group('pca'), input_fingerprint=objects['pca_fingerprint'])
+    # Only the flattened trees are needed to serve predictions
+    rf_model = None
+    flat_forest = FlatForest.from_arrays(shared_state.group('forest'))
+    interval_calibration = objects['interval_calibration']
+    prediction_summary = objects['prediction_summary']
+    cluster_profiles = objects['cluster_profiles']
+    anomaly_model = objects['isolation_forest']
+    flat_anomaly_forest = FlatForest.from_arrays(shared_state.group('anomaly_forest'))
+    ranked_anomalies = df[df['Is_Anomaly']].sort_values('Anomaly_Score')
+    trend_tables = objects['trend_tables']
+    name_index = NameIndex.from_arrays(shared_state.group('search'))
+    game_names = df['Name'].cat.categories
+    neighbor_indexes = {
+        space: NeighborIndex.from_arrays(shared_state.group(f'neighbors/{space}'), state)
+        for space, state in objects['neighbor_states'].items()
+    }
+    data_version, data_loaded_at = objects['data_version'], objects['data_loaded_at']
+    dataset_rows.set(len(df))
+    
+    print(f"🔗 Worker {os.getpid()} attached to shared data: {len(df)} games, "
+          f"{shared_state.nbytes / 2 ** 20:.1f} MB")
+
+# Load data on startup (lazy mode defers this to the background warmup)
+if STARTUP_MODE == 'shared':
+    warmup.run(import_dependencies, attach_shared_state, raise_errors=True)
+elif STARTUP_MODE != 'lazy':
+    warmup.run(import_dependencies, load_and_process_data, raise_errors=True)
+    print(f"⏱️ Imports: {warmup.import_seconds}, ready after {warmup.warmup_seconds}s")
 
 @app.get("/")
 async def root():
     return {"message": "GameAnalytics API is running with Kaggle dataset"}
 
-@app.get("/api/overview")
-async def get_overview_data():
-    """Get data for sales overview charts using real Kaggle data"""
-    
-    # Global sales trend by year
-    yearly_data = df.groupby('Year').agg({
-        'Global_Sales': 'sum',
-        'Name': 'count'
-    }).reset_index()
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once data and models are loaded, 503 while warming up"""
+    return JSONResponse(warmup.report(), status_code=200 if warmup.ready else 503)
+
+def shared_aggregates() -> Dict[str, Any]:
+    """Aggregates reused by several dashboard sections, computed once per data version"""
+    global aggregates_cache
+    if aggregates_cache is None or aggregates_cache['version'] != data_version:
+        # One Year groupby feeds the overview trend, the regional trends and the publisher timeline
+        yearly = df.groupby('Year').agg(
+            globalSales=('Global_Sales', 'sum'),
+            games=('Name', 'count'),
+            NA=('NA_Sales', 'sum'),
+            EU=('EU_Sales', 'sum'),
+            JP=('JP_Sales', 'sum'),
+            Other=('Other_Sales', 'sum')
+        ).sort_index()
+        aggregates_cache = {
+            'version': data_version,
+            'yearly': yearly,
+            'top_games': df.nlargest(10, 'Global_Sales'),
+            'title_releases': np.bincount(df['Title_ID'].to_numpy()),
+            # Category codes of every row for the similar-games filters
+            'genre_codes': pd.Categorical(df['Genre']).codes,
+            'platform_codes': pd.Categorical(df['Platform']).codes,
+            # Windowed aggregates by (series, window), filled on first request
+            'windows': {},
+            # Density tile pyramids by chart, binned on first request
+            'density': {}
+        }
+    return aggregates_cache
+
+def finite(value, digits):
+    """Rounded float, or None where the statistic is undefined (JSON has no NaN)"""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+# Yearly series with windowed aggregates: columns of the shared Year groupby (None: a trends
+# entity) and whether the columns are parts of a whole with a cumulative share
+WINDOWED_SERIES = {
+    'sales': (['globalSales', 'games'], False),
+    'regional': (['NA', 'EU', 'JP', 'Other'], True),
+    **{name: (None, True) for name in TREND_ENTITIES}
+}
+
+def check_window(window):
+    if window is not None and not 1 <= window <= MAX_WINDOW:
+        raise HTTPException(status_code=400, detail=f"window must be between 1 and {MAX_WINDOW} years")
+
+def windowed(shared: Dict[str, Any], series: str, window: int) -> Dict[str, 'pd.DataFrame']:
+    """Rolling mean, YoY change and cumulative totals of one yearly series, cached per data version"""
+    key = (series, window)
+    if key not in shared['windows']:
+        columns, shares = WINDOWED_SERIES[series]
+        frame = trend_tables[series]['series'] if columns is None else shared['yearly'][columns]
+        shared['windows'][key] = windowed_aggregates(frame, window, shares=shares)
+    return shared['windows'][key]
+
+def windowed_records(aggregates: Dict[str, 'pd.DataFrame'], digits: int = 2) -> Dict[str, List[Dict[str, Any]]]:
+    """Each windowed aggregate as chart records ({'year': ..., <series>: value}), None where undefined"""
+    return {
+        name: [
+            {'year': str(year), **{column: finite(value, digits) for column, value in zip(frame.columns, values)}}
+            for year, values in zip(frame.index, frame.to_numpy())
+        ] for name, frame in aggregates.items()
+    }
+
+def overview_section(shared: Dict[str, Any], window: int = None) -> Dict[str, Any]:
+    """Sales overview charts: global sales trend by year and top games"""
+    yearly_data = shared['yearly'][['globalSales', 'games']].reset_index()
     yearly_data.columns = ['year', 'globalSales', 'games']
-    yearly_data = yearly_data.sort_values('year')
     
     # Convert to strings for consistency with frontend
     yearly_data['year'] = yearly_data['year'].astype(str)
     
-    # Top games by sales
-    top_games = df.nlargest(10, 'Global_Sales')[['Name', 'Global_Sales', 'Platform', 'Year']].to_dict('records')
+    top_games = shared['top_games'][['Name', 'Global_Sales', 'Platform', 'Year']].to_dict('records')
     top_games_formatted = [
         {
             'name': game['Name'],
@@ -175,29 +683,22 @@ async def get_overview_data():
         } for game in top_games
     ]
     
-    return {
+    overview = {
         'salesData': yearly_data.to_dict('records'),
         'topGames': top_games_formatted
     }
+    if window:
+        overview['windowed'] = {'window': window, **windowed_records(windowed(shared, 'sales', window))}
+    return overview
 
-@app.get("/api/regional")
-async def get_regional_data():
-    """Get regional analysis data from Kaggle dataset"""
-    
-    # Regional trends by year
-    regional_trends = df.groupby('Year').agg({
-        'NA_Sales': 'sum',
-        'EU_Sales': 'sum',
-        'JP_Sales': 'sum',
-        'Other_Sales': 'sum'
-    }).reset_index()
+def regional_section(shared: Dict[str, Any], window: int = None) -> Dict[str, Any]:
+    """Regional sales trends by year and market share in the latest year"""
+    regional_trends = shared['yearly'][['NA', 'EU', 'JP', 'Other']].reset_index()
     regional_trends.columns = ['year', 'NA', 'EU', 'JP', 'Other']
-    regional_trends = regional_trends.sort_values('year')
     regional_trends['year'] = regional_trends['year'].astype(str)
     
     # Market share for latest year
-    latest_year = df['Year'].max()
-    latest_data = df[df['Year'] == latest_year]
+    latest_data = df[df['Year'] == shared['yearly'].index.max()]
     
     total_na = latest_data['NA_Sales'].sum()
     total_eu = latest_data['EU_Sales'].sum()
@@ -211,16 +712,16 @@ async def get_regional_data():
         {'name': 'Inne', 'value': round(total_other, 2), 'color': '#f59e0b'}
     ]
     
-    return {
+    regional = {
         'regionalData': regional_trends.to_dict('records'),
         'marketShare': market_share
     }
+    if window:
+        regional['windowed'] = {'window': window, **windowed_records(windowed(shared, 'regional', window))}
+    return regional
 
-@app.get("/api/publishers")
-async def get_publisher_data():
-    """Get publisher insights from real data"""
-    
-    # Top publishers by total sales
+def publishers_section(shared: Dict[str, Any]) -> Dict[str, Any]:
+    """Top publishers and the yearly sales of the four largest"""
     top_publishers = df.groupby('Publisher').agg({
         'Global_Sales': 'sum',
         'Name': 'count',
@@ -233,18 +734,19 @@ async def get_publisher_data():
     top_publishers['totalSales'] = top_publishers['totalSales'].round(2)
     top_publishers['avgScore'] = top_publishers['avgScore'].round(1)
     
-    # Publisher evolution over time
-    publisher_evolution = []
-    years = sorted(df['Year'].unique())
+    # Publisher evolution over time: one (Year, Publisher) groupby instead of a scan per year
     top_publisher_names = top_publishers.head(4)['name'].tolist()
+    top_rows = df[df['Publisher'].isin(top_publisher_names)]
+    evolution = (top_rows.groupby(['Year', 'Publisher'])['Global_Sales'].sum()
+                 .unstack(fill_value=0.0)
+                 .reindex(index=shared['yearly'].index, columns=top_publisher_names, fill_value=0.0))
     
-    for year in years:
+    publisher_evolution = []
+    for year, sales in zip(evolution.index, evolution.to_numpy()):
         year_data = {'year': str(year)}
-        year_df = df[df['Year'] == year]
-        for publisher in top_publisher_names:
-            publisher_sales = year_df[year_df['Publisher'] == publisher]['Global_Sales'].sum()
+        for publisher, publisher_sales in zip(top_publisher_names, sales):
             clean_name = publisher.replace(' ', '').replace('.', '').replace('-', '')
-            year_data[clean_name] = round(publisher_sales, 2)
+            year_data[clean_name] = round(float(publisher_sales), 2)
         publisher_evolution.append(year_data)
     
     return {
@@ -252,10 +754,8 @@ async def get_publisher_data():
         'publisherEvolution': publisher_evolution
     }
 
-@app.get("/api/clustering")
-async def get_clustering_data():
-    """Get clustering analysis from real data"""
-    
+def clustering_section(shared: Dict[str, Any]) -> Dict[str, Any]:
+    """Sample of clustered games and per-cluster metrics"""
     cluster_data = []
     for _, row in df.head(100).iterrows():  # Limit for performance
         cluster_data.append({
@@ -267,27 +767,14 @@ async def get_clustering_data():
             'y': round(row['Critic_Score'] / 10, 1)
         })
     
-    # Cluster metrics
-    cluster_metrics = []
-    for cluster_id in range(kmeans_model.n_clusters):
-        cluster_games = df[df['Cluster'] == cluster_id]
-        cluster_metrics.append({
-            'cluster': cluster_id,
-            'name': f'Cluster {cluster_id}',
-            'games': len(cluster_games),
-            'avgSales': round(cluster_games['Global_Sales'].mean(), 2),
-            'characteristics': f'Avg score: {cluster_games["Critic_Score"].mean():.1f}'
-        })
-    
+    # Cluster metrics are the profiles precomputed at train time
     return {
         'clusterData': cluster_data,
-        'clusterMetrics': cluster_metrics
+        'clusterMetrics': cluster_profiles
     }
 
-@app.get("/api/pca")
-async def get_pca_data():
-    """Get PCA visualization from real data"""
-    
+def pca_section(shared: Dict[str, Any]) -> Dict[str, Any]:
+    """Sample of games in PCA space, explained variance and loadings"""
     # Sample data for PCA visualization
     sample_df = df.sample(n=min(200, len(df)), random_state=42)
     
@@ -311,9 +798,8 @@ async def get_pca_data():
     ]
     
     # Feature loadings
-    feature_names = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Critic_Score', 'User_Score', 'Year']
     loadings = []
-    for i, feature in enumerate(feature_names):
+    for i, feature in enumerate(FEATURES):
         loadings.append({
             'feature': feature,
             'pc1': round(pca_model.components_[0][i], 3),
@@ -327,58 +813,96 @@ async def get_pca_data():
         'loadings': loadings
     }
 
+def predictions_section(shared: Dict[str, Any]) -> Dict[str, Any]:
+    """Model metrics and predictions, precomputed out-of-sample at train time"""
+    return prediction_summary
+
+# Dashboard sections in streaming order, each built from the shared aggregates
+# (sections in WINDOWED_SECTIONS also take the ?window= of the request)
+DASHBOARD_SECTIONS = {
+    'overview': overview_section,
+    'regional': regional_section,
+    'publishers': publishers_section,
+    'clustering': clustering_section,
+    'pca': pca_section,
+    'predictions': predictions_section
+}
+WINDOWED_SECTIONS = {'overview', 'regional'}
+
+@app.get("/api/overview")
+async def get_overview_data(window: int = None):
+    """Get data for sales overview charts using real Kaggle data"""
+    check_window(window)
+    return overview_section(shared_aggregates(), window)
+
+@app.get("/api/regional")
+async def get_regional_data(window: int = None):
+    """Get regional analysis data from Kaggle dataset"""
+    check_window(window)
+    return regional_section(shared_aggregates(), window)
+
+@app.get("/api/publishers")
+async def get_publisher_data():
+    """Get publisher insights from real data"""
+    return publishers_section(shared_aggregates())
+
+@app.get("/api/clustering")
+async def get_clustering_data():
+    """Get clustering analysis from real data"""
+    return clustering_section(shared_aggregates())
+
+@app.get("/api/pca")
+async def get_pca_data():
+    """Get PCA visualization from real data"""
+    return pca_section(shared_aggregates())
+
 @app.get("/api/predictions")
 async def get_prediction_data():
     """Get predictive analytics from real data"""
-    
-    # Feature importance
-    feature_names = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales', 'Critic_Score', 'User_Score', 'Year']
-    importance_data = []
-    for i, feature in enumerate(feature_names):
-        importance_data.append({
-            'feature': feature,
-            'importance': round(rf_model.feature_importances_[i], 3)
-        })
-    importance_data.sort(key=lambda x: x['importance'], reverse=True)
-    
-    # Model performance
-    X_features = df[feature_names].fillna(0)
-    X_scaled = scaler.transform(X_features)
-    y_pred = rf_model.predict(X_scaled)
-    
-    performance_metrics = {
-        'r2_score': round(r2_score(df['Global_Sales'], y_pred), 3),
-        'mae': round(mean_absolute_error(df['Global_Sales'], y_pred), 3),
-        'mse': round(np.mean((df['Global_Sales'] - y_pred) ** 2), 3)
-    }
-    
-    # Prediction vs actual for top games
-    sample_size = min(50, len(df))
-    sample_indices = df.nlargest(sample_size, 'Global_Sales').index
-    
-    prediction_data = []
-    for idx in sample_indices:
-        row = df.loc[idx]
-        pred_val = y_pred[df.index.get_loc(idx)]
-        prediction_data.append({
-            'name': row['Name'],
-            'actual': round(row['Global_Sales'], 2),
-            'predicted': round(pred_val, 2),
-            'genre': row['Genre']
+    return predictions_section(shared_aggregates())
+
+def stream_dashboard(sections: List[str], event_stream: bool, window: int = None):
+    """Build the sections one by one and yield each as soon as it is ready"""
+    shared = shared_aggregates()
+    for name in sections:
+        try:
+            builder = DASHBOARD_SECTIONS[name]
+            data = builder(shared, window) if name in WINDOWED_SECTIONS else builder(shared)
+            message = {'section': name, 'data': jsonable_encoder(data)}
+            payload = json.dumps(message, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+        except Exception as exc:
+            # A failing section must not stop the others from rendering
+            message = {'section': name, 'error': f"{type(exc).__name__}: {exc}"}
+            payload = json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+        if event_stream:
+            yield f"event: {'error' if 'error' in message else 'section'}\ndata: {payload}\n\n"
+        else:
+            yield payload + '\n'
+    if event_stream:
+        yield "event: done\ndata: {}\n\n"
+
+@app.get("/api/dashboard")
+async def get_dashboard(format: str = 'ndjson', sections: str = None, window: int = None):
+    """All dashboard sections in one streamed response (NDJSON lines or server-sent events)"""
+    check_window(window)
+    requested = sections.split(',') if sections else list(DASHBOARD_SECTIONS)
+    unknown = [name for name in requested if name not in DASHBOARD_SECTIONS]
+    if unknown or format not in ('ndjson', 'sse'):
+        raise HTTPException(status_code=400, detail={
+            'unknown_sections': unknown, 'sections': list(DASHBOARD_SECTIONS), 'formats': ['ndjson', 'sse']
         })
     
-    return {
-        'featureImportance': importance_data,
-        'performanceMetrics': performance_metrics,
-        'predictionData': prediction_data
-    }
+    # A sync generator is iterated in the threadpool, so building sections does not block the loop
+    event_stream = format == 'sse'
+    return StreamingResponse(
+        stream_dashboard(requested, event_stream, window),
+        media_type='text/event-stream' if event_stream else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Data-Version': data_version}
+    )
 
-@app.post("/api/predict")
-async def predict_sales(game_data: Dict[str, Any]):
-    """Predict sales for new game data"""
-    
-    # Prepare input data
-    input_features = [
+def game_features(game_data: Dict[str, Any]) -> List[float]:
+    """Build the model feature vector for one game, using defaults for missing fields"""
+    return [
         game_data.get('na_sales', 0),
         game_data.get('eu_sales', 0),
         game_data.get('jp_sales', 0),
@@ -387,14 +911,336 @@ async def predict_sales(game_data: Dict[str, Any]):
         game_data.get('user_score', 8.0),
         game_data.get('year', 2023)
     ]
+
+def feature_matrix(games: List[Dict[str, Any]]) -> 'np.ndarray':
+    """Scaled model features of a batch of games, one row per game (0 rows for an empty batch)"""
+    X = np.array([game_features(game) for game in games], dtype=float).reshape(-1, len(FEATURES))
+    # The scaler rejects empty input; an empty batch scores to empty results
+    return scaler.transform(X) if len(X) else X
+
+def score_games(games: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Predict sales with calibrated intervals for a batch of games in one pass"""
+    input_scaled = feature_matrix(games)
+    with timed(model_latency, 'random_forest', model='random_forest'):
+        scored = predict_with_intervals(flat_forest, input_scaled, interval_calibration)
+    
+    return [
+        {
+            'predicted_sales': round(float(scored['mean'][i]), 2),
+            'confidence': interval_calibration['coverage'],
+            'interval': {
+                'lower': round(float(scored['lower'][i]), 2),
+                'upper': round(float(scored['upper'][i]), 2)
+            },
+            'tree_std': round(float(scored['std'][i]), 3),
+            'tree_quantiles': {
+                'lower': round(float(scored['tree_quantiles'][0][i]), 2),
+                'upper': round(float(scored['tree_quantiles'][1][i]), 2)
+            }
+        } for i in range(len(games))
+    ]
+
+@app.post("/api/predict")
+async def predict_sales(game_data: Dict[str, Any]):
+    """Predict sales for new game data"""
+    return score_games([game_data])[0]
+
+@app.post("/api/predict/batch")
+async def predict_sales_batch(games: List[Dict[str, Any]]):
+    """Predict sales with prediction intervals for many games at once"""
+    return {
+        'predictions': score_games(games),
+        'calibration': interval_calibration
+    }
+
+@app.post("/api/pca/project")
+async def project_games(games: List[Dict[str, Any]]):
+    """Project new games onto the fitted principal components"""
+    input_scaled = feature_matrix(games)
+    with timed(model_latency, 'pca', model='pca'):
+        projected = pca_model.transform(input_scaled)
+    
+    return {
+        'projections': [
+            {f'pc{i + 1}': round(float(value), 3) for i, value in enumerate(row)}
+            for row in projected
+        ]
+    }
+
+def nearest_centroids(X, centers):
+    """Index of and Euclidean distance to the nearest center of every row"""
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, one matrix product for the whole batch
+    squared = (X * X).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers * centers).sum(axis=1)
+    nearest = squared.argmin(axis=1)
+    return nearest, np.sqrt(np.maximum(squared[np.arange(len(X)), nearest], 0))
+
+@app.get("/api/clusters")
+async def get_cluster_profiles():
+    """Profile of every cluster: size, centroid in feature units, mean sales, top genres and platforms"""
+    return {'features': FEATURES, 'clusters': cluster_profiles}
+
+@app.post("/api/clusters/assign")
+async def assign_clusters(games: List[Dict[str, Any]]):
+    """Assign new games to the nearest fitted cluster centroid in one vectorized pass"""
+    input_scaled = feature_matrix(games)
+    with timed(model_latency, 'kmeans', model='kmeans'):
+        clusters, distances = nearest_centroids(input_scaled, kmeans_model.cluster_centers_)
+    
+    return {
+        'assignments': [
+            {'cluster': int(cluster), 'distance': round(float(distance), 4)}
+            for cluster, distance in zip(clusters, distances)
+        ]
+    }
+
+@app.get("/api/anomalies")
+async def get_anomalies(limit: int = 20, platform: str = None, genre: str = None,
+                        year_from: int = None, year_to: int = None):
+    """Most anomalous games (lowest Isolation Forest score), optionally filtered"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    anomalies = ranked_anomalies
+    if platform:
+        anomalies = anomalies[anomalies['Platform'] == platform]
+    if genre:
+        anomalies = anomalies[anomalies['Genre'] == genre]
+    if year_from is not None:
+        anomalies = anomalies[anomalies['Year'] >= year_from]
+    if year_to is not None:
+        anomalies = anomalies[anomalies['Year'] <= year_to]
+    
+    top_anomalies = anomalies.head(limit)[['Name', 'Platform', 'Genre', 'Year', 'Global_Sales', 'Anomaly_Score']]
+    
+    return {
+        'totalAnomalies': len(ranked_anomalies),
+        'matchingAnomalies': len(anomalies),
+        'anomalyRate': round(len(ranked_anomalies) / len(df) * 100, 2),
+        'anomalies': [
+            {
+                'name': game['Name'],
+                'platform': game['Platform'],
+                'genre': game['Genre'],
+                'year': int(game['Year']),
+                'sales': round(game['Global_Sales'], 2),
+                'score': round(game['Anomaly_Score'], 4)
+            } for game in top_anomalies.to_dict('records')
+        ]
+    }
+
+@app.post("/api/anomalies/score")
+async def score_anomalies(games: List[Dict[str, Any]]):
+    """Score new games against the fitted Isolation Forest in one vectorized pass"""
+    input_scaled = feature_matrix(games)
+    with timed(model_latency, 'isolation_forest', model='isolation_forest'):
+        scores = isolation_scores(flat_anomaly_forest, input_scaled, anomaly_model)
+    
+    return {
+        'scores': [
+            {'score': round(float(score), 4), 'is_anomaly': bool(score < 0)}
+            for score in scores
+        ]
+    }
+
+# Orderings accepted by /api/trends: column and direction
+TREND_ORDERINGS = {'sales': ('Total_Sales', False), 'growth': ('Slope', False), 'decline': ('Slope', True)}
+
+@app.get("/api/trends")
+async def get_trends(entity: str = 'platform', sort: str = 'sales', limit: int = 10, window: int = None):
+    """Yearly sales, linear trend and forecast per platform, genre or publisher (precomputed at load)
+
+    With ``window`` each entity also gets its rolling mean, YoY change and cumulative share.
+    """
+    check_window(window)
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    if entity not in TREND_ENTITIES or sort not in TREND_ORDERINGS:
+        raise HTTPException(status_code=400, detail={
+            'entities': list(TREND_ENTITIES), 'sort': list(TREND_ORDERINGS)
+        })
+    
+    trends, total = trend_tables[entity], trend_tables['total']
+    column, ascending = TREND_ORDERINGS[sort]
+    table = trends['table'].sort_values(column, ascending=ascending, kind='stable', na_position='last').head(limit)
+    series = trends['series'][table.index].to_numpy()
+    forecast = trends['forecast'][table.index].to_numpy()
+    aggregates = windowed(shared_aggregates(), entity, window) if window else {}
+    
+    response = {
+        'entity': entity,
+        'years': [int(year) for year in trends['series'].index],
+        'forecastYears': [int(year) for year in trends['forecast'].index],
+        'total': {
+            'series': [round(float(value), 2) for value in total['series']],
+            'forecast': [round(float(value), 2) for value in total['forecast']],
+            'slope': finite(total['trend']['slope'], 3),
+            'r': finite(total['trend']['r'], 3),
+            'pValue': finite(total['trend']['p_value'], 6)
+        },
+        'entities': [
+            {
+                'name': name,
+                'totalSales': round(float(row['Total_Sales']), 2),
+                'games': int(row['Games_Count']),
+                'firstYear': int(row['Start_Year']),
+                'lastYear': int(row['End_Year']),
+                'slope': finite(row['Slope'], 3),
+                'intercept': finite(row['Intercept'], 3),
+                'r': finite(row['R'], 3),
+                'pValue': finite(row['P_Value'], 6),
+                'smoothing': {'alpha': float(row['Alpha']), 'beta': float(row['Beta']), 'rmse': finite(row['RMSE'], 3)},
+                'series': [round(float(value), 2) for value in series[:, i]],
+                'forecast': [round(float(value), 2) for value in forecast[:, i]],
+                **({'windowed': {
+                    aggregate: [finite(value, 2) for value in frame[name]] for aggregate, frame in aggregates.items()
+                }} if window else {})
+            } for i, (name, row) in enumerate(table.iterrows())
+        ]
+    }
+    if window:
+        response['window'] = window
+    return response
+
+@app.get("/api/games/search")
+async def search_games(q: str, limit: int = 10):
+    """Games whose name matches ``q``: trigram similarity, names starting with ``q`` first
+
+    Each result is one distinct name with the platforms it was released on and its
+    canonical title (``titleReleases`` counts the releases under every name of the title).
+    """
+    if not 1 <= limit <= MAX_SEARCH_RESULTS:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+    name_ids, scores = name_index.search(q, limit=limit)
+    rows = [name_index.rows(name_id) for name_id in name_ids]
+    games = df.iloc[np.concatenate([np.empty(0, np.int64)] + rows)][
+        ['Name', 'Platform', 'Genre', 'Year', 'Global_Sales', 'Title_ID']
+    ]
+    title_releases = shared_aggregates()['title_releases']
+    
+    results = []
+    start = 0
+    for score, name_rows in zip(scores, rows):
+        releases = games.iloc[start:start + len(name_rows)]
+        start += len(name_rows)
+        results.append({
+            'name': releases['Name'].iat[0],
+            'score': round(float(score), 3),
+            'platforms': sorted(releases['Platform'].astype(str).unique()),
+            'genre': releases['Genre'].iat[0],
+            'firstYear': int(releases['Year'].min()),
+            'totalSales': round(float(releases['Global_Sales'].sum()), 2),
+            'releases': len(releases),
+            'titleId': int(releases['Title_ID'].iat[0]),
+            'titleReleases': int(title_releases[releases['Title_ID'].iat[0]])
+        })
+    return {'query': q, 'results': results}
+
+@app.get("/api/games/{name:path}/similar")
+async def similar_games(name: str, k: int = 10, space: str = 'features', platform: str = None,
+                        same_genre: bool = False, different_platform: bool = False):
+    """Games nearest to ``name`` in the scaled model features (``space=features``) or PCA space
+
+    The reference is the game's best-selling release, or its release on ``platform``. Other
+    releases of the same title are never returned; ``same_genre`` keeps only games of the
+    reference's genre and ``different_platform`` only games on other platforms.
+    """
+    if space not in neighbor_indexes:
+        raise HTTPException(status_code=400, detail={'spaces': list(neighbor_indexes)})
+    if not 1 <= k <= MAX_SIMILAR:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_SIMILAR}")
+    position = game_names.get_indexer([name])[0]
+    if position < 0:
+        suggestions = [game_names[name_id] for name_id in name_index.search(name, limit=5)[0]]
+        raise HTTPException(status_code=404, detail={'message': f"Game '{name}' not found", 'suggestions': suggestions})
+    
+    releases = name_index.rows(position)
+    if platform is not None:
+        releases = releases[(df['Platform'].iloc[releases] == platform).to_numpy()]
+        if not len(releases):
+            raise HTTPException(status_code=404, detail=f"'{name}' was not released on {platform}")
+    reference = releases[np.argmax(df['Global_Sales'].to_numpy()[releases])]
+    
+    shared = shared_aggregates()
+    titles, genres, platforms = df['Title_ID'].to_numpy(), shared['genre_codes'], shared['platform_codes']
+    
+    def keep(rows):
+        kept = titles[rows] != titles[reference]
+        if same_genre:
+            kept &= genres[rows] == genres[reference]
+        if different_platform:
+            kept &= platforms[rows] != platforms[reference]
+        return kept
+    
+    index = neighbor_indexes[space]
+    rows, distances = index.query(index.point(reference), k, keep=keep)
+    columns = ['Name', 'Platform', 'Genre', 'Year', 'Global_Sales', 'Cluster']
+    
+    def game(row):
+        return {
+            'name': row['Name'],
+            'platform': row['Platform'],
+            'genre': row['Genre'],
+            'year': int(row['Year']),
+            'sales': round(float(row['Global_Sales']), 2),
+            'cluster': int(row['Cluster'])
+        }
     
-    # Scale and predict
-    input_scaled = scaler.transform([input_features])
-    prediction = rf_model.predict(input_scaled)[0]
+    return {
+        'game': game(df.iloc[reference][columns]),
+        'space': space,
+        'similar': [
+            {**game(row), 'distance': round(float(distance), 4)}
+            for row, distance in zip(df.iloc[rows][columns].to_dict('records'), distances)
+        ]
+    }
+
+def density_tiles(shared: Dict[str, Any], chart: str) -> 'DensityTiles':
+    """Tile pyramid of one scatter chart over every game, built once per data version"""
+    if chart not in shared['density']:
+        (x, y), scales = DENSITY_CHARTS[chart]
+        shared['density'][chart] = DensityTiles(
+            df[x].to_numpy(), df[y].to_numpy(), df['Cluster'].to_numpy(), kmeans_model.n_clusters, scales=scales
+        )
+    return shared['density'][chart]
+
+@app.get("/api/density")
+async def get_density_tile(chart: str = 'sales-score', zoom: int = 0, x: int = 0, y: int = 0):
+    """Binned point counts per cluster for one tile of a scatter chart, over the full dataset
+
+    Zoom level ``zoom`` splits the chart into 2^zoom x 2^zoom tiles of equal size; ``x`` and
+    ``y`` select the tile, (0, 0) being the lower-left corner.
+    """
+    if chart not in DENSITY_CHARTS:
+        raise HTTPException(status_code=400, detail={'charts': list(DENSITY_CHARTS)})
+    tiles = density_tiles(shared_aggregates(), chart)
+    if not 0 <= zoom <= tiles.max_zoom:
+        raise HTTPException(status_code=400, detail=f"zoom must be between 0 and {tiles.max_zoom}")
+    if not (0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom):
+        raise HTTPException(status_code=400, detail=f"tile x and y must be between 0 and {2 ** zoom - 1} at zoom {zoom}")
     
+    tile = tiles.tile(zoom, x, y)
+    x_edges, y_edges = tile['x_edges'], tile['y_edges']
+    (x_column, y_column), scales = DENSITY_CHARTS[chart]
     return {
-        'predicted_sales': round(prediction, 2),
-        'confidence': 0.85
+        'chart': chart,
+        'axes': {
+            'x': {'column': x_column, 'scale': scales[0], 'range': [float(x_edges[0]), float(x_edges[-1])]},
+            'y': {'column': y_column, 'scale': scales[1], 'range': [float(y_edges[0]), float(y_edges[-1])]}
+        },
+        'zoom': zoom,
+        'tile': {'x': x, 'y': y},
+        'tiles': 2 ** zoom,
+        'bins': tiles.bins,
+        'points': int(tile['total'].sum()),
+        'maxCount': int(tile['total'].max()) if len(tile['total']) else 0,
+        'cells': [
+            {
+                'x0': round(float(x_edges[i]), 4), 'x1': round(float(x_edges[i + 1]), 4),
+                'y0': round(float(y_edges[j]), 4), 'y1': round(float(y_edges[j + 1]), 4),
+                'count': int(total),
+                'cluster': int(np.argmax(counts)),
+                'clusters': counts.tolist()
+            } for i, j, total, counts in zip(tile['ix'], tile['iy'], tile['total'], tile['counts'])
+        ]
     }
 
 @app.get("/api/dataset-info")
@@ -406,9 +1252,16 @@ async def get_dataset_info():
         'platforms': df['Platform'].nunique(),
         'genres': df['Genre'].nunique(),
         'publishers': df['Publisher'].nunique(),
+        'titles': df['Title_ID'].nunique(),
         'total_sales': round(df['Global_Sales'].sum(), 2),
+        'data_version': data_version,
         'data_source': 'Kaggle Video Games Sales Dataset' if os.path.exists('vgsales.csv') else 'Sample Data'
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, model, cache and startup metrics"""
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
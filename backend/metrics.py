@@ -0,0 +1,199 @@
+"""
+Minimal Prometheus-style metrics and request tracing for the API.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format (served on ``/metrics``). ``MetricsMiddleware`` is a plain
+ASGI middleware recording per-route latency, response sizes and in-flight
+requests; it can also emit a ``Server-Timing`` header listing the timed
+sections (model predictions, ...) that ran during the request.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Timed sections of the current request, collected for the Server-Timing header
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{str(value)}"' for key, value in labels)
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(labels)} {value:g}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, buckets):
+        super().__init__(name, documentation)
+        self.buckets = sorted(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, observations = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, observations + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, (counts, total, observations) in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', f'{bound:g}'),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {observations}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {observations}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics in registration order and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation):
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name, documentation):
+        return self._register(Gauge(name, documentation))
+
+    def histogram(self, name, documentation, buckets):
+        return self._register(Histogram(name, documentation, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        return '\n'.join(line for metric in self._metrics for line in metric.render()) + '\n'
+
+
+class PhaseTimer:
+    """Records the time since the previous lap into a gauge labelled by phase"""
+
+    def __init__(self, gauge):
+        self.gauge = gauge
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.gauge.set(now - self._last, phase=phase)
+        self._last = now
+
+
+@contextmanager
+def timed(histogram, name, **labels):
+    """Observe the duration of a block and add it to the request's Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.observe(elapsed, **labels)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, size and concurrency per route"""
+
+    def __init__(self, app, latency, response_size, in_flight, server_timing=False):
+        self.app = app
+        self.latency = latency
+        self.response_size = response_size
+        self.in_flight = in_flight
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {'code': 500, 'bytes': 0}
+        timings = []
+        token = _request_timings.set(timings)
+        self.in_flight.inc()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                if self.server_timing:
+                    entries = [f"{name};dur={elapsed * 1000:.2f}" for name, elapsed in timings]
+                    entries.append(f"app;dur={(time.perf_counter() - start) * 1000:.2f}")
+                    message.setdefault('headers', [])
+                    message['headers'] = list(message['headers']) + [
+                        (b'server-timing', ', '.join(entries).encode('latin-1'))
+                    ]
+            elif message['type'] == 'http.response.body':
+                status['bytes'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep label cardinality bounded
+            route = scope.get('route')
+            path = getattr(route, 'path', 'unmatched')
+            labels = {'method': scope['method'], 'route': path}
+            self.latency.observe(time.perf_counter() - start, status=str(status['code']), **labels)
+            self.response_size.observe(status['bytes'], **labels)
+            self.in_flight.dec()
+            _request_timings.reset(token)
@@ -0,0 +1,103 @@
+"""
+Nearest-neighbor lookups of games in a feature space.
+
+A KD-tree is built once over every game (scaled model features or PCA
+projections, a few dimensions each), so a query visits O(log n) nodes
+instead of computing the distance to every game. Filters (same genre,
+other platform, ...) are applied to over-fetched neighbors: the tree is
+asked for several times ``k`` candidates and the request widens until
+``k`` of them pass or every game has been considered.
+
+Worker processes share a tree instead of unpickling their own copy: its
+arrays (the indexed points, their order and the node data and bounds) are
+published like the other model arrays, and ``from_arrays`` rebuilds the
+tree around the shared views. That goes through KDTree's pickled state,
+which is not a public interface: its layout is checked against a probe
+tree first, and with any other layout each worker builds its own tree
+over the shared points instead.
+"""
+
+import functools
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+# Candidates fetched per requested neighbor, multiplied on every widening
+OVERFETCH = 4
+
+LEAF_SIZE = 40
+
+# KDTree state layout the shared trees are rebuilt from: the get_arrays() arrays in this order and
+# kind (node data with these fields), then the leaf size, six counters, the metric and sample weights
+TREE_ARRAYS = ('data', 'idx_array', 'node_data', 'node_bounds')
+TREE_ARRAY_KINDS = ('f', 'i', 'V', 'f')
+NODE_FIELDS = ('idx_start', 'idx_end', 'is_leaf', 'radius')
+TREE_STATE_LENGTH = 13
+
+
+@functools.lru_cache(maxsize=None)
+def tree_state_supported():
+    """Whether the installed KDTree's pickled state has the layout ``from_arrays`` relies on"""
+    probe = KDTree(np.arange(8, dtype=np.float64).reshape(4, 2), leaf_size=3)
+    state, arrays = probe.__getstate__(), probe.get_arrays()
+    return (
+        isinstance(state, tuple) and len(state) == TREE_STATE_LENGTH
+        and all(isinstance(array, np.ndarray) and np.shares_memory(array, shared) and array.shape == shared.shape
+                for array, shared in zip(state, arrays))
+        and tuple(array.dtype.kind for array in arrays) == TREE_ARRAY_KINDS
+        and arrays[2].dtype.names == NODE_FIELDS
+        and state[len(TREE_ARRAYS)] == 3 and state[-1] is None
+    )
+
+
+class NeighborIndex:
+    """KD-tree over the rows of a feature matrix"""
+
+    def __init__(self, X, leaf_size=LEAF_SIZE):
+        self.tree = KDTree(np.asarray(X, dtype=np.float64), leaf_size=leaf_size)
+        self.n_rows = len(X)
+
+    def arrays(self):
+        """Tree arrays by name, for sharing between processes"""
+        return dict(zip(TREE_ARRAYS, self.tree.get_arrays()))
+
+    def state(self):
+        """The rest of the tree's state: leaf size, counters and distance metric (small, picklable)
+
+        None when the installed KDTree's state has an unknown layout.
+        """
+        if not tree_state_supported():
+            return None
+        return self.tree.__getstate__()[len(TREE_ARRAYS):]
+
+    @classmethod
+    def from_arrays(cls, arrays, state, leaf_size=LEAF_SIZE):
+        """Rebuild an index from ``arrays()`` and ``state()`` output; arrays are not copied
+
+        Without a usable state the tree is built again over the shared points.
+        """
+        if state is None or not tree_state_supported():
+            return cls(arrays['data'], leaf_size=leaf_size)
+        index = cls.__new__(cls)
+        index.tree = KDTree.__new__(KDTree)
+        index.tree.__setstate__(tuple(arrays[name] for name in TREE_ARRAYS) + tuple(state))
+        index.n_rows = len(arrays['data'])
+        return index
+
+    def point(self, row):
+        """Coordinates of one indexed row"""
+        return np.asarray(self.tree.get_arrays()[0][row])
+
+    def query(self, point, k, keep=None):
+        """Rows and distances of the ``k`` nearest rows to ``point`` for which ``keep(rows)`` holds"""
+        point = np.asarray(point, dtype=np.float64).reshape(1, -1)
+        fetch = k
+        while True:
+            fetch = min(fetch * OVERFETCH, self.n_rows)
+            distances, rows = self.tree.query(point, k=fetch)
+            distances, rows = distances[0], rows[0]
+            if keep is not None:
+                kept = keep(rows)
+                distances, rows = distances[kept], rows[kept]
+            if len(rows) >= k or fetch == self.n_rows:
+                return rows[:k], distances[:k]
@@ -0,0 +1,174 @@
+"""
+Single-fit PCA engine shared by the API and the analysis pipeline.
+
+The decomposition is computed once and every truncated view (3 components
+for charts, enough components for 90% variance, ...) is derived from it
+instead of refitting. Two fitting strategies:
+
+- 'covariance': one streaming pass that accumulates the feature means and
+  the scatter matrix of the centred chunks, then eigendecomposes the d x d
+  covariance.
+  Exact, memory O(d^2), ideal for the narrow feature matrices used here.
+- 'randomized': randomized SVD for wide matrices when only the leading
+  components are needed.
+
+Fitted components and projections can be persisted to an ``.npz`` file and
+reloaded when the input fingerprint matches, so restarts skip the fit.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+from sklearn.utils.extmath import randomized_svd
+
+
+def fingerprint(X):
+    """Stable content hash of a feature matrix"""
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    digest = hashlib.blake2b(X.tobytes(), digest_size=16)
+    digest.update(repr(X.shape).encode())
+    return digest.hexdigest()
+
+
+class PCAEngine:
+    """PCA fitted once, with cached projections and truncated views"""
+
+    def __init__(self, n_components=None, method='auto', chunk_size=65536, random_state=42):
+        self.n_components = n_components
+        self.method = method
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+        self.projections_ = None
+        self.fingerprint_ = None
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        method = self.method
+        if method == 'auto':
+            method = 'covariance' if X.shape[1] <= 500 or self.n_components is None else 'randomized'
+
+        if method == 'covariance':
+            self._fit_covariance(X)
+        elif method == 'randomized':
+            self._fit_randomized(X)
+        else:
+            raise ValueError(f"Unknown PCA method: {method}")
+
+        # Deterministic signs: the largest absolute loading of each component is positive. That is
+        # sklearn's convention from 1.5 on; the pinned 1.3 flips by the projections (U), so signs
+        # of individual components can differ from its PCA
+        signs = np.sign(self.components_[np.arange(len(self.components_)),
+                                         np.argmax(np.abs(self.components_), axis=1)])
+        self.components_ *= signs[:, None]
+        self.fingerprint_ = fingerprint(X)
+        return self
+
+    def _fit_covariance(self, X):
+        n, d = X.shape
+        seen = 0
+        mean = np.zeros(d)
+        scatter = np.zeros((d, d))
+        for start in range(0, n, self.chunk_size):
+            chunk = X[start:start + self.chunk_size]
+            # Each chunk is centred on its own mean and merged with the running mean and scatter
+            # (Chan et al.), so large feature means do not cancel out of X^T X - n mu mu^T
+            chunk_mean = chunk.mean(axis=0)
+            centered = chunk - chunk_mean
+            delta = chunk_mean - mean
+            merged = seen + len(chunk)
+            scatter += centered.T @ centered + np.outer(delta, delta) * (seen * len(chunk) / merged)
+            mean += delta * (len(chunk) / merged)
+            seen = merged
+
+        self.mean_ = mean
+        covariance = scatter / max(n - 1, 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1]
+        eigenvalues = np.maximum(eigenvalues[order], 0)
+
+        k = self.n_components or d
+        self.components_ = eigenvectors[:, order[:k]].T.copy()
+        self.explained_variance_ = eigenvalues[:k]
+        self.explained_variance_ratio_ = eigenvalues[:k] / eigenvalues.sum()
+
+    def _fit_randomized(self, X):
+        n = len(X)
+        self.mean_ = X.mean(axis=0)
+        centered = X - self.mean_
+        _, singular_values, vt = randomized_svd(centered, self.n_components,
+                                                random_state=self.random_state)
+        total_variance = (centered ** 2).sum() / max(n - 1, 1)
+        self.components_ = vt
+        self.explained_variance_ = singular_values ** 2 / max(n - 1, 1)
+        self.explained_variance_ratio_ = self.explained_variance_ / total_variance
+
+    @property
+    def n_components_(self):
+        return len(self.components_)
+
+    def n_components_for(self, variance):
+        """Smallest number of components explaining at least ``variance``"""
+        cumulative = np.cumsum(self.explained_variance_ratio_)
+        return int(min(np.searchsorted(cumulative, variance) + 1, len(cumulative)))
+
+    def transform(self, X, n_components=None):
+        """Project rows onto the leading ``n_components`` components"""
+        components = self.components_[:n_components or self.n_components_]
+        return (np.asarray(X, dtype=np.float64) - self.mean_) @ components.T
+
+    def fit_transform(self, X, n_components=None):
+        """Fit once and cache the projections of the training rows"""
+        self.fit(X)
+        self.projections_ = self.transform(X)
+        return self.projections_[:, :n_components or self.n_components_]
+
+    def arrays(self):
+        """Fitted arrays by name (the layout of the saved ``.npz``)"""
+        return {
+            'mean': self.mean_,
+            'components': self.components_,
+            'explained_variance': self.explained_variance_,
+            'explained_variance_ratio': self.explained_variance_ratio_,
+            'projections': self.projections_ if self.projections_ is not None else np.empty((0, 0))
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, input_fingerprint=None):
+        """Rebuild a fitted engine from ``arrays()`` output; arrays are not copied"""
+        engine = cls(n_components=len(arrays['components']))
+        engine.mean_ = arrays['mean']
+        engine.components_ = arrays['components']
+        engine.explained_variance_ = arrays['explained_variance']
+        engine.explained_variance_ratio_ = arrays['explained_variance_ratio']
+        engine.projections_ = arrays['projections'] if arrays['projections'].size else None
+        engine.fingerprint_ = input_fingerprint
+        return engine
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez(path, fingerprint=self.fingerprint_, **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        stored = np.load(path)
+        return cls.from_arrays({name: stored[name] for name in stored.files},
+                               input_fingerprint=str(stored['fingerprint']))
+
+    @classmethod
+    def load_or_fit(cls, X, path, **params):
+        """Reuse persisted components and projections when X is unchanged"""
+        if path and os.path.exists(path):
+            engine = cls.load(path)
+            wanted = params.get('n_components') or np.shape(X)[1]
+            if (engine.fingerprint_ == fingerprint(X) and engine.projections_ is not None
+                    and engine.n_components_ >= wanted):
+                engine.from_cache_ = True
+                return engine
+
+        engine = cls(**params)
+        engine.fit_transform(X)
+        engine.from_cache_ = False
+        if path:
+            engine.save(path)
+        return engine
@@ -0,0 +1,225 @@
+"""
+Pre-compressed, revalidatable responses for the data endpoints.
+
+Every ``GET /api/*`` response depends only on the loaded dataset, so its
+JSON body is rendered once per data version and stored together with its
+gzip, zstd and brotli encodings (zstd and brotli when the optional
+``zstandard`` / ``brotli`` packages are installed). Repeat requests are
+served straight from the cache with the best encoding the client accepts.
+
+Responses carry an ETag and Last-Modified so browsers can revalidate with
+``If-None-Match`` / ``If-Modified-Since`` and get an empty 304. URLs pinned
+to the current data version with ``?v=<version>`` are cacheable forever;
+other URLs must be revalidated (``no-cache``), which is a cheap 304 while
+the data is unchanged.
+"""
+
+import functools
+import gzip
+import hashlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+ENCODERS = OrderedDict()
+if zstandard is not None:
+    ENCODERS['zstd'] = zstandard.ZstdCompressor(level=10).compress
+if brotli is not None:
+    ENCODERS['br'] = functools.partial(brotli.compress, quality=9)
+ENCODERS['gzip'] = functools.partial(gzip.compress, compresslevel=6, mtime=0)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+IMMUTABLE = b'public, max-age=31536000, immutable'
+REVALIDATE = b'no-cache'
+
+
+def parse_accept_encoding(header):
+    """Map of accepted content codings to their q-values"""
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(header, available):
+    """Best available encoding for an Accept-Encoding header, or None for identity"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for name in available:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CachedResponse:
+    """One rendered JSON body and its compressed encodings"""
+
+    def __init__(self, body, content_type, route):
+        self.route = route
+        self.content_type = content_type
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.bodies = {None: body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            for name, encode in ENCODERS.items():
+                compressed = encode(body)
+                if len(compressed) < len(body):
+                    self.bodies[name] = compressed
+
+    def etag_for(self, encoding):
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+    def match(self, if_none_match):
+        """The validator in If-None-Match naming this body in one of its encodings (``*`` for any), or None"""
+        issued = {self.etag_for(name) for name in self.bodies}
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return tag
+            tag = '"' + tag.removeprefix('W/').strip('"') + '"'
+            if tag in issued:
+                return tag
+        return None
+
+
+class ResponseCacheMiddleware:
+    """ASGI middleware caching, compressing and revalidating GET responses"""
+
+    def __init__(self, app, version, prefixes=('/api/',), max_entries=256, counter=None):
+        self.app = app
+        # Callable returning (data version, time the data was loaded as a UNIX timestamp)
+        self.version = version
+        self.prefixes = tuple(prefixes)
+        self.max_entries = max_entries
+        self.counter = counter
+        self.entries = OrderedDict()
+        self.cached_version = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET' or not scope['path'].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        data_version, loaded_at = self.version()
+        if data_version is None:
+            await self.app(scope, receive, send)
+            return
+        if data_version != self.cached_version:
+            self.entries.clear()
+            self.cached_version = data_version
+
+        # The version pin is not part of the cache key and is ignored by the endpoints
+        query = parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+        pinned = ('v', data_version) in query
+        key = (scope['path'], urlencode(sorted(item for item in query if item[0] != 'v')))
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self._count('hit')
+            scope['route'] = entry.route
+        else:
+            self._count('miss')
+            entry = await self._render(scope, receive, send)
+            if entry is None:
+                return
+            self.entries[key] = entry
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        await self._respond(scope, send, entry, data_version, loaded_at, pinned)
+
+    def _count(self, result):
+        if self.counter is not None:
+            self.counter.inc(cache='response', result=result)
+
+    async def _render(self, scope, receive, send):
+        """Run the endpoint; buffer and cache it if it is a 200 JSON response, else pass it through"""
+        state = {'cacheable': False, 'content_type': b''}
+        chunks = []
+
+        async def capture(message):
+            if message['type'] == 'http.response.start':
+                content_type = dict(message.get('headers', [])).get(b'content-type', b'')
+                state['cacheable'] = message['status'] == 200 and content_type.startswith(b'application/json')
+                state['content_type'] = content_type
+                if not state['cacheable']:
+                    await send(message)
+            elif state['cacheable']:
+                chunks.append(message.get('body', b''))
+            else:
+                await send(message)
+
+        await self.app(scope, receive, capture)
+        if not state['cacheable']:
+            return None
+        return CachedResponse(b''.join(chunks), state['content_type'], scope.get('route'))
+
+    async def _respond(self, scope, send, entry, data_version, loaded_at, pinned):
+        request_headers = dict(scope.get('headers', []))
+        encoding = negotiate(request_headers.get(b'accept-encoding', b'').decode('latin-1'),
+                             [name for name in entry.bodies if name])
+        headers = [
+            (b'last-modified', formatdate(loaded_at, usegmt=True).encode()),
+            (b'cache-control', IMMUTABLE if pinned else REVALIDATE),
+            (b'vary', b'Accept-Encoding'),
+            (b'x-data-version', data_version.encode()),
+        ]
+
+        validator = self._not_modified(request_headers, entry, loaded_at)
+        if validator is not None:
+            # The 304 confirms the encoding the client holds, which its validator names
+            etag = entry.etag_for(encoding) if validator == '*' else validator
+            headers.insert(0, (b'etag', etag.encode()))
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        body = entry.bodies[encoding]
+        headers.insert(0, (b'etag', entry.etag_for(encoding).encode()))
+        headers += [(b'content-type', entry.content_type), (b'content-length', str(len(body)).encode())]
+        if encoding:
+            headers.append((b'content-encoding', encoding.encode()))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def _not_modified(request_headers, entry, loaded_at):
+        """The matching validator when the client's copy is current (``*`` if not an ETag), else None"""
+        if_none_match = request_headers.get(b'if-none-match')
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+            return entry.match(if_none_match.decode('latin-1'))
+        if_modified_since = request_headers.get(b'if-modified-since')
+        if if_modified_since is not None:
+            try:
+                if parsedate_to_datetime(if_modified_since.decode('latin-1')).timestamp() >= int(loaded_at):
+                    return '*'
+            except (TypeError, ValueError):
+                return None
+        return None
@@ -0,0 +1,226 @@
+"""
+Trigram index over game names, shared by the API and the analysis pipeline.
+
+Names are normalized (casefolded, accents and punctuation removed), padded
+and split into character trigrams. Every trigram is packed into one int64
+(three 21-bit code points), so building the index is a handful of NumPy
+sorts over all names at once and the postings (names containing each
+trigram) are one CSR-style array.
+
+Search candidates are the union of the query trigrams' postings, ranked by
+trigram Jaccard similarity with a bonus for names starting with the query
+(autocomplete) and for exact matches. The normalization and trigram helpers
+are shared with title deduplication (``title_dedup``).
+
+Name ids are positions in the names passed to ``build``.
+"""
+
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+# Padding around the normalized name: two leading spaces weigh the first characters more
+PAD_LEFT, PAD_RIGHT = '  ', ' '
+
+# Ranking bonus of names starting with the query and of exact matches
+PREFIX_BONUS = 0.5
+EXACT_BONUS = 0.5
+
+# Search candidates: postings read per query and names starting with the query (alphabetical)
+MAX_CANDIDATES = 5000
+PREFIX_CANDIDATES = 1000
+
+
+COMBINING_MARKS = re.compile(r'[\u0300-\u036f]')
+SEPARATORS = re.compile(r'[\W_]+')
+SEQUEL_TOKENS = re.compile(r'\b(?:\d+|[ivx]+)\b')
+
+
+def normalize_name(name):
+    """Casefolded name without accents or punctuation, words separated by single spaces"""
+    if name.isascii():
+        text = name.lower()
+    else:
+        text = COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', name)).casefold()
+    return SEPARATORS.sub(' ', text).strip()
+
+
+def normalize_names(names):
+    """``normalize_name`` of every name (missing names are empty)"""
+    return [normalize_name(name) if isinstance(name, str) else '' for name in np.asarray(names, dtype=object)]
+
+
+def sequel_keys(normalized):
+    """Numbers and roman numerals of each normalized name, as one string per name"""
+    return [' '.join(SEQUEL_TOKENS.findall(name)) for name in normalized]
+
+
+def code_points(strings):
+    """Code points of all strings concatenated and the offset of each string"""
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    chars = np.frombuffer(''.join(strings).encode('utf-32-le'), dtype=np.uint32)
+    return chars, np.concatenate([[0], np.cumsum(lengths)])
+
+
+def trigrams(chars, offsets):
+    """String index and packed trigram of every trigram (strings of 3+ characters)"""
+    owner = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))[:-2]
+    valid = np.arange(len(owner)) + 2 < offsets[1:][owner]
+    c = chars.astype(np.int64)
+    packed = (c[:-2] << 42) | (c[1:-1] << 21) | c[2:]
+    return owner[valid], packed[valid]
+
+
+def pairs_within(values, starts, sizes):
+    """Every pair (i < j) of the values within each group ``values[start:start + size]``"""
+    positions = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+    # Element k of a group pairs with the elements after it
+    after = np.repeat(starts + sizes, sizes) - positions - 1
+    left = np.repeat(positions, after)
+    right = left + 1 + np.arange(after.sum()) - np.repeat(np.cumsum(after) - after, after)
+    return values[left], values[right]
+
+
+class NameIndex:
+    """Trigram postings and per-name trigram counts of a list of names"""
+
+    def __init__(self, chars, offsets, alphabetical, grams, gram_offsets, postings, sizes,
+                 row_order=None, row_offsets=None):
+        self.chars = chars
+        self.offsets = offsets
+        self.alphabetical = alphabetical
+        self.grams = grams
+        self.gram_offsets = gram_offsets
+        self.postings = postings
+        self.sizes = sizes
+        self.row_order = row_order
+        self.row_offsets = row_offsets
+
+    @classmethod
+    def build(cls, names, codes=None):
+        """Index ``names``; with ``codes`` (name id of every row) rows can be looked up by name"""
+        normalized = normalize_names(names)
+        chars, offsets = code_points([PAD_LEFT + name + PAD_RIGHT for name in normalized])
+        owner, packed = trigrams(chars, offsets)
+
+        # Distinct trigrams of each name, grouped by trigram (names are in order already,
+        # so a stable sort keeps every posting list sorted by name id)
+        order = np.argsort(packed, kind='stable')
+        owner, packed = owner[order], packed[order]
+        distinct = np.ones(len(packed), dtype=bool)
+        distinct[1:] = (packed[1:] != packed[:-1]) | (owner[1:] != owner[:-1])
+        owner, packed = owner[distinct], packed[distinct]
+        grams, starts = np.unique(packed, return_index=True)
+
+        index = cls(
+            chars=chars,
+            offsets=offsets,
+            alphabetical=np.array(sorted(range(len(normalized)), key=normalized.__getitem__), dtype=np.int64),
+            grams=grams,
+            gram_offsets=np.append(starts, len(packed)),
+            postings=owner,
+            sizes=np.bincount(owner, minlength=len(normalized))
+        )
+        if codes is not None:
+            codes = np.asarray(codes)
+            valid = np.flatnonzero(codes >= 0)
+            index.row_order = valid[np.argsort(codes[valid], kind='stable')]
+            index.row_offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[valid], minlength=len(normalized)))])
+        return index
+
+    def arrays(self):
+        """Index arrays by name, for sharing between processes"""
+        arrays = {name: getattr(self, name) for name in
+                  ('chars', 'offsets', 'alphabetical', 'grams', 'gram_offsets', 'postings', 'sizes')}
+        if self.row_order is not None:
+            arrays.update(row_order=self.row_order, row_offsets=self.row_offsets)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild an index from ``arrays()`` output; arrays are not copied"""
+        return cls(**arrays)
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def rows(self, name_id):
+        """Rows of the indexed frame with this name"""
+        return self.row_order[self.row_offsets[name_id]:self.row_offsets[name_id + 1]]
+
+    def name(self, name_id):
+        """Normalized name"""
+        start, stop = self.offsets[name_id] + len(PAD_LEFT), self.offsets[name_id + 1] - len(PAD_RIGHT)
+        return self.chars[start:stop].tobytes().decode('utf-32-le')
+
+    def _query_grams(self, normalized):
+        """Ids of the query's trigrams that occur in the index, and the query's trigram count"""
+        _, packed = trigrams(*code_points([PAD_LEFT + normalized + PAD_RIGHT]))
+        packed = np.unique(packed)
+        ids = np.minimum(np.searchsorted(self.grams, packed), len(self.grams) - 1)
+        return ids[self.grams[ids] == packed], len(packed)
+
+    def _postings(self, gram):
+        return self.postings[self.gram_offsets[gram]:self.gram_offsets[gram + 1]]
+
+    def _prefixed(self, normalized, limit):
+        """Up to ``limit`` names starting with the normalized query, in alphabetical order"""
+        first = bisect.bisect_left(self.alphabetical, normalized, key=self.name)
+        last = bisect.bisect_left(self.alphabetical, normalized + '\U0010ffff', lo=first, key=self.name)
+        return self.alphabetical[first:min(last, first + limit)]
+
+    def _starts_with(self, name_ids, normalized):
+        """Whether each name starts with the normalized query"""
+        query = np.frombuffer(normalized.encode('utf-32-le'), dtype=np.uint32)
+        starts = self.offsets[name_ids] + len(PAD_LEFT)
+        lengths = self.offsets[name_ids + 1] - starts - len(PAD_RIGHT)
+        matches = lengths >= len(query)
+        window = starts[matches, None] + np.arange(len(query))
+        matches[matches] = (self.chars[window] == query).all(axis=1)
+        return matches, lengths == len(query)
+
+    def search(self, query, limit=10, min_similarity=0.2):
+        """Best matching names: ids and scores (similarity plus prefix / exact bonus), best first"""
+        normalized = normalize_name(query)
+        if not normalized:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        gram_ids, n_grams = self._query_grams(normalized)
+
+        # A name with similarity >= s shares at least s * n_grams of the query's trigrams, so it
+        # contains one of the n_grams - ceil(s * n_grams) + 1 rarest (trigrams missing from the
+        # index count as the rarest). Probing stops before MAX_CANDIDATES postings, which only
+        # drops names sharing nothing but very common trigrams; names starting with the query
+        # are added from the sorted names
+        frequency = np.diff(self.gram_offsets)[gram_ids]
+        order = np.argsort(frequency, kind='stable')
+        gram_ids, frequency = gram_ids[order], frequency[order]
+        probes = n_grams - int(np.ceil(min_similarity * n_grams - 1e-9)) + 1 - (n_grams - len(gram_ids))
+        probes = min(max(probes, 0), int((np.cumsum(frequency) <= MAX_CANDIDATES).sum()))
+        name_ids = np.unique(np.concatenate(
+            [self._postings(gram) for gram in gram_ids[:probes]] +
+            [self._prefixed(normalized, PREFIX_CANDIDATES)]
+        ))
+        if not len(name_ids):
+            return name_ids, np.empty(0)
+
+        # Shared trigrams: each posting list is sorted, so membership is a binary search
+        shared = np.zeros(len(name_ids), dtype=np.int64)
+        for gram in gram_ids:
+            postings = self._postings(gram)
+            found = np.minimum(np.searchsorted(postings, name_ids), len(postings) - 1)
+            shared += postings[found] == name_ids
+        similarity = shared / (n_grams + self.sizes[name_ids] - shared)
+        prefix, same_length = self._starts_with(name_ids, normalized)
+        score = similarity + PREFIX_BONUS * prefix + EXACT_BONUS * (prefix & same_length)
+
+        keep = (similarity >= min_similarity) | prefix
+        name_ids, score = name_ids[keep], score[keep]
+        if len(score) > limit:
+            # Every name tied with the limit-th score competes for the last places
+            top = score >= np.partition(score, len(score) - limit)[len(score) - limit]
+            name_ids, score = name_ids[top], score[top]
+        # Best score first, ties in name id order
+        order = np.lexsort((name_ids, -score))[:limit]
+        return name_ids[order], score[order]
@@ -0,0 +1,123 @@
+"""
+Dataset and model arrays shared by several API worker processes.
+
+The launcher process loads the data and fits the models once, then packs
+every numeric array (dataset columns, categorical codes, flattened forests,
+PCA components, ...) into a single shared memory segment. A small pickled
+manifest records each array's offset, dtype and shape together with the
+few plain Python objects that do not need sharing (category labels, the
+fitted scaler, precomputed summaries).
+
+Workers attach to the segment by reading the manifest and get read-only
+NumPy views over the shared pages, so the dataset and models exist once in
+memory however many workers serve them. Only the publisher owns the
+segment: workers open it without registering it with their resource
+tracker, which would otherwise unlink it when the worker exits.
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Arrays start on cache-line boundaries inside the segment
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _open_untracked(name):
+    """Open an existing segment without registering it with this process's resource tracker"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 opening always registers. Unregistering afterwards is not enough: workers
+    # spawned by multiprocessing share the publisher's tracker, and would drop its registration
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedState:
+    """Named read-only arrays in one shared memory segment plus pickled objects"""
+
+    def __init__(self, segment, arrays, objects, manifest_path, owner):
+        self.segment = segment
+        self.arrays = arrays
+        self.objects = objects
+        self.manifest_path = manifest_path
+        self.owner = owner
+
+    @classmethod
+    def publish(cls, arrays, objects=None, manifest_path=None):
+        """Copy ``arrays`` into a new segment and write the manifest for workers"""
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype.hasobject:
+                raise TypeError(f"Array '{name}' has dtype object and cannot be shared")
+            offset = _aligned(size)
+            # The dtype itself, not its string: structured dtypes keep their fields
+            layout[name] = (offset, array.dtype, array.shape)
+            size = offset + array.nbytes
+
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        views = {}
+        for name, (offset, dtype, shape) in layout.items():
+            view = np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset)
+            view[...] = arrays[name]
+            view.flags.writeable = False
+            views[name] = view
+
+        if manifest_path is None:
+            handle, manifest_path = tempfile.mkstemp(prefix='gameanalytics-', suffix='.manifest')
+            os.close(handle)
+        with open(manifest_path, 'wb') as f:
+            pickle.dump({'segment': segment.name, 'layout': layout, 'objects': objects or {}}, f)
+
+        return cls(segment, views, objects or {}, manifest_path, owner=True)
+
+    @classmethod
+    def attach(cls, manifest_path):
+        """Map the published arrays read-only; nothing is copied"""
+        with open(manifest_path, 'rb') as f:
+            manifest = pickle.load(f)
+
+        segment = _open_untracked(manifest['segment'])
+        views = {}
+        for name, (offset, dtype, shape) in manifest['layout'].items():
+            view = np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset)
+            view.flags.writeable = False
+            views[name] = view
+
+        return cls(segment, views, manifest['objects'], manifest_path, owner=False)
+
+    def group(self, prefix):
+        """Arrays published as ``<prefix>/<name>``, keyed by ``name``"""
+        start = len(prefix) + 1
+        return {name[start:]: array for name, array in self.arrays.items() if name.startswith(prefix + '/')}
+
+    @property
+    def nbytes(self):
+        return self.segment.size
+
+    def unlink(self):
+        """Release the segment and manifest (publishing process only)"""
+        if not self.owner:
+            return
+        self.arrays = {}
+        try:
+            self.segment.close()
+        except BufferError:
+            # Views handed out by this process are still alive; the pages go with the process
+            pass
+        self.segment.unlink()
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
@@ -1,10 +1,17 @@
-
 #!/usr/bin/env python3
 """
 GameAnalytics Backend Startup Script
 Run this to start the Python FastAPI server
+
+    python start.py                # development: one process, auto-reload, background warmup
+    python start.py --workers 4    # several workers sharing one copy of the data and models
+
+With more than one worker the data is loaded and the models are trained once
+in this process, published to shared memory, and every uvicorn worker maps
+them read-only instead of loading its own copy.
 """
 
+import argparse
 import subprocess
 import sys
 import os
@@ -19,31 +26,72 @@ def install_requirements():
         print("❌ Failed to install dependencies")
         sys.exit(1)
 
-def start_server():
-    """Start the FastAPI server"""
+def print_banner(host, port):
     print("Starting GameAnalytics API server...")
-    print("🚀 Server will be available at: http://localhost:8000")
-    print("📊 API documentation at: http://localhost:8000/docs")
+    print(f"🚀 Server will be available at: http://localhost:{port}")
+    print(f"📊 API documentation at: http://localhost:{port}/docs")
+    print(f"⏳ Readiness (models loaded): http://localhost:{port}/ready")
     print("🔄 CORS enabled for React frontend")
     print("\nPress Ctrl+C to stop the server\n")
-    
+
+def start_server(host, port):
+    """Start the FastAPI server"""
+    print_banner(host, port)
+
     try:
-        subprocess.run([sys.executable, "-m", "uvicorn", "main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"])
+        # Bind first and load data/models in the background; /ready reports when done
+        env = dict(os.environ, GAMEANALYTICS_STARTUP=os.environ.get("GAMEANALYTICS_STARTUP", "lazy"))
+        subprocess.run([sys.executable, "-m", "uvicorn", "main:app", "--reload", "--host", host, "--port", str(port)], env=env)
     except KeyboardInterrupt:
         print("\n✋ Server stopped by user")
     except subprocess.CalledProcessError:
         print("❌ Failed to start server")
         sys.exit(1)
 
+def start_workers(workers, host, port):
+    """Load data and models once, share them and serve them from several workers"""
+    import uvicorn
+
+    # Eager load in this process only; workers attach to what it publishes
+    os.environ["GAMEANALYTICS_STARTUP"] = "eager"
+    import main
+    state = main.publish_shared_state()
+    print(f"📦 Published {state.nbytes / 2 ** 20:.1f} MB of data and model arrays to shared memory")
+
+    os.environ["GAMEANALYTICS_STARTUP"] = "shared"
+    os.environ["GAMEANALYTICS_SHARED_STATE"] = state.manifest_path
+    print_banner(host, port)
+
+    try:
+        uvicorn.run("main:app", host=host, port=port, workers=workers)
+    except KeyboardInterrupt:
+        print("\n✋ Server stopped by user")
+    finally:
+        state.unlink()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the GameAnalytics API server")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; more than 1 shares the data and models via shared memory")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--skip-install", action="store_true", help="do not pip install requirements.txt")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     print("🎮 GameAnalytics Backend Server")
     print("=" * 40)
-    
+
     # Check if we're in the right directory
     if not os.path.exists("main.py"):
         print("❌ Please run this script from the backend directory")
         sys.exit(1)
-    
+
     # Install dependencies and start server
-    install_requirements()
-    start_server()
+    if not args.skip_install:
+        install_requirements()
+    if args.workers > 1:
+        start_workers(args.workers, args.host, args.port)
+    else:
+        start_server(args.host, args.port)
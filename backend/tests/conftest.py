@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other by module name, as when the API runs from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def client():
+    from fastapi.testclient import TestClient
+
+    import main
+    return TestClient(main.app)
@@ -0,0 +1,33 @@
+"""Batch scoring endpoints accept any number of games, including none"""
+
+SAMPLE_GAME = {'na_sales': 1.2, 'eu_sales': 0.8, 'critic_score': 82, 'year': 2012}
+
+
+def test_predict_batch_empty(client):
+    response = client.post('/api/predict/batch', json=[])
+    assert response.status_code == 200
+    assert response.json()['predictions'] == []
+
+
+def test_predict_batch(client):
+    response = client.post('/api/predict/batch', json=[SAMPLE_GAME] * 3)
+    assert response.status_code == 200
+    assert len(response.json()['predictions']) == 3
+
+
+def test_pca_project_empty(client):
+    response = client.post('/api/pca/project', json=[])
+    assert response.status_code == 200
+    assert response.json()['projections'] == []
+
+
+def test_anomaly_score_empty(client):
+    response = client.post('/api/anomalies/score', json=[])
+    assert response.status_code == 200
+    assert response.json()['scores'] == []
+
+
+def test_cluster_assign_empty(client):
+    response = client.post('/api/clusters/assign', json=[])
+    assert response.status_code == 200
+    assert response.json()['assignments'] == []
@@ -0,0 +1,51 @@
+"""Flattened forest inference agrees with the fitted scikit-learn forests"""
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+
+from forest_inference import FlatForest, calibrate_intervals, isolation_scores, predict_with_intervals
+
+
+def regression_data(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 5))
+    # Positive like sales, heteroscedastic so the tree spread matters
+    y = 10 + X[:, 0] ** 2 + 2 * X[:, 1] + rng.normal(scale=0.5 + np.abs(X[:, 2]), size=n_rows)
+    return X, y
+
+
+def test_predict_matches_random_forest():
+    X, y = regression_data(1000)
+    forest = RandomForestRegressor(n_estimators=30, random_state=0).fit(X[:800], y[:800])
+    flat = FlatForest(forest, chunk_size=64)
+
+    np.testing.assert_allclose(flat.predict(X[800:]), forest.predict(X[800:]))
+    per_tree = np.column_stack([tree.predict(X[800:]) for tree in forest.estimators_])
+    np.testing.assert_allclose(flat.predict_all(X[800:]), per_tree)
+
+
+def test_predict_from_shared_arrays():
+    X, y = regression_data(300)
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    flat = FlatForest.from_arrays(FlatForest(forest).arrays())
+    np.testing.assert_allclose(flat.predict(X), forest.predict(X))
+
+
+def test_isolation_scores_match_decision_function():
+    X = np.random.default_rng(1).normal(size=(600, 4))
+    for max_features in (1.0, 0.5):
+        forest = IsolationForest(n_estimators=50, max_features=max_features, random_state=0).fit(X)
+        scores = isolation_scores(FlatForest(forest), X, forest)
+        np.testing.assert_allclose(scores, forest.decision_function(X), rtol=1e-6, atol=1e-9)
+
+
+def test_intervals_reach_requested_coverage():
+    X, y = regression_data(6000, seed=2)
+    forest = RandomForestRegressor(n_estimators=50, min_samples_leaf=5, random_state=0).fit(X[:3000], y[:3000])
+    flat = FlatForest(forest)
+    calibration = calibrate_intervals(flat, X[3000:4500], y[3000:4500], coverage=0.9)
+
+    intervals = predict_with_intervals(flat, X[4500:], calibration)
+    covered = (intervals['lower'] <= y[4500:]) & (y[4500:] <= intervals['upper'])
+    assert calibration['n_calibration'] == 1500
+    assert 0.87 <= covered.mean() <= 0.95
@@ -0,0 +1,26 @@
+"""Streaming covariance PCA"""
+
+import numpy as np
+from sklearn.decomposition import PCA
+
+from pca_engine import PCAEngine
+
+
+def test_covariance_fit_matches_sklearn():
+    X = np.random.default_rng(0).normal(size=(5000, 4)) @ np.diag([3.0, 2.0, 1.0, 0.5])
+    engine = PCAEngine(method='covariance', chunk_size=700).fit(X)
+    reference = PCA().fit(X)
+
+    np.testing.assert_allclose(engine.explained_variance_, reference.explained_variance_, rtol=1e-9)
+    np.testing.assert_allclose(np.abs(engine.components_), np.abs(reference.components_), atol=1e-9)
+    np.testing.assert_allclose(engine.mean_, X.mean(axis=0))
+
+
+def test_covariance_fit_with_large_feature_means():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(20000, 5)) * [1.0, 2.0, 3.0, 0.5, 0.1] + 1e8
+    engine = PCAEngine(method='covariance', chunk_size=3000).fit(X)
+
+    centered = X - X.mean(axis=0)
+    expected = np.linalg.eigvalsh(centered.T @ centered / (len(X) - 1))[::-1]
+    np.testing.assert_allclose(engine.explained_variance_, expected, rtol=1e-6)
@@ -0,0 +1,16 @@
+"""Query parameters outside their valid range are rejected"""
+
+
+def test_anomalies_rejects_non_positive_limit(client):
+    for limit in (0, -5):
+        assert client.get(f'/api/anomalies?limit={limit}').status_code == 400
+
+
+def test_anomalies_limit(client):
+    response = client.get('/api/anomalies?limit=3')
+    assert response.status_code == 200
+    assert len(response.json()['anomalies']) <= 3
+
+
+def test_trends_rejects_non_positive_limit(client):
+    assert client.get('/api/trends?limit=-2').status_code == 400
@@ -0,0 +1,64 @@
+"""Cached API responses: per-encoding ETags, revalidation and invalidation"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCacheMiddleware
+
+GZIP = {'Accept-Encoding': 'gzip'}
+ANY = {'Accept-Encoding': 'gzip, deflate, br, zstd'}
+
+
+def cached_client(data):
+    app = FastAPI()
+
+    @app.get('/api/items')
+    def items():
+        # Large enough to be stored compressed
+        return {'version': data['version'], 'items': list(range(300))}
+
+    app.add_middleware(ResponseCacheMiddleware, version=lambda: (data['version'], data['loaded_at']))
+    return TestClient(app)
+
+
+def test_etag_names_the_encoding():
+    client = cached_client({'version': 'v1', 'loaded_at': 1700000000})
+    gzipped = client.get('/api/items', headers=GZIP)
+    plain = client.get('/api/items', headers={'Accept-Encoding': 'identity'})
+
+    assert gzipped.headers['content-encoding'] == 'gzip'
+    assert gzipped.headers['etag'].endswith('-gzip"')
+    assert 'content-encoding' not in plain.headers
+    assert plain.headers['etag'] == gzipped.headers['etag'].replace('-gzip', '')
+    assert gzipped.headers['vary'] == plain.headers['vary'] == 'Accept-Encoding'
+
+
+def test_not_modified_echoes_the_validated_etag():
+    client = cached_client({'version': 'v1', 'loaded_at': 1700000000})
+    etag = client.get('/api/items', headers=GZIP).headers['etag']
+
+    # Revalidated from a client that would now negotiate another encoding
+    revalidated = client.get('/api/items', headers={**ANY, 'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers['etag'] == etag
+    assert revalidated.headers['vary'] == 'Accept-Encoding'
+    assert revalidated.content == b''
+
+    unknown = client.get('/api/items', headers={**GZIP, 'If-None-Match': etag.replace('-gzip', '-deflate')})
+    assert unknown.status_code == 200
+
+
+def test_data_version_change_invalidates():
+    data = {'version': 'v1', 'loaded_at': 1700000000}
+    client = cached_client(data)
+    first = client.get('/api/items', headers=GZIP)
+
+    data.update(version='v2', loaded_at=1700003600)
+    changed = client.get('/api/items', headers={**GZIP, 'If-None-Match': first.headers['etag']})
+    assert changed.status_code == 200
+    assert changed.json()['version'] == 'v2'
+    assert changed.headers['x-data-version'] == 'v2'
+    assert changed.headers['etag'] != first.headers['etag']
+
+    stale = client.get('/api/items', headers={**GZIP, 'If-Modified-Since': first.headers['last-modified']})
+    assert stale.status_code == 200
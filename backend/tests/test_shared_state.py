@@ -0,0 +1,57 @@
+"""Shared state outlives the processes attached to it"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from neighbors import NeighborIndex
+from shared_state import SharedState
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_segment_survives_attached_process_exit():
+    state = SharedState.publish({'values': np.arange(10)})
+    try:
+        # The child keeps its state referenced until exit, like a worker
+        code = (f"import sys; sys.path.insert(0, {BACKEND!r}); from shared_state import SharedState; "
+                f"state = SharedState.attach({state.manifest_path!r}); print(state.arrays['values'].sum())")
+        child = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        assert child.stdout.strip() == '45'
+
+        attached = SharedState.attach(state.manifest_path)
+        assert attached.arrays['values'].sum() == 45
+        del attached
+    finally:
+        state.unlink()
+
+
+def test_neighbor_index_served_from_shared_arrays():
+    X = np.random.default_rng(0).normal(size=(500, 3))
+    index = NeighborIndex(X)
+    state = SharedState.publish({f'neighbors/{name}': array for name, array in index.arrays().items()},
+                                {'neighbor_state': index.state()})
+    try:
+        attached = SharedState.attach(state.manifest_path)
+        shared = NeighborIndex.from_arrays(attached.group('neighbors'), attached.objects['neighbor_state'])
+        assert all(np.shares_memory(array, attached.arrays[f'neighbors/{name}'])
+                   for name, array in zip(('data', 'idx_array', 'node_data', 'node_bounds'), shared.tree.get_arrays()))
+
+        rows, distances = shared.query(X[7], k=5)
+        expected_rows, expected_distances = index.query(X[7], k=5)
+        assert np.array_equal(rows, expected_rows) and np.allclose(distances, expected_distances)
+        del shared, attached
+    finally:
+        state.unlink()
+
+
+def test_neighbor_index_rebuilt_without_tree_state():
+    X = np.random.default_rng(1).normal(size=(300, 2))
+    index = NeighborIndex(X)
+    # Unknown KDTree state layout: the worker builds its own tree over the shared points
+    rebuilt = NeighborIndex.from_arrays(index.arrays(), None)
+    rows, distances = rebuilt.query(X[3], k=4)
+    expected_rows, expected_distances = index.query(X[3], k=4)
+    assert np.array_equal(rows, expected_rows) and np.allclose(distances, expected_distances)
@@ -0,0 +1,21 @@
+"""Windowed aggregates of yearly series"""
+
+import numpy as np
+import pandas as pd
+
+from time_series import windowed_aggregates
+
+
+def test_rolling_mean_only_over_full_windows():
+    frame = pd.DataFrame({'sales': [1.0, 2.0, 3.0, 4.0, 5.0]}, index=[2000, 2001, 2002, 2004, 2005])
+    rolling = windowed_aggregates(frame, 3)['rollingMean']['sales']
+    expected = frame.reindex(range(2000, 2006), fill_value=0.0)['sales'].rolling(3).mean()
+    np.testing.assert_allclose(rolling.to_numpy(), expected.to_numpy())
+    assert rolling.iloc[:2].isna().all()
+
+
+def test_rolling_mean_of_window_longer_than_years():
+    frame = pd.DataFrame({'sales': [1.0, 2.0, 3.0]}, index=[2000, 2001, 2002])
+    aggregates = windowed_aggregates(frame, 5)
+    assert aggregates['rollingMean']['sales'].isna().all()
+    np.testing.assert_allclose(aggregates['cumulative']['sales'].to_numpy(), [1.0, 3.0, 6.0])
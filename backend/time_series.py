@@ -0,0 +1,236 @@
+"""
+Yearly time series of many entities at once, shared by the API and the analysis pipeline.
+
+Sales of every platform, genre or publisher are laid out as one dense
+year x entity matrix (one ``np.bincount`` over the factorized codes, years
+without games are zeros). Everything else is vectorized across the columns
+of that matrix instead of looping over entities:
+
+- linear trends: closed-form least squares for all columns at once, with
+  the same slope / intercept / r / p-value as ``scipy.stats.linregress``
+  (missing values are masked per column)
+- forecasts: damped Holt exponential smoothing; the smoothing parameters are
+  picked per column from a small grid by one-step-ahead squared error, with
+  the whole grid evaluated in a single pass over the years
+- windowed aggregates (rolling mean, year-over-year change, cumulative totals
+  and shares) derived from already aggregated yearly series in O(years)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Smoothing parameters tried for every series
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+BETAS = (0.1, 0.3, 0.5)
+
+
+def fit_trends(Y, years):
+    """Least-squares line through every column of ``Y`` (years x series), NaN ignored"""
+    Y = np.asarray(Y, dtype=np.float64)
+    x = np.asarray(years, dtype=np.float64)[:, None]
+    mask = ~np.isnan(Y)
+    Y0 = np.where(mask, Y, 0.0)
+
+    n = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (x * mask).sum(axis=0) / n
+        y_mean = Y0.sum(axis=0) / n
+        dx = np.where(mask, x - x_mean, 0.0)
+        dy = np.where(mask, Y0 - y_mean, 0.0)
+        sxx = (dx * dx).sum(axis=0)
+        syy = (dy * dy).sum(axis=0)
+        sxy = (dx * dy).sum(axis=0)
+
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+        r = np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+        r = np.where(syy == 0, 0.0, r)
+
+        # Two-sided test of zero slope with n - 2 degrees of freedom, as linregress
+        dof = n - 2
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p_value = np.where(np.abs(r) == 1.0, 0.0, 2 * stats.t.sf(np.abs(t), dof))
+        stderr = np.sqrt((1 - r ** 2) * syy / sxx / dof)
+
+    undefined = n < 3
+    return {
+        'slope': np.where(n < 2, np.nan, slope),
+        'intercept': np.where(n < 2, np.nan, intercept),
+        'r': np.where(n < 2, np.nan, r),
+        'p_value': np.where(undefined, np.nan, p_value),
+        'stderr': np.where(undefined, np.nan, stderr),
+        'n': n
+    }
+
+
+def holt_forecast(Y, horizon, alphas=ALPHAS, betas=BETAS, damping=0.9):
+    """Damped Holt forecast of every column of ``Y`` for the next ``horizon`` steps
+
+    Returns the forecasts (horizon x series, clipped at zero), the chosen
+    alpha / beta per series and the one-step-ahead RMSE of the fit.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    grid = np.array([(alpha, beta) for alpha in alphas for beta in betas])
+    alpha, beta = grid[:, :1], grid[:, 1:]
+
+    # State for every (parameter pair, series) combination at once
+    level = np.broadcast_to(Y[0], (len(grid), Y.shape[1])).copy()
+    trend = np.broadcast_to(Y[1] - Y[0] if len(Y) > 1 else np.zeros(Y.shape[1]), level.shape).copy()
+    sse = np.zeros_like(level)
+    for observed in Y[1:]:
+        predicted = level + damping * trend
+        sse += (observed - predicted) ** 2
+        new_level = alpha * observed + (1 - alpha) * predicted
+        trend = beta * (new_level - level) + (1 - beta) * damping * trend
+        level = new_level
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(Y.shape[1])
+    steps = np.cumsum(damping ** np.arange(1, horizon + 1))
+    forecast = level[best, columns] + np.outer(steps, trend[best, columns])
+    return {
+        'forecast': np.maximum(forecast, 0.0),
+        'alpha': grid[best, 0],
+        'beta': grid[best, 1],
+        'rmse': np.sqrt(sse[best, columns] / max(len(Y) - 1, 1))
+    }
+
+
+class TrendEngine:
+    """Dense yearly series per entity with vectorized trends and forecasts"""
+
+    def __init__(self, df, value='Global_Sales', year='Year'):
+        self.df = df
+        self.value = value
+        self.year = year
+        year_values = df[year].to_numpy()
+        self.years = np.arange(year_values.min(), year_values.max() + 1)
+        self._year_codes = (year_values - self.years[0]).astype(np.int64)
+        self._matrices = {}
+
+    def matrices(self, entity):
+        """Sales and game counts as year x entity frames (zeros where an entity had no games)"""
+        if entity not in self._matrices:
+            codes, labels = pd.factorize(self.df[entity])
+            n_years, n_labels = len(self.years), len(labels)
+            valid = codes >= 0
+            cells = self._year_codes[valid] * n_labels + codes[valid]
+            values = np.nan_to_num(self.df[self.value].to_numpy(dtype=np.float64)[valid])
+
+            shape = (n_years, n_labels)
+            sales = np.bincount(cells, weights=values, minlength=n_years * n_labels).reshape(shape)
+            games = np.bincount(cells, minlength=n_years * n_labels).reshape(shape)
+            index = pd.Index(self.years, name=self.year)
+            columns = pd.Index(labels, name=entity)
+            self._matrices[entity] = (pd.DataFrame(sales, index=index, columns=columns),
+                                      pd.DataFrame(games, index=index, columns=columns))
+        return self._matrices[entity]
+
+    def lifecycle(self, entity):
+        """First and last year with games, game count and total sales per entity"""
+        sales, games = self.matrices(entity)
+        active = games.to_numpy() > 0
+        first = self.years[np.argmax(active, axis=0)]
+        last = self.years[len(self.years) - 1 - np.argmax(active[::-1], axis=0)]
+        return pd.DataFrame({
+            'Start_Year': first,
+            'End_Year': last,
+            'Games_Count': games.sum(axis=0).to_numpy(),
+            'Total_Sales': sales.sum(axis=0).to_numpy(),
+            'Lifespan': last - first + 1
+        }, index=sales.columns)
+
+    def share_change(self, entity, early_end, late_start):
+        """Change of each entity's share of sales (percentage points) between two periods
+
+        Only entities with games in both periods are compared.
+        """
+        sales, games = self.matrices(entity)
+        early = self.years <= early_end
+        late = self.years >= late_start
+        early_sales, late_sales = sales[early].sum(), sales[late].sum()
+        present = (games[early].sum() > 0) & (games[late].sum() > 0)
+        change = late_sales / late_sales.sum() * 100 - early_sales / early_sales.sum() * 100
+        return change[present].sort_values(ascending=False)
+
+    def trends(self, entity, horizon=5):
+        """Trend statistics and forecasts for every entity, largest total sales first"""
+        sales, games = self.matrices(entity)
+        Y = sales.to_numpy()
+        trend = fit_trends(Y, self.years)
+        smoothing = holt_forecast(Y, horizon)
+
+        table = self.lifecycle(entity).assign(
+            Slope=trend['slope'],
+            Intercept=trend['intercept'],
+            R=trend['r'],
+            P_Value=trend['p_value'],
+            Alpha=smoothing['alpha'],
+            Beta=smoothing['beta'],
+            RMSE=smoothing['rmse']
+        )
+        forecast = pd.DataFrame(smoothing['forecast'], columns=sales.columns,
+                                index=pd.Index(self.years[-1] + np.arange(1, horizon + 1), name=self.year))
+        order = table['Total_Sales'].sort_values(ascending=False, kind='stable').index
+        return {'table': table.loc[order], 'series': sales[order], 'forecast': forecast[order]}
+
+    def total(self, horizon=5):
+        """Trend and forecast of total sales per year"""
+        series = pd.Series(
+            np.bincount(self._year_codes, weights=np.nan_to_num(self.df[self.value].to_numpy(dtype=np.float64)),
+                        minlength=len(self.years)),
+            index=pd.Index(self.years, name=self.year), name=self.value
+        )
+        trend = fit_trends(series.to_numpy()[:, None], self.years)
+        smoothing = holt_forecast(series.to_numpy()[:, None], horizon)
+        return {
+            'series': series,
+            'trend': {name: values[0] for name, values in trend.items()},
+            'forecast': pd.Series(smoothing['forecast'][:, 0], name=self.value,
+                                  index=pd.Index(self.years[-1] + np.arange(1, horizon + 1), name=self.year))
+        }
+
+
+def windowed_aggregates(frame, window, shares=True):
+    """Rolling mean, year-over-year change and cumulative totals of yearly series
+
+    ``frame`` is years x series; missing years are filled with zeros so the
+    window and YoY always span calendar years. Every statistic is one
+    cumulative sum or difference over the years, O(years x series). The
+    rolling mean is NaN for the first ``window - 1`` years (incomplete
+    windows; all years when the window is longer than the span), like the
+    YoY statistics of the first year. With ``shares`` the series
+    are parts of a whole (regions, platforms, ...) and each one's share of
+    the cumulative total is included.
+    """
+    years = np.arange(frame.index.min(), frame.index.max() + 1)
+    dense = frame.reindex(years, fill_value=0.0)
+    values = dense.to_numpy(dtype=np.float64)
+
+    cumulative = np.cumsum(values, axis=0)
+    padded = np.vstack([np.zeros((1, values.shape[1])), cumulative])
+    rolling = np.full_like(values, np.nan)
+    # Only full windows: the first window - 1 years have no rolling mean (none if the window is longer)
+    if window <= len(years):
+        rolling[window - 1:] = (padded[window:] - padded[:len(years) - window + 1]) / window
+
+    change = np.full_like(values, np.nan)
+    change[1:] = values[1:] - values[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = np.full_like(values, np.nan)
+        growth[1:] = np.where(values[:-1] != 0, change[1:] / values[:-1] * 100, np.nan)
+        share = cumulative / cumulative.sum(axis=1, keepdims=True) * 100
+
+    def framed(array):
+        return pd.DataFrame(array, index=dense.index, columns=dense.columns)
+
+    aggregates = {
+        'rollingMean': framed(rolling),
+        'yoyChange': framed(change),
+        'yoyGrowth': framed(growth),
+        'cumulative': framed(cumulative)
+    }
+    if shares:
+        aggregates['cumulativeShare'] = framed(share)
+    return aggregates
@@ -0,0 +1,155 @@
+"""
+Canonical title ids: one id for every release of the same game.
+
+The same game appears under slightly different names on different
+platforms ("Call of Duty: Black Ops" / "Call of Duty Black Ops (PS3)",
+editions, punctuation, typos). Titles are resolved in three steps, each
+vectorized over the distinct names:
+
+1. normalization - the search index normalization, then bracketed tags
+   ("(PS3)", "[JP]"), a leading "the" and edition phrases ("Game of the
+   Year Edition", "Remastered", ...) are removed; equal canonical names are
+   the same title. Platform names outside brackets are kept: "Mario Kart
+   Wii" and "Mario Kart DS" are different games
+2. blocking - canonical names are only compared within blocks sharing a
+   phonetic key (Soundex of the first word or of the rarest word) and the
+   same sequel numbers, so the cost grows with the block sizes, not with
+   the square of the number of names
+3. similarity - cosine similarity of TF-IDF weighted character trigrams,
+   computed for all candidate pairs at once as row-wise products of one
+   sparse matrix; pairs above the threshold are linked and every connected
+   group of names becomes one title
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from search_index import PAD_LEFT, PAD_RIGHT, code_points, normalize_name, pairs_within, sequel_keys, trigrams
+
+# Cosine similarity of canonical names considered the same title
+SIMILARITY_THRESHOLD = 0.8
+
+# Largest block of names compared with each other, candidate pairs scored per batch
+MAX_BLOCK = 300
+PAIR_BATCH = 2000000
+
+BRACKETED = re.compile(r'[(\[][^)\]]*[)\]]')
+EDITIONS = re.compile(
+    r'\b(?:(?:game of the year|goty|collector s|limited|special|deluxe|complete|definitive|standard|'
+    r'premium|anniversary|gold|platinum|ultimate|legendary|launch|digital) edition|'
+    r'game of the year|goty|remastered|greatest hits|player s choice|platinum hits|version)\b'
+)
+LEADING_ARTICLE = re.compile(r'^the ')
+
+# Soundex digit of every letter; vowels separate repeated digits, h and w do not
+SOUNDEX_CODES = str.maketrans('bfpvcgjkqsxzdtlmnraeiouy', '111122222222334556000000', 'hw')
+
+
+def soundex(word):
+    """Four-character Soundex code of a word (words with digits or non-Latin letters are their own code)"""
+    if not (word.isascii() and word.isalpha()):
+        return word
+    codes = word[0].translate(SOUNDEX_CODES) or '0'
+    codes += word[1:].translate(SOUNDEX_CODES)
+    # Adjacent equal digits collapse (also with the first letter's digit), vowels are dropped
+    collapsed = ''.join(code for i, code in enumerate(codes[1:], 1) if code != codes[i - 1])
+    return (word[0] + collapsed.replace('0', '') + '000')[:4]
+
+
+class TitleDeduplicator:
+    """Title id of every distinct name from normalization, blocking and TF-IDF similarity"""
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_block=MAX_BLOCK):
+        self.threshold = threshold
+        self.max_block = max_block
+
+    def canonical_name(self, name):
+        """Normalized name without bracketed tags, a leading "the" and edition phrases"""
+        normalized = normalize_name(BRACKETED.sub(' ', name))
+        return ' '.join(EDITIONS.sub(' ', LEADING_ARTICLE.sub('', normalized)).split()) or normalized
+
+    def _tfidf(self, names):
+        """L2-normalized TF-IDF rows of character trigrams"""
+        owner, packed = trigrams(*code_points([PAD_LEFT + name + PAD_RIGHT for name in names]))
+        grams, gram_ids = np.unique(packed, return_inverse=True)
+        counts = csr_matrix((np.ones(len(owner)), (owner, gram_ids)), shape=(len(names), len(grams)))
+        counts.sum_duplicates()
+        document_frequency = np.bincount(counts.indices, minlength=len(grams))
+        counts.data *= (np.log((1 + len(names)) / (1 + document_frequency)) + 1)[counts.indices]
+        norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+        counts.data /= np.repeat(norms, np.diff(counts.indptr))
+        return counts
+
+    def _blocks(self, names):
+        """(name, block) memberships: Soundex of the first and of the rarest word, with sequel keys"""
+        words = [name.split() for name in names]
+        frequency = Counter(word for name_words in words for word in set(name_words))
+        codes = {word: soundex(word) for word in frequency}
+        sequels = sequel_keys(names)
+        keys = []
+        for name_words, sequel in zip(words, sequels):
+            if not name_words:
+                keys.append(('', ''))
+                continue
+            # Ties go to the longest word, which is the most specific
+            rarest = min(name_words, key=lambda word: (frequency[word], -len(word), word))
+            keys.append((f'{codes[name_words[0]]}|{sequel}', f'{codes[rarest]}|{sequel}'))
+        members = np.repeat(np.arange(len(names)), 2)
+        blocks = pd.factorize(np.array([key for pair in keys for key in pair], dtype=object))[0]
+        # The two keys of a name can coincide
+        unique = pd.unique(blocks.astype(np.int64) * len(names) + members)
+        return unique % len(names), unique // len(names)
+
+    def fit(self, names):
+        """Resolve the titles of the distinct ``names``"""
+        self.names_ = pd.Index(pd.unique(np.asarray(names, dtype=object)))
+        present = [name if isinstance(name, str) else '' for name in self.names_]
+        canonical_ids, canonical = pd.factorize(np.array([self.canonical_name(name) for name in present], dtype=object))
+        n_canonical = len(canonical)
+
+        members, blocks = self._blocks(list(canonical))
+        order = np.lexsort((members, blocks))
+        members, blocks = members[order], blocks[order]
+        _, starts, sizes = np.unique(blocks, return_index=True, return_counts=True)
+        usable = (sizes > 1) & (sizes <= self.max_block)
+        starts, sizes = starts[usable], sizes[usable]
+
+        vectors = self._tfidf(list(canonical))
+        pair_counts = sizes * (sizes - 1) // 2
+        batch = (np.cumsum(pair_counts) - pair_counts) // PAIR_BATCH
+        links, compared = [], 0
+        for batch_id in np.unique(batch):
+            selected = batch == batch_id
+            left, right = pairs_within(members, starts[selected], sizes[selected])
+            pair_keys = np.sort(left.astype(np.int64) * n_canonical + right)
+            pair_keys = pair_keys[np.append(True, pair_keys[1:] != pair_keys[:-1])]
+            left, right = pair_keys // n_canonical, pair_keys % n_canonical
+            similarity = np.asarray(vectors[left].multiply(vectors[right]).sum(axis=1)).ravel()
+            similar = similarity >= self.threshold
+            links.append((left[similar], right[similar]))
+            compared += len(pair_keys)
+
+        left = np.concatenate([np.empty(0, np.int64)] + [left for left, _ in links])
+        right = np.concatenate([np.empty(0, np.int64)] + [right for _, right in links])
+        graph = coo_matrix((np.ones(len(left), dtype=np.int8), (left, right)), shape=(n_canonical, n_canonical))
+        _, components = connected_components(graph, directed=False)
+
+        # Title ids numbered in order of first appearance
+        self.name_titles_ = pd.factorize(components[canonical_ids])[0]
+        self.n_titles_ = int(self.name_titles_.max()) + 1 if len(self.name_titles_) else 0
+        self.canonical_ = canonical
+        self.pairs_compared_ = compared
+        return self
+
+    def transform(self, names):
+        """Title id of every value of ``names`` (-1 for names not seen in ``fit``)"""
+        positions = self.names_.get_indexer(np.asarray(names, dtype=object))
+        return np.where(positions >= 0, self.name_titles_[positions], -1)
+
+    def fit_transform(self, names):
+        return self.fit(names).transform(names)
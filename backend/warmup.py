@@ -0,0 +1,107 @@
+"""
+Deferred startup for the API.
+
+In lazy startup mode the app binds immediately and the heavy work (importing
+pandas/scikit-learn, loading the data, training the models) runs as a warmup
+in a background thread. ``ReadinessGate`` answers data endpoints with 503
+until the warmup has completed, while ``/``, the readiness probe and
+``/metrics`` stay available. Import time of each heavy dependency is measured
+and reported with the warmup state.
+"""
+
+import json
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+
+class Warmup:
+    """Runs the startup steps once and tracks readiness"""
+
+    def __init__(self, import_gauge=None, duration_gauge=None):
+        self.import_gauge = import_gauge
+        self.duration_gauge = duration_gauge
+        self.status = 'pending'
+        self.error = None
+        self.import_seconds = {}
+        self.warmup_seconds = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @contextmanager
+    def import_timer(self, module):
+        """Record how long importing ``module`` (or a group of modules) took"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_import(module, time.perf_counter() - start)
+
+    def record_import(self, module, seconds):
+        self.import_seconds[module] = round(seconds, 4)
+        if self.import_gauge is not None:
+            self.import_gauge.set(seconds, module=module)
+
+    def run(self, *steps, raise_errors=False):
+        """Run the steps in order; readiness flips only when all of them succeed"""
+        self.status = 'warming'
+        start = time.perf_counter()
+        try:
+            for step in steps:
+                step()
+        except Exception as exc:
+            self.status = 'failed'
+            self.error = f"{type(exc).__name__}: {exc}"
+            if raise_errors:
+                raise
+            traceback.print_exc()
+            return
+        self.warmup_seconds = round(time.perf_counter() - start, 4)
+        if self.duration_gauge is not None:
+            self.duration_gauge.set(self.warmup_seconds)
+        self.status = 'ready'
+        self._ready.set()
+
+    def start_background(self, *steps):
+        thread = threading.Thread(target=self.run, args=steps, name='warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def report(self):
+        return {
+            'status': self.status,
+            'ready': self.ready,
+            'error': self.error,
+            'import_seconds': self.import_seconds,
+            'warmup_seconds': self.warmup_seconds
+        }
+
+
+class ReadinessGate:
+    """ASGI middleware returning 503 for gated paths until the warmup is ready"""
+
+    def __init__(self, app, warmup, prefixes=('/api/',)):
+        self.app = app
+        self.warmup = warmup
+        self.prefixes = tuple(prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or self.warmup.ready or not scope['path'].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({'detail': 'Service is warming up', 'status': self.warmup.status}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', b'1')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,149 @@
+"""
+Metryki jakości klastrowania dla dużych zbiorów danych
+
+Dwa tryby pracy:
+- 'exact'   - dokładny silhouette liczony blokami, pamięć ograniczona do
+              chunk_rows x n odległości zamiast pełnej macierzy n x n
+- 'approx'  - szybkie przybliżenie: uproszczony silhouette z odległości do
+              centroidów ('simplified') albo silhouette z próbki z przedziałem
+              ufności ('sampled')
+
+Calinski-Harabasz i Davies-Bouldin wymagają tylko centroidów (O(n*k)), więc
+zawsze są liczone dokładnie. Wyniki są cache'owane per wektor etykiet.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class ClusterQuality:
+    """Silnik metryk jakości klastrów z cache per wektor etykiet"""
+
+    def __init__(self, X, mode='exact', approximation='sampled', sample_size=2000,
+                 memory_budget_mb=16, random_state=42):
+        if mode not in ('exact', 'approx'):
+            raise ValueError(f"Nieznany tryb metryk: {mode}")
+        if approximation not in ('sampled', 'simplified'):
+            raise ValueError(f"Nieznane przybliżenie silhouette: {approximation}")
+
+        self.X = np.asarray(X, dtype=np.float64)
+        self.mode = mode
+        self.approximation = approximation
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.chunk_rows = max(1, int(memory_budget_mb * 2 ** 20 // (8 * len(self.X))))
+        self._sq_norms = np.einsum('ij,ij->i', self.X, self.X)
+        self._cache = {}
+
+    def evaluate(self, labels):
+        """Zwróć wszystkie metryki dla etykiet (z cache, jeśli już liczone)"""
+        labels = np.asarray(labels)
+        key = hashlib.blake2b(labels.astype(np.int64).tobytes(), digest_size=16).hexdigest()
+        if key in self._cache:
+            return self._cache[key]
+
+        codes, counts, centroids = self._centroids(labels)
+        metrics = {
+            'calinski_harabasz': self._calinski_harabasz(codes, counts, centroids),
+            'davies_bouldin': self._davies_bouldin(codes, centroids),
+            'mode': self.mode
+        }
+
+        if self.mode == 'exact':
+            metrics['silhouette'] = float(self._silhouette_samples(codes, counts).mean())
+            metrics['silhouette_ci'] = None
+        elif self.approximation == 'simplified':
+            metrics['silhouette'] = self._simplified_silhouette(codes, centroids)
+            metrics['silhouette_ci'] = None
+        else:
+            metrics['silhouette'], metrics['silhouette_ci'] = self._sampled_silhouette(codes, counts)
+
+        self._cache[key] = metrics
+        return metrics
+
+    def silhouette(self, labels):
+        return self.evaluate(labels)['silhouette']
+
+    def _centroids(self, labels):
+        _, codes = np.unique(labels, return_inverse=True)
+        counts = np.bincount(codes)
+        sums = np.stack([np.bincount(codes, weights=column, minlength=len(counts))
+                         for column in self.X.T], axis=1)
+        return codes, counts, sums / counts[:, None]
+
+    def _distances(self, rows):
+        """Odległości euklidesowe od wskazanych wierszy do wszystkich punktów"""
+        dist = self.X[rows] @ self.X.T
+        dist *= -2
+        dist += self._sq_norms[rows][:, None]
+        dist += self._sq_norms[None, :]
+        np.maximum(dist, 0, out=dist)
+        return np.sqrt(dist, out=dist)
+
+    def _silhouette_samples(self, codes, counts, rows=None):
+        """Dokładne wartości silhouette dla wierszy, liczone blokami"""
+        rows = np.arange(len(self.X)) if rows is None else rows
+        membership = np.zeros((len(self.X), len(counts)))
+        membership[np.arange(len(self.X)), codes] = 1.0
+        values = np.empty(len(rows))
+
+        for start in range(0, len(rows), self.chunk_rows):
+            chunk = rows[start:start + self.chunk_rows]
+            # Sumy odległości do każdego klastra jako iloczyn z macierzą przynależności
+            cluster_sums = self._distances(chunk) @ membership
+            own = codes[chunk]
+            idx = np.arange(len(chunk))
+
+            own_size = counts[own]
+            a = cluster_sums[idx, own] / np.maximum(own_size - 1, 1)
+            mean_other = cluster_sums / counts[None, :]
+            mean_other[idx, own] = np.inf
+            b = mean_other.min(axis=1)
+
+            s = (b - a) / np.maximum(np.maximum(a, b), 1e-12)
+            values[start:start + len(chunk)] = np.where(own_size > 1, s, 0.0)
+
+        return values
+
+    def _simplified_silhouette(self, codes, centroids):
+        """Silhouette z odległości do centroidów zamiast do wszystkich punktów"""
+        sq = self._sq_norms[:, None] + (centroids ** 2).sum(axis=1)[None, :] - 2 * self.X @ centroids.T
+        dist = np.sqrt(np.maximum(sq, 0))
+        idx = np.arange(len(self.X))
+        a = dist[idx, codes]
+        dist[idx, codes] = np.inf
+        b = dist.min(axis=1)
+        return float(((b - a) / np.maximum(np.maximum(a, b), 1e-12)).mean())
+
+    def _sampled_silhouette(self, codes, counts):
+        """Dokładny silhouette dla próbki wierszy z 95% przedziałem ufności"""
+        n = len(self.X)
+        if n <= self.sample_size:
+            return float(self._silhouette_samples(codes, counts).mean()), None
+
+        rng = np.random.RandomState(self.random_state)
+        rows = rng.choice(n, self.sample_size, replace=False)
+        values = self._silhouette_samples(codes, counts, rows)
+        mean = float(values.mean())
+        margin = 1.96 * values.std(ddof=1) / np.sqrt(len(values))
+        return mean, (mean - float(margin), mean + float(margin))
+
+    def _calinski_harabasz(self, codes, counts, centroids):
+        n, k = len(self.X), len(counts)
+        if k < 2:
+            return None
+        between = (counts * ((centroids - self.X.mean(axis=0)) ** 2).sum(axis=1)).sum()
+        within = ((self.X - centroids[codes]) ** 2).sum()
+        return float(between * (n - k) / (within * (k - 1))) if within > 0 else 1.0
+
+    def _davies_bouldin(self, codes, centroids):
+        k = len(centroids)
+        if k < 2:
+            return None
+        to_centroid = np.sqrt(((self.X - centroids[codes]) ** 2).sum(axis=1))
+        scatter = np.bincount(codes, weights=to_centroid) / np.bincount(codes)
+        separation = np.sqrt(((centroids[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2))
+        np.fill_diagonal(separation, np.inf)
+        ratios = (scatter[:, None] + scatter[None, :]) / separation
+        return float(ratios.max(axis=1).mean())
@@ -0,0 +1,347 @@
+"""
+Jednoprzebiegowy silnik statystyk EDA dla GameAnalyticsDataScience
+
+Dane są czytane fragmentami (chunkami); każdy fragment daje częściowe
+podsumowanie złożone z akumulatorów, które można łączyć (merge):
+- liczność, średnia, M2 i min/max kolumn liczbowych (wzory Chana zamiast
+  surowych sum kwadratów - stabilne numerycznie)
+- ko-momenty par kolumn na parach kompletnych obserwacji (korelacja Pearsona
+  jak ``DataFrame.corr()``)
+- szkic kwantyli w stylu t-digest: dokładny do ``exact_limit`` wartości,
+  powyżej kompresowany do ~``compression`` centroidów
+- sumy i liczności w grupach (Platform, Genre, Year)
+- top-k wierszy według sprzedaży (kandydaci na outliery)
+
+Fragmenty są przetwarzane równolegle w wątkach (NumPy i pandas zwalniają GIL
+w ciężkich operacjach), a częściowe wyniki łączone są w jedno podsumowanie.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+class CoMoments:
+    """Momenty kolumn i ko-momenty par kolumn na parach kompletnych obserwacji
+
+    Macierze k×k: ``mean[i, j]`` i ``m2[i, j]`` opisują kolumnę i na wierszach,
+    gdzie obie kolumny i oraz j są niepuste; przekątna to statystyki samej kolumny.
+    """
+
+    def __init__(self, n, mean, m2, comoment, minimum, maximum):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.comoment = comoment
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @classmethod
+    def from_array(cls, X):
+        X = np.asarray(X, dtype=np.float64)
+        valid = ~np.isnan(X)
+        weights = valid.astype(np.float64)
+        count = weights.sum(axis=0)
+
+        # Przesunięcie o średnie fragmentu ogranicza utratę precyzji w sumach kwadratów
+        Y = np.where(valid, X, 0.0)
+        shift = np.divide(Y.sum(axis=0), count, out=np.zeros_like(count), where=count > 0)
+        Y -= shift
+        Y *= weights
+
+        n = weights.T @ weights
+        sums = Y.T @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, shift[:, None] + sums / n, 0.0)
+            m2 = np.where(n > 0, (Y * Y).T @ weights - sums ** 2 / n, 0.0)
+            comoment = np.where(n > 0, Y.T @ Y - sums * sums.T / n, 0.0)
+
+        # fmin/fmax pomijają NaN (NaN tylko dla całkiem pustej kolumny)
+        empty = np.full(X.shape[1], np.nan)
+        minimum = np.fmin.reduce(X, axis=0) if len(X) else empty
+        maximum = np.fmax.reduce(X, axis=0) if len(X) else empty
+        return cls(n, mean, m2, comoment, minimum, maximum)
+
+    def merge(self, other):
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            mean = np.where(n > 0, self.mean + delta * other.n / n, 0.0)
+        return CoMoments(
+            n, mean,
+            self.m2 + other.m2 + delta ** 2 * weight,
+            self.comoment + other.comoment + delta * delta.T * weight,
+            np.fmin(self.minimum, other.minimum),
+            np.fmax(self.maximum, other.maximum)
+        )
+
+    def count(self):
+        return np.diag(self.n)
+
+    def column_mean(self):
+        return np.where(self.count() > 0, np.diag(self.mean), np.nan)
+
+    def correlation(self):
+        """Macierz korelacji Pearsona (NaN dla par z mniej niż 2 obserwacjami lub stałych kolumn)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr[(self.n < 2) | ~np.isfinite(corr)] = np.nan
+        diagonal = np.diag(corr).copy()
+        diagonal[~np.isnan(diagonal)] = 1.0
+        np.fill_diagonal(corr, diagonal)
+        return np.clip(corr, -1.0, 1.0)
+
+
+class QuantileSketch:
+    """Łączony szkic kwantyli w stylu t-digest
+
+    Do ``exact_limit`` wartości przechowuje dane dokładnie (kwantyle jak
+    ``Series.quantile``), powyżej kompresuje je do centroidów o rozmiarze
+    ograniczonym funkcją skali k1 - małe przy ogonach, duże w środku rozkładu.
+    """
+
+    def __init__(self, compression=200, exact_limit=1000000):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @classmethod
+    def from_values(cls, values, compression=200, exact_limit=1000000):
+        sketch = cls(compression, exact_limit)
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        sketch._add(values, np.ones(len(values)), exact=True)
+        return sketch
+
+    def merge(self, other):
+        merged = QuantileSketch(self.compression, self.exact_limit)
+        merged.means, merged.weights, merged.exact = self.means, self.weights, self.exact
+        merged.minimum, merged.maximum = self.minimum, self.maximum
+        merged._add(other.means, other.weights, exact=other.exact)
+        merged.minimum = min(merged.minimum, other.minimum)
+        merged.maximum = max(merged.maximum, other.maximum)
+        return merged
+
+    def _add(self, means, weights, exact):
+        self.means = np.concatenate([self.means, means])
+        self.weights = np.concatenate([self.weights, weights])
+        self.exact = self.exact and exact
+        if len(means):
+            self.minimum = min(self.minimum, means.min())
+            self.maximum = max(self.maximum, means.max())
+        if not self.exact or len(self.means) > self.exact_limit:
+            self._compress()
+
+    def _compress(self):
+        """Scal sąsiednie punkty, których kwantyle mieszczą się w jednej jednostce skali k1"""
+        order = np.argsort(self.means)
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        _, bucket = np.unique(k, return_inverse=True)
+
+        merged_weights = np.bincount(bucket, weights=weights)
+        self.means = np.bincount(bucket, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+        self.exact = False
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.nan
+        if self.exact:
+            return float(np.quantile(self.means, q))
+        positions, means = self._positions()
+        return float(np.interp(q * self.count, positions, means))
+
+    def count_above(self, threshold):
+        """Liczba wartości większych od ``threshold`` (przybliżona po kompresji)"""
+        if self.exact:
+            return int(np.count_nonzero(self.means > threshold))
+        positions, means = self._positions()
+        return int(round(self.count - np.interp(threshold, means, positions)))
+
+    def _positions(self):
+        # Centroid leży w środku swojej masy; min i max domykają rozkład
+        order = np.argsort(self.means)
+        means, weights = self.means[order], self.weights[order]
+        centers = np.cumsum(weights) - weights / 2
+        return (np.concatenate([[0.0], centers, [self.count]]),
+                np.concatenate([[self.minimum], means, [self.maximum]]))
+
+
+class GroupTotals:
+    """Sumy, liczności niepustych wartości i liczba wierszy w grupach jednej kolumny"""
+
+    def __init__(self, table):
+        self.table = table
+
+    @classmethod
+    def from_frame(cls, chunk, key, columns):
+        grouped = chunk.groupby(key, sort=False)
+        table = grouped[list(columns)].agg(['sum', 'count'])
+        table[('rows', 'size')] = grouped.size()
+        return cls(table)
+
+    def merge(self, other):
+        return GroupTotals(self.table.add(other.table, fill_value=0))
+
+    def sums(self, column):
+        return self.table[(column, 'sum')].sort_index()
+
+    def counts(self, column):
+        # Po scaleniu z brakującymi grupami liczności mogą być typu float
+        return self.table[(column, 'count')].sort_index().astype(np.int64)
+
+    def means(self, column):
+        return self.sums(column) / self.counts(column).replace(0, np.nan)
+
+    def rows(self):
+        return self.table[('rows', 'size')].sort_index().astype(np.int64)
+
+
+class EDASummary:
+    """Łączone podsumowanie fragmentu danych (lub całego zbioru po scaleniu)"""
+
+    def __init__(self, rows, columns, moments, sketch, groups, top, top_column):
+        self.rows = rows
+        self.columns = columns
+        self.moments = moments
+        self.sketch = sketch
+        self.groups = groups
+        self.top = top
+        self.top_column = top_column
+
+    def merge(self, other):
+        return EDASummary(
+            self.rows + other.rows,
+            self.columns,
+            self.moments.merge(other.moments),
+            self.sketch.merge(other.sketch),
+            {key: totals.merge(other.groups[key]) for key, totals in self.groups.items()},
+            # Kolejność fragmentów zachowana, więc remisy rozstrzygane jak w nlargest na całości
+            pd.concat([self.top, other.top]).nlargest(max(len(self.top), len(other.top)), self.top_column),
+            self.top_column
+        )
+
+    def _index(self, column):
+        return self.columns.index(column)
+
+    def total(self, column):
+        i = self._index(column)
+        return float(self.moments.mean[i, i] * self.moments.n[i, i])
+
+    def mean(self, column):
+        return float(self.moments.column_mean()[self._index(column)])
+
+    def max(self, column):
+        return float(self.moments.maximum[self._index(column)])
+
+    def min(self, column):
+        return float(self.moments.minimum[self._index(column)])
+
+    def correlations(self):
+        return pd.DataFrame(self.moments.correlation(), index=self.columns, columns=self.columns)
+
+    def group_sums(self, key, column):
+        return self.groups[key].sums(column)
+
+    def group_counts(self, key, column):
+        return self.groups[key].counts(column)
+
+    def group_means(self, key, column):
+        return self.groups[key].means(column)
+
+    def yearly_stats(self, key='Year', sales='Global_Sales', score='Critic_Score'):
+        """Odpowiednik ``groupby(key).agg({sales: [sum, count, mean], score: mean})``"""
+        totals = self.groups[key]
+        return pd.DataFrame({
+            (sales, 'sum'): totals.sums(sales),
+            (sales, 'count'): totals.counts(sales),
+            (sales, 'mean'): totals.means(sales),
+            (score, 'mean'): totals.means(score)
+        }).round(2)
+
+    def group_rows(self, key):
+        return self.groups[key].rows()
+
+    def outliers(self, whisker=1.5):
+        """Próg Q3 + whisker*IQR, liczba outlierów i najlepsze z nich (spośród top-k)"""
+        q1, q3 = self.sketch.quantile(0.25), self.sketch.quantile(0.75)
+        threshold = q3 + whisker * (q3 - q1)
+        top = self.top[self.top[self.top_column] > threshold]
+        return threshold, self.sketch.count_above(threshold), top
+
+
+class EDAEngine:
+    """Jednoprzebiegowe statystyki EDA liczone fragmentami, równolegle w wątkach"""
+
+    NUMERIC_COLUMNS = ['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales',
+                       'Critic_Score', 'User_Score', 'Year']
+
+    # Klucz grupy -> kolumny sumowane w grupach
+    GROUPS = {
+        'Platform': ['Global_Sales'],
+        'Genre': ['Global_Sales'],
+        'Year': ['Global_Sales', 'Critic_Score']
+    }
+
+    def __init__(self, columns=None, groups=None, sketch_column='Global_Sales', top_k=5,
+                 chunk_rows=250000, n_jobs=None, compression=200, exact_limit=1000000):
+        self.columns = list(columns or self.NUMERIC_COLUMNS)
+        self.groups = groups or self.GROUPS
+        self.sketch_column = sketch_column
+        self.top_k = top_k
+        self.chunk_rows = chunk_rows
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.compression = compression
+        self.exact_limit = exact_limit
+
+    def summarize_chunk(self, chunk):
+        return EDASummary(
+            len(chunk),
+            self.columns,
+            CoMoments.from_array(chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)),
+            QuantileSketch.from_values(chunk[self.sketch_column].to_numpy(dtype=np.float64, na_value=np.nan),
+                                       self.compression, self.exact_limit),
+            {key: GroupTotals.from_frame(chunk, key, columns) for key, columns in self.groups.items()},
+            chunk.nlargest(self.top_k, self.sketch_column),
+            self.sketch_column
+        )
+
+    def scan(self, chunks):
+        """Podsumuj strumień fragmentów (np. ``pd.read_csv(..., chunksize=...)``)"""
+        summary = None
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            # Co najwyżej 2*n_jobs fragmentów w pamięci naraz
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(self.summarize_chunk, chunk))
+                if len(pending) >= 2 * self.n_jobs:
+                    summary = self._merge(summary, pending.pop(0).result())
+            for future in pending:
+                summary = self._merge(summary, future.result())
+        if summary is None:
+            raise ValueError("Brak danych do podsumowania")
+        return summary
+
+    def summarize(self, df):
+        return self.scan(df.iloc[start:start + self.chunk_rows] for start in range(0, max(len(df), 1), self.chunk_rows))
+
+    def summarize_csv(self, file_path):
+        return self.scan(pd.read_csv(file_path, chunksize=self.chunk_rows))
+
+    @staticmethod
+    def _merge(summary, partial):
+        return partial if summary is None else summary.merge(partial)
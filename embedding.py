@@ -0,0 +1,93 @@
+"""
+Etap osadzania t-SNE dla dużych zbiorów danych
+
+- graf kNN budowany raz na drzewie (KD-tree) nad próbką punktów-landmarków
+- t-SNE (Barnes-Hut) uczony na gotowym grafie (metric='precomputed'),
+  więc obsługuje znacznie większe próbki niż dokładne wyszukiwanie sąsiadów
+- pozostałe wiersze rzutowane do osadzenia przez interpolację ważoną
+  odległością do najbliższych landmarków z tego samego indeksu
+- wszystko deterministyczne (random_state), wynik cache'owany na dysku
+"""
+
+import hashlib
+import os
+
+import numpy as np
+from sklearn.decomposition import PCA
+from sklearn.manifold import TSNE
+from sklearn.neighbors import NearestNeighbors
+
+# Zmiana sposobu liczenia osadzenia unieważnia cache
+EMBEDDING_VERSION = 2
+
+
+class EmbeddingStage:
+    """t-SNE na próbce z grafem kNN i rzutowaniem wierszy spoza próbki"""
+
+    def __init__(self, sample_size=5000, perplexity=30, n_interpolation_neighbors=10,
+                 random_state=42, cache_dir='.embedding_cache'):
+        self.sample_size = sample_size
+        self.perplexity = perplexity
+        self.n_interpolation_neighbors = n_interpolation_neighbors
+        self.random_state = random_state
+        self.cache_dir = cache_dir
+        self.sample_idx_ = None
+        self.from_cache_ = False
+
+    def fit_transform(self, X):
+        """Zwróć osadzenie 2D dla wszystkich wierszy X"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        cache_path = self._cache_path(X)
+        if cache_path and os.path.exists(cache_path):
+            cached = np.load(cache_path)
+            self.sample_idx_ = cached['sample_idx']
+            self.from_cache_ = True
+            return cached['embedding']
+
+        rng = np.random.RandomState(self.random_state)
+        n_sample = min(self.sample_size, len(X))
+        self.sample_idx_ = np.sort(rng.choice(len(X), n_sample, replace=False))
+        landmarks = X[self.sample_idx_]
+
+        # Jeden indeks drzewiasty: graf kNN dla t-SNE i sąsiedzi do interpolacji
+        perplexity = min(self.perplexity, (n_sample - 1) / 3)
+        n_neighbors = min(n_sample - 1, int(3 * perplexity + 1) + 1)
+        index = NearestNeighbors(n_neighbors=n_neighbors, algorithm='kd_tree').fit(landmarks)
+        # Graf z samym punktem (odległość 0) w każdym wierszu: t-SNE odrzuca pierwszego sąsiada jako
+        # punkt, więc bez niego traciłby najbliższego prawdziwego sąsiada. Odległości zostają
+        # euklidesowe: barnes_hut sam podnosi do kwadratu także graf 'precomputed', jak dla metric='euclidean'
+        knn_graph = index.kneighbors_graph(landmarks, mode='distance')
+
+        # Inicjalizacja PCA jak w sklearn (init='pca' nie działa z 'precomputed')
+        init = PCA(n_components=2, random_state=self.random_state).fit_transform(landmarks)
+        init = init / np.std(init[:, 0]) * 1e-4
+
+        tsne = TSNE(n_components=2, metric='precomputed', init=init, perplexity=perplexity,
+                    method='barnes_hut', random_state=self.random_state)
+        landmark_embedding = tsne.fit_transform(knn_graph)
+
+        embedding = np.empty((len(X), 2))
+        embedding[self.sample_idx_] = landmark_embedding
+
+        rest = np.setdiff1d(np.arange(len(X)), self.sample_idx_, assume_unique=True)
+        if len(rest):
+            k = min(self.n_interpolation_neighbors, n_sample)
+            distances, neighbors = index.kneighbors(X[rest], n_neighbors=k)
+            weights = 1.0 / (distances + 1e-12)
+            weights /= weights.sum(axis=1, keepdims=True)
+            embedding[rest] = np.einsum('ij,ijk->ik', weights, landmark_embedding[neighbors])
+
+        self.from_cache_ = False
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez(cache_path, embedding=embedding, sample_idx=self.sample_idx_)
+
+        return embedding
+
+    def _cache_path(self, X):
+        if not self.cache_dir:
+            return None
+        digest = hashlib.blake2b(X.tobytes(), digest_size=16)
+        digest.update(repr((X.shape, self.sample_size, self.perplexity,
+                            self.n_interpolation_neighbors, self.random_state, EMBEDDING_VERSION)).encode())
+        return os.path.join(self.cache_dir, f"tsne_{digest.hexdigest()}.npz")
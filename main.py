@@ -14,59 +14,80 @@ Ten skrypt zawiera zaawansowane analizy do projektu GameAnalytics:
 7. Network analysis (jeśli aplikowalne)
 """
 
+import os
+import sys
+import time
+
+_import_started = time.perf_counter()
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import KMeans, DBSCAN, AgglomerativeClustering
-from sklearn.decomposition import PCA
-from sklearn.manifold import TSNE
+from sklearn.cluster import DBSCAN, AgglomerativeClustering
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
 from sklearn.ensemble import RandomForestRegressor, IsolationForest
 from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
-from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 from scipy import stats
-from scipy.cluster.hierarchy import dendrogram, linkage
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import warnings
 
+# Moduły wspólne z API (backend/) importowane tak samo jak przez serwer: jako moduły najwyższego poziomu
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from clustering_engine import ClusteringEngine
+from pca_engine import PCAEngine
+from time_series import TrendEngine, fit_trends
+from title_dedup import TitleDeduplicator
+from cluster_quality import ClusterQuality
+from eda import EDAEngine
+from profiling import StageProfiler, profiled_stage
+from segmentation import SegmentationEngine
+
 warnings.filterwarnings('ignore')
 
-# Konfiguracja wizualizacji
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# matplotlib/seaborn (wizualizacje) i t-SNE (embedding) importowane dopiero przy użyciu
+IMPORT_SECONDS = time.perf_counter() - _import_started
 
 
 class GameAnalyticsDataScience:
     """Klasa do zaawansowanej analizy danych gier wideo"""
 
-    def __init__(self):
+    # Powyżej tej liczby próbek silhouette jest przybliżany (tryb 'auto')
+    EXACT_QUALITY_MAX_ROWS = 20000
+
+    # Liczba landmarków uczonych przez t-SNE; pozostałe wiersze są interpolowane
+    TSNE_SAMPLE_SIZE = 5000
+
+    def __init__(self, profile=False, trace_memory=False):
         self.df = None
         self.df_ml = None
         self.scaler = StandardScaler()
         self.models = {}
         self.results = {}
+        # Czas/pamięć etapów; cProfile i tracemalloc tylko na żądanie (kosztowne)
+        self.profiler = StageProfiler(cprofile=profile, trace_memory=trace_memory)
 
-    def load_data(self, file_path=None):
+    @profiled_stage('load_data')
+    def load_data(self, file_path=None, n_games=16000):
         """Załaduj dane z pliku lub wygeneruj symulowane dane"""
         if file_path:
             self.df = pd.read_csv(file_path)
         else:
             # Generowanie symulowanych ale realistycznych danych
-            self._generate_realistic_data()
+            self._generate_realistic_data(n_games)
+
+        # Kanoniczny tytuł: wydania tej samej gry pod nieco innymi nazwami mają jeden Title_ID
+        self.df['Title_ID'] = TitleDeduplicator().fit_transform(self.df['Name'])
 
-        print(f"✅ Załadowano {len(self.df)} gier")
+        print(f"✅ Załadowano {len(self.df)} gier ({self.df['Title_ID'].nunique()} tytułów)")
         print(f"📅 Okres: {self.df['Year'].min()}-{self.df['Year'].max()}")
         print(f"🎮 Platformy: {self.df['Platform'].nunique()}")
         print(f"🎯 Gatunki: {self.df['Genre'].nunique()}")
 
-    def _generate_realistic_data(self):
+    def _generate_realistic_data(self, n_games=16000):
         """Generuj realistyczne dane gier bazując na rzeczywistych trendach"""
         np.random.seed(42)
-        n_games = 16000
 
         # Definicje platform z historycznymi okresami popularności
         platform_data = {
@@ -193,6 +214,9 @@ class GameAnalyticsDataScience:
         # Modyfikatory czasowe (wzrost rynku)
         year_mods = {year: 1 + (year - 1980) * 0.02 for year in range(1980, 2016)}
 
+        # Percentyle sprzedaży z rang (to samo co stats.percentileofscore, ale O(n log n))
+        base_percentiles = stats.rankdata(base_sales) / n_games * 100
+
         global_sales = []
         na_sales = []
         eu_sales = []
@@ -250,7 +274,7 @@ class GameAnalyticsDataScience:
             global_sales.append(global_sale)
 
             # Generuj oceny z korelacją do sprzedaży
-            sales_percentile = min(99, max(1, stats.percentileofscore(base_sales, base_sales[i])))
+            sales_percentile = min(99, max(1, base_percentiles[i]))
 
             # Ocena krytyka (korelacja ze sprzedażą ale nie perfekcyjna)
             critic_base = 50 + (sales_percentile / 100) * 35 + np.random.normal(0, 8)
@@ -278,49 +302,53 @@ class GameAnalyticsDataScience:
             'User_Score': user_scores
         })
 
-    def explore_data(self):
-        """Eksploracyjna analiza danych"""
+    @profiled_stage('explore_data')
+    def explore_data(self, chunk_rows=250000, n_jobs=None):
+        """Eksploracyjna analiza danych
+
+        Wszystkie statystyki z jednego przebiegu po danych (EDAEngine):
+        fragmenty po chunk_rows wierszy, liczone równolegle w n_jobs wątkach
+        """
         print("🔍 EKSPLORACYJNA ANALIZA DANYCH")
         print("=" * 50)
 
+        with self.profiler.stage('single_pass'):
+            summary = EDAEngine(chunk_rows=chunk_rows, n_jobs=n_jobs).summarize(self.df)
+        total_sales = summary.total('Global_Sales')
+
         # Podstawowe statystyki
         print("\n📊 PODSTAWOWE STATYSTYKI:")
-        print(f"Łączna liczba gier: {len(self.df):,}")
-        print(f"Łączna sprzedaż: {self.df['Global_Sales'].sum():.2f}M")
-        print(f"Średnia sprzedaż na grę: {self.df['Global_Sales'].mean():.2f}M")
-        print(f"Mediana sprzedaży: {self.df['Global_Sales'].median():.2f}M")
-        print(f"Najlepiej sprzedająca się gra: {self.df['Global_Sales'].max():.2f}M")
+        print(f"Łączna liczba gier: {summary.rows:,}")
+        print(f"Łączna sprzedaż: {total_sales:.2f}M")
+        print(f"Średnia sprzedaż na grę: {summary.mean('Global_Sales'):.2f}M")
+        print(f"Mediana sprzedaży: {summary.sketch.quantile(0.5):.2f}M")
+        print(f"Najlepiej sprzedająca się gra: {summary.max('Global_Sales'):.2f}M")
 
         # Rozkład platform
         print("\n🎮 TOP 10 PLATFORM:")
-        platform_sales = self.df.groupby('Platform')['Global_Sales'].sum().sort_values(ascending=False)
+        platform_sales = summary.group_sums('Platform', 'Global_Sales').sort_values(ascending=False)
         for platform, sales in platform_sales.head(10).items():
-            print(f"{platform}: {sales:.2f}M ({sales / self.df['Global_Sales'].sum() * 100:.1f}%)")
+            print(f"{platform}: {sales:.2f}M ({sales / total_sales * 100:.1f}%)")
 
         # Rozkład gatunków
         print("\n🎯 ROZKŁAD GATUNKÓW:")
-        genre_sales = self.df.groupby('Genre')['Global_Sales'].sum().sort_values(ascending=False)
+        genre_sales = summary.group_sums('Genre', 'Global_Sales').sort_values(ascending=False)
         for genre, sales in genre_sales.items():
-            print(f"{genre}: {sales:.2f}M ({sales / self.df['Global_Sales'].sum() * 100:.1f}%)")
+            print(f"{genre}: {sales:.2f}M ({sales / total_sales * 100:.1f}%)")
 
         # Analiza temporalna
         print("\n📅 TRENDY CZASOWE:")
-        yearly_stats = self.df.groupby('Year').agg({
-            'Global_Sales': ['sum', 'count', 'mean'],
-            'Critic_Score': 'mean'
-        }).round(2)
+        yearly_stats = summary.yearly_stats()
 
         print("Najlepsze lata (sprzedaż):")
-        year_sales = self.df.groupby('Year')['Global_Sales'].sum().sort_values(ascending=False)
+        year_sales = summary.group_sums('Year', 'Global_Sales').sort_values(ascending=False)
+        year_games = summary.group_rows('Year')
         for year, sales in year_sales.head(5).items():
-            games_count = len(self.df[self.df['Year'] == year])
-            print(f"{year}: {sales:.2f}M ({games_count} gier)")
+            print(f"{year}: {sales:.2f}M ({year_games[year]} gier)")
 
         # Korelacje
         print("\n🔗 KORELACJE MIĘDZY ZMIENNYMI:")
-        numeric_cols = ['Global_Sales', 'NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales',
-                        'Critic_Score', 'User_Score', 'Year']
-        corr_matrix = self.df[numeric_cols].corr()
+        corr_matrix = summary.correlations()
 
         # Najsilniejsze korelacje
         print("Najsilniejsze korelacje (>0.5):")
@@ -332,33 +360,51 @@ class GameAnalyticsDataScience:
 
         # Outliers
         print("\n🎯 ANALIZA OUTLIERÓW:")
-        Q1 = self.df['Global_Sales'].quantile(0.25)
-        Q3 = self.df['Global_Sales'].quantile(0.75)
-        IQR = Q3 - Q1
-        outlier_threshold = Q3 + 1.5 * IQR
-
-        outliers = self.df[self.df['Global_Sales'] > outlier_threshold]
-        print(f"Liczba outlierów (>Q3+1.5*IQR): {len(outliers)}")
+        outlier_threshold, outlier_count, top_outliers = summary.outliers(whisker=1.5)
+        print(f"Liczba outlierów (>Q3+1.5*IQR): {outlier_count}")
         print("Top 5 outlierów:")
-        for _, game in outliers.nlargest(5, 'Global_Sales').iterrows():
+        for _, game in top_outliers.iterrows():
             print(f"  {game['Name']}: {game['Global_Sales']:.2f}M ({game['Platform']}, {game['Year']})")
 
-        return {
+        # Liczność i średnia sprzedaż gatunków (dla wizualizacji) z tego samego przebiegu
+        genre_stats = pd.DataFrame({
+            'avg_sales': summary.group_means('Genre', 'Global_Sales'),
+            'count': summary.group_counts('Genre', 'Global_Sales')
+        }).round(2)
+
+        self.results['eda'] = {
             'basic_stats': yearly_stats,
             'correlations': corr_matrix,
-            'outliers': outliers,
+            'outliers': self.df[self.df['Global_Sales'] > outlier_threshold],
             'platform_breakdown': platform_sales,
-            'genre_breakdown': genre_sales
+            'genre_breakdown': genre_sales,
+            'genre_stats': genre_stats
         }
 
-    def advanced_clustering(self):
-        """Zaawansowana analiza klastrowania"""
+        return self.results['eda']
+
+    @profiled_stage('advanced_clustering')
+    def advanced_clustering(self, quality_mode='auto', clustering_method='auto', warm_start=False):
+        """Zaawansowana analiza klastrowania
+
+        quality_mode: 'exact', 'approx' lub 'auto' (przybliżone metryki
+        powyżej EXACT_QUALITY_MAX_ROWS próbek)
+        clustering_method: 'full', 'elkan', 'minibatch' lub 'auto' (mini-batch
+        K-means dla dużych zbiorów, patrz ClusteringEngine)
+        warm_start: K-means dla K startuje z centroidów dopasowanych dla K-1
+        """
         print("\n🧮 ZAAWANSOWANA ANALIZA KLASTROWANIA")
         print("=" * 50)
 
         # Przygotowanie danych
         self._prepare_ml_data()
 
+        # Metryki jakości liczone raz per wektor etykiet (cache w ClusterQuality)
+        if quality_mode == 'auto':
+            quality_mode = 'exact' if len(self.X_scaled) <= self.EXACT_QUALITY_MAX_ROWS else 'approx'
+        quality = ClusterQuality(self.X_scaled, mode=quality_mode)
+        print(f"Tryb metryk jakości: {quality_mode}")
+
         # Testowanie różnych liczb klastrów dla K-means
         print("\n🔍 OPTYMALIZACJA LICZBY KLASTRÓW:")
         k_range = range(2, 11)
@@ -366,15 +412,22 @@ class GameAnalyticsDataScience:
         silhouette_scores = []
         calinski_scores = []
         davies_bouldin_scores = []
+        kmeans_fits = {}
+        previous_centers = None
 
         for k in k_range:
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(self.X_scaled)
-
+            with self.profiler.stage(f'kmeans_k{k}'):
+                kmeans = ClusteringEngine(n_clusters=k, method=clustering_method, n_init=10)
+                cluster_labels = kmeans.fit_predict(self.X_scaled, init=previous_centers if warm_start else None)
+            kmeans_fits[k] = kmeans
+            previous_centers = kmeans.cluster_centers_
+
+            with self.profiler.stage(f'quality_k{k}'):
+                metrics = quality.evaluate(cluster_labels)
             inertias.append(kmeans.inertia_)
-            silhouette_scores.append(silhouette_score(self.X_scaled, cluster_labels))
-            calinski_scores.append(calinski_harabasz_score(self.X_scaled, cluster_labels))
-            davies_bouldin_scores.append(davies_bouldin_score(self.X_scaled, cluster_labels))
+            silhouette_scores.append(metrics['silhouette'])
+            calinski_scores.append(metrics['calinski_harabasz'])
+            davies_bouldin_scores.append(metrics['davies_bouldin'])
 
         # Znalezienie optymalnej liczby klastrów
         optimal_k_silhouette = k_range[np.argmax(silhouette_scores)]
@@ -387,10 +440,13 @@ class GameAnalyticsDataScience:
 
         # Użyj najczęściej wskazywanej wartości
         optimal_k = optimal_k_silhouette
+        print(f"Metoda K-means: {kmeans_fits[optimal_k].method_}{' (warm start)' if warm_start else ''}, "
+              f"łączny czas dopasowań: {sum(fit.fit_seconds_ for fit in kmeans_fits.values()):.2f}s")
 
         # Różne algorytmy klastrowania
+        # K-means dla optymalnego K jest już dopasowany w pętli optymalizacji
         clustering_algorithms = {
-            'KMeans': KMeans(n_clusters=optimal_k, random_state=42, n_init=10),
+            'KMeans': kmeans_fits[optimal_k],
             'DBSCAN': DBSCAN(eps=0.5, min_samples=5),
             'AgglomerativeClustering': AgglomerativeClustering(n_clusters=optimal_k)
         }
@@ -400,16 +456,22 @@ class GameAnalyticsDataScience:
         for name, algorithm in clustering_algorithms.items():
             print(f"\n🎯 {name}:")
 
-            labels = algorithm.fit_predict(self.X_scaled)
+            with self.profiler.stage(f'fit_{name}'):
+                labels = algorithm.labels_ if name == 'KMeans' else algorithm.fit_predict(self.X_scaled)
 
             # Metryki
             n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
             n_noise = list(labels).count(-1) if -1 in labels else 0
 
             if n_clusters > 1:
-                silhouette_avg = silhouette_score(self.X_scaled, labels)
+                with self.profiler.stage(f'quality_{name}'):
+                    quality_metrics = quality.evaluate(labels)
+                silhouette_avg = quality_metrics['silhouette']
                 print(f"  Liczba klastrów: {n_clusters}")
                 print(f"  Silhouette Score: {silhouette_avg:.3f}")
+                if quality_metrics['silhouette_ci']:
+                    low, high = quality_metrics['silhouette_ci']
+                    print(f"  Silhouette 95% CI: [{low:.3f}, {high:.3f}]")
                 if n_noise > 0:
                     print(f"  Punkty outlier: {n_noise}")
             else:
@@ -450,6 +512,10 @@ class GameAnalyticsDataScience:
                 'metrics': {
                     'n_clusters': n_clusters,
                     'silhouette_score': silhouette_avg if n_clusters > 1 else None,
+                    'silhouette_ci': quality_metrics['silhouette_ci'],
+                    'calinski_harabasz_score': quality_metrics['calinski_harabasz'],
+                    'davies_bouldin_score': quality_metrics['davies_bouldin'],
+                    'quality_mode': quality_metrics['mode'],
                     'n_noise': n_noise
                 }
             }
@@ -457,15 +523,16 @@ class GameAnalyticsDataScience:
         self.results['clustering'] = clustering_results
         return clustering_results
 
+    @profiled_stage('dimensionality_reduction')
     def dimensionality_reduction(self):
         """Analiza redukcji wymiarowości"""
         print("\n📐 ANALIZA REDUKCJI WYMIAROWOŚCI")
         print("=" * 50)
 
-        # PCA
+        # PCA: jedno dopasowanie, widoki obcięte wyprowadzane z tej samej dekompozycji
         print("\n🎯 ANALIZA GŁÓWNYCH KOMPONENTÓW (PCA):")
-        pca = PCA()
-        pca_features = pca.fit_transform(self.X_scaled)
+        with self.profiler.stage('pca'):
+            pca = PCAEngine().fit(self.X_scaled)
 
         # Wariancja wyjaśniona
         explained_variance_ratio = pca.explained_variance_ratio_
@@ -476,12 +543,13 @@ class GameAnalyticsDataScience:
             print(f"  PC{i + 1}: {explained_variance_ratio[i]:.3f} ({cumulative_variance[i]:.3f} skumulowane)")
 
         # Liczba komponentów dla 90% wariancji
-        n_components_90 = np.argmax(cumulative_variance >= 0.9) + 1
+        n_components_90 = pca.n_components_for(0.9)
         print(f"\nLiczba komponentów dla 90% wariancji: {n_components_90}")
 
-        # PCA z optymalną liczbą komponentów
-        pca_optimal = PCA(n_components=min(3, n_components_90))
-        pca_features_optimal = pca_optimal.fit_transform(self.X_scaled)
+        # Projekcje na optymalną liczbę komponentów (bez ponownego dopasowania)
+        n_optimal = min(3, n_components_90)
+        pca_features_optimal = pca.transform(self.X_scaled, n_components=n_optimal)
+        self.models['pca'] = pca
 
         # Zapisz wyniki PCA
         for i in range(pca_features_optimal.shape[1]):
@@ -490,9 +558,9 @@ class GameAnalyticsDataScience:
         # Analiza loadings
         print("\n📊 ANALIZA LOADINGS (TOP 3 KOMPONENTY):")
         feature_names = self.feature_names
-        for i in range(min(3, pca_optimal.n_components_)):
-            print(f"\nPC{i + 1} (wyjaśnia {pca_optimal.explained_variance_ratio_[i]:.1%} wariancji):")
-            loadings = pca_optimal.components_[i]
+        for i in range(n_optimal):
+            print(f"\nPC{i + 1} (wyjaśnia {explained_variance_ratio[i]:.1%} wariancji):")
+            loadings = pca.components_[i]
             feature_importance = [(feature_names[j], abs(loadings[j])) for j in range(len(feature_names))]
             feature_importance.sort(key=lambda x: x[1], reverse=True)
 
@@ -500,24 +568,21 @@ class GameAnalyticsDataScience:
                 direction = "+" if loadings[feature_names.index(feature)] > 0 else "-"
                 print(f"  {direction}{feature}: {importance:.3f}")
 
-        # t-SNE (na próbce danych)
+        # t-SNE: graf kNN na próbce landmarków, reszta wierszy rzutowana
         print("\n🎯 t-SNE:")
-        sample_size = min(1000, len(self.df_ml))
-        if len(self.df_ml) > sample_size:
-            sample_idx = np.random.choice(len(self.df_ml), sample_size, replace=False)
-            X_sample = self.X_scaled[sample_idx]
-            df_sample = self.df_ml.iloc[sample_idx].copy()
-        else:
-            X_sample = self.X_scaled
-            df_sample = self.df_ml.copy()
-
-        tsne = TSNE(n_components=2, random_state=42, perplexity=min(30, sample_size // 4))
-        tsne_features = tsne.fit_transform(X_sample)
+        from embedding import EmbeddingStage
+        embedding_stage = EmbeddingStage(sample_size=self.TSNE_SAMPLE_SIZE, random_state=42)
+        with self.profiler.stage('tsne'):
+            tsne_features = embedding_stage.fit_transform(self.X_scaled)
 
-        df_sample['tSNE1'] = tsne_features[:, 0]
-        df_sample['tSNE2'] = tsne_features[:, 1]
+        self.df_ml['tSNE1'] = tsne_features[:, 0]
+        self.df_ml['tSNE2'] = tsne_features[:, 1]
+        df_sample = self.df_ml.iloc[embedding_stage.sample_idx_].copy()
+        sample_size = len(df_sample)
 
-        print(f"t-SNE wykonane na próbce {sample_size} gier")
+        print(f"t-SNE wykonane na próbce {sample_size} gier, "
+              f"{len(self.df_ml) - sample_size} rzutowanych przez interpolację kNN"
+              f"{' (z cache)' if embedding_stage.from_cache_ else ''}")
 
         # # UMAP (jeśli dostępne)
         # try:
@@ -537,13 +602,14 @@ class GameAnalyticsDataScience:
                 'explained_variance_ratio': explained_variance_ratio,
                 'cumulative_variance': cumulative_variance,
                 'n_components_90': n_components_90,
-                'loadings': pca_optimal.components_
+                'loadings': pca.components_[:n_optimal]
             },
             'tsne_sample': df_sample
         }
 
         return self.results['dimensionality_reduction']
 
+    @profiled_stage('predictive_modeling')
     def predictive_modeling(self):
         """Zaawansowane modelowanie predykcyjne"""
         print("\n🤖 ZAAWANSOWANE MODELOWANIE PREDYKCYJNE")
@@ -576,7 +642,8 @@ class GameAnalyticsDataScience:
             print(f"\n🎯 {name}:")
 
             # Trenowanie
-            model.fit(X_train, y_train)
+            with self.profiler.stage(f'fit_{name}'):
+                model.fit(X_train, y_train)
 
             # Predykcje
             y_train_pred = model.predict(X_train)
@@ -596,7 +663,8 @@ class GameAnalyticsDataScience:
             print(f"  RMSE (test): {test_rmse:.4f}")
 
             # Cross-validation
-            cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='r2')
+            with self.profiler.stage(f'cv_{name}'):
+                cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='r2')
             print(f"  CV R² średnie: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
 
             # Feature importance
@@ -648,18 +716,21 @@ class GameAnalyticsDataScience:
         self.results['predictive_modeling'] = model_results
         return model_results
 
+    @profiled_stage('anomaly_detection')
     def anomaly_detection(self):
         """Wykrywanie anomalii w danych"""
         print("\n🚨 WYKRYWANIE ANOMALII")
         print("=" * 50)
 
         # Isolation Forest
-        isolation_forest = IsolationForest(contamination=0.1, random_state=42)
-        anomaly_labels = isolation_forest.fit_predict(self.X_scaled)
-        anomaly_scores = isolation_forest.decision_function(self.X_scaled)
+        with self.profiler.stage('isolation_forest'):
+            isolation_forest = IsolationForest(contamination=0.1, random_state=42)
+            anomaly_labels = isolation_forest.fit_predict(self.X_scaled)
+            anomaly_scores = isolation_forest.decision_function(self.X_scaled)
+        self.models['isolation_forest'] = isolation_forest
 
         # Statystyki anomalii
-        n_anomalies = sum(anomaly_labels == -1)
+        n_anomalies = int(np.count_nonzero(anomaly_labels == -1))
         anomaly_percentage = n_anomalies / len(self.df_ml) * 100
 
         print(f"🔍 Wykryte anomalie: {n_anomalies} ({anomaly_percentage:.2f}%)")
@@ -688,56 +759,86 @@ class GameAnalyticsDataScience:
                   f"({game['Platform']}, {game['Genre']}, {game['Year']}) "
                   f"Score: {game['anomaly_score']:.3f}")
 
-        # Analiza anomalii według kategorii
+        # Analiza anomalii według kategorii (jedna tabela dla wszystkich wymiarów)
         print("\n📈 ROZKŁAD ANOMALII WEDŁUG KATEGORII:")
+        with self.profiler.stage('category_breakdown'):
+            category_rates = self._anomaly_rates_by_category()
 
         print("  Platformy z największą liczbą anomalii:")
-        platform_anomalies = anomalies['Platform'].value_counts().head(5)
-        for platform, count in platform_anomalies.items():
-            total_platform = len(self.df_ml[self.df_ml['Platform'] == platform])
-            percentage = count / total_platform * 100
-            print(f"    {platform}: {count} anomalii ({percentage:.1f}% gier na platformie)")
+        platform_rates = category_rates[category_rates['dimension'] == 'Platform']
+        for _, row in platform_rates.nlargest(5, 'anomalies').iterrows():
+            print(f"    {row['category']}: {row['anomalies']} anomalii ({row['anomaly_rate']:.1f}% gier na platformie)")
 
         print("  Gatunki z największą liczbą anomalii:")
-        genre_anomalies = anomalies['Genre'].value_counts().head(5)
-        for genre, count in genre_anomalies.items():
-            total_genre = len(self.df_ml[self.df_ml['Genre'] == genre])
-            percentage = count / total_genre * 100
-            print(f"    {genre}: {count} anomalii ({percentage:.1f}% gier gatunku)")
+        genre_rates = category_rates[category_rates['dimension'] == 'Genre']
+        for _, row in genre_rates.nlargest(5, 'anomalies').iterrows():
+            print(f"    {row['category']}: {row['anomalies']} anomalii ({row['anomaly_rate']:.1f}% gier gatunku)")
 
         # Statistical outliers vs ML anomalies
         print("\n🔬 PORÓWNANIE: OUTLIERS STATYSTYCZNE vs ANOMALIE ML:")
 
-        # Outliers statystyczne (IQR method)
-        Q1 = self.df_ml['Global_Sales'].quantile(0.25)
-        Q3 = self.df_ml['Global_Sales'].quantile(0.75)
+        # Outliers statystyczne (IQR method) jako maska logiczna
+        global_sales = self.df_ml['Global_Sales'].to_numpy()
+        Q1, Q3 = np.quantile(global_sales, [0.25, 0.75])
         IQR = Q3 - Q1
-        stat_outliers = self.df_ml[
-            (self.df_ml['Global_Sales'] < Q1 - 1.5 * IQR) |
-            (self.df_ml['Global_Sales'] > Q3 + 1.5 * IQR)
-            ]
+        stat_outlier_mask = (global_sales < Q1 - 1.5 * IQR) | (global_sales > Q3 + 1.5 * IQR)
+        n_stat_outliers = int(stat_outlier_mask.sum())
 
-        print(f"  Outliers statystyczne: {len(stat_outliers)} ({len(stat_outliers) / len(self.df_ml) * 100:.2f}%)")
+        print(f"  Outliers statystyczne: {n_stat_outliers} ({n_stat_outliers / len(self.df_ml) * 100:.2f}%)")
         print(f"  Anomalie ML: {n_anomalies} ({anomaly_percentage:.2f}%)")
 
         # Overlap między metodami
-        overlap = set(stat_outliers.index) & set(anomalies.index)
-        print(f"  Pokrywanie się metod: {len(overlap)} gier")
+        overlap = int((stat_outlier_mask & self.df_ml['is_anomaly'].to_numpy()).sum())
+        print(f"  Pokrywanie się metod: {overlap} gier")
 
         self.results['anomaly_detection'] = {
             'anomalies': anomalies,
             'normal_data': normal_data,
+            'category_rates': category_rates,
             'stats': {
                 'n_anomalies': n_anomalies,
                 'anomaly_percentage': anomaly_percentage,
-                'overlap_with_statistical': len(overlap)
+                'overlap_with_statistical': overlap
             }
         }
 
         return self.results['anomaly_detection']
 
-    def time_series_analysis(self):
-        """Analiza szeregów czasowych"""
+    def _anomaly_rates_by_category(self, columns=('Platform', 'Genre', 'Publisher')):
+        """Liczba, odsetek i średni score anomalii per kategoria (bincount na kodach)"""
+        is_anomaly = self.df_ml['is_anomaly'].to_numpy(dtype=np.float64)
+        scores = self.df_ml['anomaly_score'].to_numpy()
+
+        tables = []
+        for column in columns:
+            codes, categories = pd.factorize(self.df_ml[column], use_na_sentinel=False)
+            n_categories = len(categories)
+            games = np.bincount(codes, minlength=n_categories)
+            anomalies = np.bincount(codes, weights=is_anomaly, minlength=n_categories)
+            score_sums = np.bincount(codes, weights=scores, minlength=n_categories)
+            anomaly_score_sums = np.bincount(codes, weights=scores * is_anomaly, minlength=n_categories)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tables.append(pd.DataFrame({
+                    'dimension': column,
+                    'category': categories,
+                    'games': games,
+                    'anomalies': anomalies.astype(int),
+                    'anomaly_rate': anomalies / games * 100,
+                    'mean_score': score_sums / games,
+                    'mean_anomaly_score': anomaly_score_sums / anomalies
+                }))
+
+        return pd.concat(tables, ignore_index=True)
+
+    @profiled_stage('time_series_analysis')
+    def time_series_analysis(self, horizon=5):
+        """Analiza szeregów czasowych
+
+        Roczne szeregi platform, gatunków i wydawców jako macierze rok×encja
+        (TrendEngine): trendy liniowe i prognozy na horizon lat liczone
+        wektorowo dla wszystkich kolumn naraz
+        """
         print("\n📈 ANALIZA SZEREGÓW CZASOWYCH")
         print("=" * 50)
 
@@ -758,23 +859,17 @@ class GameAnalyticsDataScience:
         print(f"  Najgorszy rok (sprzedaż): {yearly_data.loc[yearly_data['Total_Sales'].idxmin(), 'Year']} "
               f"({yearly_data['Total_Sales'].min():.2f}M)")
 
-        # Analiza trendów
-        from scipy.stats import linregress
-
-        # Trend sprzedaży
-        years = yearly_data['Year'].values
-        sales_slope, sales_intercept, sales_r, sales_p, _ = linregress(years, yearly_data['Total_Sales'])
+        # Analiza trendów: obie regresje jednym wywołaniem (brakujące oceny maskowane)
+        yearly_trends = fit_trends(yearly_data[['Total_Sales', 'Avg_Critic']].to_numpy(), yearly_data['Year'])
+        sales_slope, sales_r, sales_p = (yearly_trends[name][0] for name in ('slope', 'r', 'p_value'))
         print(f"\n📈 TREND SPRZEDAŻY:")
         print(f"  Nachylenie trendu: {sales_slope:.2f}M/rok")
         print(f"  Korelacja: {sales_r:.3f}")
         print(f"  P-value: {sales_p:.6f}")
 
         # Trend jakości gier
-        valid_scores = yearly_data.dropna(subset=['Avg_Critic'])
-        if len(valid_scores) > 5:
-            score_slope, score_intercept, score_r, score_p, _ = linregress(
-                valid_scores['Year'], valid_scores['Avg_Critic']
-            )
+        if yearly_trends['n'][1] > 5:
+            score_slope, score_r, score_p = (yearly_trends[name][1] for name in ('slope', 'r', 'p_value'))
             print(f"\n⭐ TREND JAKOŚCI (Critic Score):")
             print(f"  Nachylenie trendu: {score_slope:.3f} punktów/rok")
             print(f"  Korelacja: {score_r:.3f}")
@@ -797,15 +892,10 @@ class GameAnalyticsDataScience:
                   f"{stats['Games_Count']:.0f} gier/rok, "
                   f"ocena {stats['Avg_Critic']:.1f}")
 
-        # Platform lifecycle analysis
+        # Platform lifecycle analysis (z macierzy rok×platforma)
+        trend_engine = TrendEngine(self.df)
         print(f"\n🎮 ANALIZA CYKLI ŻYCIA PLATFORM:")
-        platform_years = self.df.groupby('Platform').agg({
-            'Year': ['min', 'max', 'count'],
-            'Global_Sales': 'sum'
-        }).round(2)
-
-        platform_years.columns = ['Start_Year', 'End_Year', 'Games_Count', 'Total_Sales']
-        platform_years['Lifespan'] = platform_years['End_Year'] - platform_years['Start_Year'] + 1
+        platform_years = trend_engine.lifecycle('Platform').round({'Total_Sales': 2})
         platform_years = platform_years.sort_values('Total_Sales', ascending=False)
 
         print("  Top platformy według długości życia:")
@@ -817,29 +907,30 @@ class GameAnalyticsDataScience:
 
         # Genre evolution analysis
         print(f"\n🎯 EWOLUCJA GATUNKÓW:")
-        genre_evolution = self.df.groupby(['Year', 'Genre'])['Global_Sales'].sum().reset_index()
-
-        # Znajdź najbardziej rosnące/spadające gatunki
-        early_period = self.df[self.df['Year'] <= 1995].groupby('Genre')['Global_Sales'].sum()
-        late_period = self.df[self.df['Year'] >= 2005].groupby('Genre')['Global_Sales'].sum()
-
-        # Normalizacja do porównania okresów
-        early_total = early_period.sum()
-        late_total = late_period.sum()
-
-        genre_change = {}
-        for genre in set(early_period.index) & set(late_period.index):
-            early_share = early_period[genre] / early_total * 100
-            late_share = late_period[genre] / late_total * 100
-            change = late_share - early_share
-            genre_change[genre] = change
+        genre_change = trend_engine.share_change('Genre', early_end=1995, late_start=2005)
 
         print("  Największe zmiany udziału gatunków (1980-1995 vs 2005-2015):")
-        sorted_changes = sorted(genre_change.items(), key=lambda x: x[1], reverse=True)
-        for genre, change in sorted_changes[:5]:
+        for genre, change in genre_change.head(5).items():
             direction = "wzrost" if change > 0 else "spadek"
             print(f"    {genre}: {abs(change):.1f}pp {direction}")
 
+        # Trendy i prognozy per encja (wszystkie kolumny macierzy naraz)
+        entity_trends = {}
+        for entity in ('Platform', 'Genre', 'Publisher'):
+            with self.profiler.stage(f'trends_{entity.lower()}'):
+                entity_trends[entity] = trend_engine.trends(entity, horizon=horizon)
+
+        print(f"\n📉 NAJSZYBCIEJ ROSNĄCE / SPADAJĄCE (nachylenie trendu, M/rok):")
+        for entity, trends in entity_trends.items():
+            slopes = trends['table']['Slope'].dropna().sort_values()
+            print(f"  {entity}: ↑ {slopes.index[-1]} ({slopes.iloc[-1]:+.2f}), "
+                  f"↓ {slopes.index[0]} ({slopes.iloc[0]:+.2f})")
+
+        total = trend_engine.total(horizon=horizon)
+        print(f"\n🔮 PROGNOZA SPRZEDAŻY (wygładzanie wykładnicze Holta, {horizon} lat):")
+        for year, sales in total['forecast'].items():
+            print(f"  {year}: {sales:.2f}M")
+
         self.results['time_series'] = {
             'yearly_data': yearly_data,
             'trends': {
@@ -849,11 +940,14 @@ class GameAnalyticsDataScience:
             },
             'decade_stats': decade_stats,
             'platform_lifecycle': platform_years,
-            'genre_evolution': genre_change
+            'genre_evolution': genre_change.to_dict(),
+            'entity_trends': entity_trends,
+            'sales_forecast': total['forecast']
         }
 
         return self.results['time_series']
 
+    @profiled_stage('market_segmentation')
     def market_segmentation(self):
         """Zaawansowana segmentacja rynku"""
         print("\n🎯 ZAAWANSOWANA SEGMENTACJA RYNKU")
@@ -885,40 +979,29 @@ class GameAnalyticsDataScience:
         # Segmentacja regionalna
         print("\n🌍 SEGMENTACJA REGIONALNA:")
 
-        # Oblicz dominujący region dla każdej gry
-        regional_cols = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
-        self.df['Dominant_Region'] = self.df[regional_cols].idxmax(axis=1)
-        self.df['Dominant_Region'] = self.df['Dominant_Region'].map({
-            'NA_Sales': 'North America',
-            'EU_Sales': 'Europe',
-            'JP_Sales': 'Japan',
-            'Other_Sales': 'Other'
-        })
+        # Kody kategorii liczone raz i współdzielone przez wszystkie segmenty
+        engine = SegmentationEngine(self.df)
 
-        region_analysis = self.df.groupby('Dominant_Region').agg({
-            'Global_Sales': ['count', 'mean', 'sum'],
-            'Genre': lambda x: x.value_counts().index[0],  # Najpopularniejszy gatunek
-            'Platform': lambda x: x.value_counts().index[0]  # Najpopularna platforma
-        })
+        # Dominujący region: argmax na widoku NumPy kolumn regionalnych
+        self.df['Dominant_Region'] = engine.dominant_region_labels()
 
-        for region in region_analysis.index:
-            count = region_analysis.loc[region, ('Global_Sales', 'count')]
-            mean_sales = region_analysis.loc[region, ('Global_Sales', 'mean')]
-            total_sales = region_analysis.loc[region, ('Global_Sales', 'sum')]
-            top_genre = region_analysis.loc[region, ('Genre', '<lambda>')]
-            top_platform = region_analysis.loc[region, ('Platform', '<lambda>')]
+        with self.profiler.stage('regional_dominance'):
+            region_analysis = engine.regional_dominance()
 
-            print(f"  {region}: {count} gier dominujących ({count / len(self.df) * 100:.1f}%)")
-            print(f"    Średnia sprzedaż: {mean_sales:.2f}M")
-            print(f"    Top gatunek: {top_genre}")
-            print(f"    Top platforma: {top_platform}")
+        for region, row in region_analysis.iterrows():
+            print(f"  {region}: {row['games']} gier dominujących ({row['share']:.1f}%)")
+            print(f"    Średnia sprzedaż: {row['mean_sales']:.2f}M")
+            print(f"    Top gatunek: {row['top_genre']}")
+            print(f"    Top platforma: {row['top_platform']}")
 
         # Analiza cross-platform vs exclusive
         print("\n🎮 ANALIZA EKSKLUZYWNOŚCI vs MULTI-PLATFORM:")
 
-        # Znajdź gry z podobnymi nazwami (uproszczona analiza)
-        # W rzeczywistym projekcie użyłbyś bardziej zaawansowanych technik NLP
-        platform_counts = self.df.groupby('Name')['Platform'].nunique()
+        # Dokładne nazwy oraz kanoniczne tytuły (Title_ID): porty i wydania tej samej gry
+        # pod nieco innymi nazwami ("(PS3)", interpunkcja, edycje) liczone razem
+        with self.profiler.stage('multiplatform'):
+            platform_counts = engine.platforms_per_title()
+            title_platform_counts = engine.platforms_per_title_id()
 
         # Gry dostępne na więcej niż jednej platformie (potencjalnie multi-platform)
         multiplatform_threshold = 1  # Więcej niż jedna platforma
@@ -926,46 +1009,50 @@ class GameAnalyticsDataScience:
 
         print(f"  Potencjalnie multi-platform: {len(potential_multiplatform)} tytułów")
         print(f"  Ekskluzywne: {len(platform_counts) - len(potential_multiplatform)} tytułów")
+        title_multiplatform = int((title_platform_counts > multiplatform_threshold).sum())
+        print(f"  Według Title_ID: {title_multiplatform} tytułów multi-platform "
+              f"({len(platform_counts) - len(title_platform_counts)} nazw połączonych)")
 
         # Publisher strategy analysis
         print("\n🏢 ANALIZA STRATEGII WYDAWCÓW:")
 
-        publisher_analysis = self.df.groupby('Publisher').agg({
-            'Global_Sales': ['count', 'mean', 'sum'],
-            'Platform': 'nunique',
-            'Genre': 'nunique',
-            'Critic_Score': 'mean'
-        }).round(2)
-
-        # Filtruj wydawców z co najmniej 10 grami
-        significant_publishers = publisher_analysis[
-            publisher_analysis[('Global_Sales', 'count')] >= 10
-            ].sort_values(('Global_Sales', 'sum'), ascending=False)
+        # Wydawcy z co najmniej 10 grami
+        with self.profiler.stage('publisher_strategies'):
+            significant_publishers = engine.publisher_strategies(min_games=10)
 
         print(f"  Analizowanych wydawców (≥10 gier): {len(significant_publishers)}")
 
-        for publisher in significant_publishers.head(10).index:
-            data = significant_publishers.loc[publisher]
-            games_count = data[('Global_Sales', 'count')]
-            avg_sales = data[('Global_Sales', 'mean')]
-            total_sales = data[('Global_Sales', 'sum')]
-            platforms = data[('Platform', 'nunique')]
-            genres = data[('Genre', 'nunique')]
-            avg_score = data[('Critic_Score', 'mean')]
-
+        for publisher, data in significant_publishers.head(10).iterrows():
             print(f"    {publisher}:")
-            print(f"      {games_count} gier, {platforms} platform, {genres} gatunków")
-            print(f"      Średnia sprzedaż: {avg_sales:.2f}M, łącznie: {total_sales:.1f}M")
-            print(f"      Średnia ocena: {avg_score:.1f}")
+            print(f"      {data['games']} gier, {data['platforms']} platform, {data['genres']} gatunków")
+            print(f"      Średnia sprzedaż: {data['mean_sales']:.2f}M, łącznie: {data['total_sales']:.1f}M")
+            print(f"      Średnia ocena: {data['avg_critic_score']:.1f}")
+
+        # Segment Wydawca × Region
+        print("\n🗺️ WYDAWCA × REGION:")
+
+        with self.profiler.stage('publisher_region'):
+            publisher_region = engine.publisher_region()
+
+        for publisher in significant_publishers.head(5).index:
+            regions = publisher_region.loc[publisher]
+            strongest = regions['sales'].idxmax()
+            print(f"    {publisher}: najsilniejszy region {strongest} "
+                  f"({regions.loc[strongest, 'sales_share']:.1f}% sprzedaży, "
+                  f"{regions.loc[strongest, 'dominant_games']} gier dominujących)")
 
         self.results['market_segmentation'] = {
             'sales_segments': segment_stats,
             'regional_dominance': region_analysis,
-            'publisher_strategies': significant_publishers
+            'publisher_strategies': significant_publishers,
+            'publisher_region': publisher_region,
+            'multiplatform_titles': len(potential_multiplatform),
+            'multiplatform_title_ids': title_multiplatform
         }
 
         return self.results['market_segmentation']
 
+    @profiled_stage('prepare_ml_data')
     def _prepare_ml_data(self):
         """Przygotuj dane do uczenia maszynowego"""
         # Usuń wiersze z brakującymi danymi dla kluczowych kolumn
@@ -1003,6 +1090,7 @@ class GameAnalyticsDataScience:
 
         print(f"✅ Dane ML przygotowane: {len(self.df_ml)} próbek, {len(self.feature_names)} cech")
 
+    @profiled_stage('generate_report')
     def generate_report(self):
         """Generuj kompleksowy raport z analizy"""
         print("\n📋 GENEROWANIE KOMPLEKSOWEGO RAPORTU")
@@ -1038,7 +1126,8 @@ class GameAnalyticsDataScience:
             report['detailed_findings']['clustering'] = {
                 'best_algorithm': best_clustering,
                 'optimal_clusters': self.results['clustering'][best_clustering]['metrics']['n_clusters'],
-                'silhouette_score': self.results['clustering'][best_clustering]['metrics']['silhouette_score']
+                'silhouette_score': self.results['clustering'][best_clustering]['metrics']['silhouette_score'],
+                'silhouette_ci': self.results['clustering'][best_clustering]['metrics']['silhouette_ci']
             }
 
         if 'predictive_modeling' in self.results:
@@ -1093,8 +1182,12 @@ class GameAnalyticsDataScience:
         return report
 
 
-def main():
-    """Główna funkcja uruchamiająca pełną analizę"""
+def main(profile=False, trace_memory=False, clustering_method='auto'):
+    """Główna funkcja uruchamiająca pełną analizę
+
+    profile: cProfile dla każdego etapu, trace_memory: szczyt alokacji (tracemalloc),
+    clustering_method: metoda K-means ('auto', 'full', 'elkan', 'minibatch')
+    """
     print("🎮 GAMEANALYTICS - ZAAWANSOWANA ANALIZA DATA SCIENCE")
     print("=" * 60)
     print("Kompleksowa analiza rynku gier wideo (1980-2015)")
@@ -1102,7 +1195,7 @@ def main():
     print("=" * 60)
 
     # Inicjalizacja analizatora
-    analyzer = GameAnalyticsDataScience()
+    analyzer = GameAnalyticsDataScience(profile=profile, trace_memory=trace_memory)
 
     # Załaduj dane
     print("\n🔄 KROK 1: ŁADOWANIE DANYCH")
@@ -1114,7 +1207,7 @@ def main():
 
     # Zaawansowane klastrowanie
     print("\n🔄 KROK 3: ZAAWANSOWANE KLASTROWANIE")
-    clustering_results = analyzer.advanced_clustering()
+    clustering_results = analyzer.advanced_clustering(clustering_method=clustering_method)
 
     # Redukcja wymiarowości
     print("\n🔄 KROK 4: REDUKCJA WYMIAROWOŚCI")
@@ -1145,6 +1238,13 @@ def main():
     print("Wszystkie wyniki zostały zapisane w analyzer.results")
     print("Raport końcowy dostępny w analyzer.results['final_report']")
 
+    # Raport czasów etapów
+    analyzer.results['profiling'] = analyzer.profiler.report()
+    analyzer.results['profiling']['import_s'] = round(IMPORT_SECONDS, 4)
+    print("\n⏱️ CZASY ETAPÓW:")
+    print(f"Import modułów: {IMPORT_SECONDS:.2f}s")
+    analyzer.profiler.print_summary()
+
     # Opcjonalne: zapisz wyniki do pliku
     try:
         import pickle
@@ -1158,108 +1258,44 @@ def main():
 
 
 # Funkcje pomocnicze do wizualizacji
-def create_advanced_visualizations(analyzer):
-    """Twórz zaawansowane wizualizacje wyników"""
+def create_advanced_visualizations(analyzer, dpi=300, n_jobs=None, path='gameanalytics_advanced_analysis.png'):
+    """Twórz zaawansowane wizualizacje wyników
+
+    Panele korzystają z wyników etapów, renderują się w osobnych procesach
+    i są cache'owane (FigureRenderer); duże wykresy punktowe jako siatki gęstości
+    """
     print("\n🎨 TWORZENIE ZAAWANSOWANYCH WIZUALIZACJI")
     print("=" * 50)
 
-    fig, axes = plt.subplots(2, 3, figsize=(20, 12))
-    fig.suptitle('GameAnalytics - Zaawansowana Analiza Data Science', fontsize=16, fontweight='bold')
-
-    # 1. Rozkład sprzedaży
-    axes[0, 0].hist(analyzer.df['Global_Sales'], bins=50, alpha=0.7, color='skyblue', edgecolor='black')
-    axes[0, 0].set_title('Rozkład Globalnej Sprzedaży Gier')
-    axes[0, 0].set_xlabel('Sprzedaż (miliony)')
-    axes[0, 0].set_ylabel('Liczba gier')
-    axes[0, 0].set_yscale('log')
-
-    # 2. Trendy czasowe
-    yearly_sales = analyzer.df.groupby('Year')['Global_Sales'].sum()
-    axes[0, 1].plot(yearly_sales.index, yearly_sales.values, marker='o', linewidth=2, markersize=4)
-    axes[0, 1].set_title('Trendy Sprzedaży w Czasie')
-    axes[0, 1].set_xlabel('Rok')
-    axes[0, 1].set_ylabel('Łączna sprzedaż (miliony)')
-    axes[0, 1].grid(True, alpha=0.3)
-
-    # 3. Top platformy
-    platform_sales = analyzer.df.groupby('Platform')['Global_Sales'].sum().sort_values(ascending=True).tail(10)
-    axes[0, 2].barh(range(len(platform_sales)), platform_sales.values, color='lightcoral')
-    axes[0, 2].set_yticks(range(len(platform_sales)))
-    axes[0, 2].set_yticklabels(platform_sales.index)
-    axes[0, 2].set_title('Top 10 Platform - Łączna Sprzedaż')
-    axes[0, 2].set_xlabel('Sprzedaż (miliony)')
-
-    # 4. Gatunki vs Sprzedaż
-    genre_data = analyzer.df.groupby('Genre').agg({
-        'Global_Sales': ['mean', 'count']
-    }).round(2)
-    genre_data.columns = ['avg_sales', 'count']
-
-    scatter = axes[1, 0].scatter(genre_data['count'], genre_data['avg_sales'],
-                                 s=100, alpha=0.7, c=range(len(genre_data)), cmap='viridis')
-    axes[1, 0].set_title('Gatunki: Liczba Gier vs Średnia Sprzedaż')
-    axes[1, 0].set_xlabel('Liczba gier')
-    axes[1, 0].set_ylabel('Średnia sprzedaż (miliony)')
-
-    # Dodaj etykiety gatunków
-    for i, (genre, row) in enumerate(genre_data.iterrows()):
-        axes[1, 0].annotate(genre, (row['count'], row['avg_sales']),
-                            xytext=(5, 5), textcoords='offset points', fontsize=8)
-
-    # 5. Korelacje regionalne
-    regional_cols = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
-    corr_matrix = analyzer.df[regional_cols].corr()
-
-    im = axes[1, 1].imshow(corr_matrix, cmap='coolwarm', vmin=-1, vmax=1)
-    axes[1, 1].set_title('Korelacje Między Regionami')
-    axes[1, 1].set_xticks(range(len(regional_cols)))
-    axes[1, 1].set_yticks(range(len(regional_cols)))
-    axes[1, 1].set_xticklabels([col.replace('_Sales', '') for col in regional_cols])
-    axes[1, 1].set_yticklabels([col.replace('_Sales', '') for col in regional_cols])
-
-    # Dodaj wartości korelacji
-    for i in range(len(regional_cols)):
-        for j in range(len(regional_cols)):
-            axes[1, 1].text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                            ha='center', va='center', fontweight='bold')
-
-    # 6. Analiza anomalii (jeśli dostępna)
-    if 'anomaly_detection' in analyzer.results:
-        anomalies = analyzer.results['anomaly_detection']['anomalies']
-        normal_data = analyzer.results['anomaly_detection']['normal_data']
-
-        axes[1, 2].scatter(normal_data['Critic_Score'], normal_data['Global_Sales'],
-                           alpha=0.5, c='blue', label='Normalne', s=20)
-        axes[1, 2].scatter(anomalies['Critic_Score'], anomalies['Global_Sales'],
-                           alpha=0.8, c='red', label='Anomalie', s=50, marker='^')
-        axes[1, 2].set_title('Wykryte Anomalie')
-        axes[1, 2].set_xlabel('Critic Score')
-        axes[1, 2].set_ylabel('Global Sales')
-        axes[1, 2].legend()
-        axes[1, 2].set_yscale('log')
-    else:
-        # Fallback: scatter plot score vs sales
-        axes[1, 2].scatter(analyzer.df['Critic_Score'], analyzer.df['Global_Sales'],
-                           alpha=0.6, s=20)
-        axes[1, 2].set_title('Critic Score vs Global Sales')
-        axes[1, 2].set_xlabel('Critic Score')
-        axes[1, 2].set_ylabel('Global Sales')
-        axes[1, 2].set_yscale('log')
-
-    plt.tight_layout()
-    plt.savefig('gameanalytics_advanced_analysis.png', dpi=300, bbox_inches='tight')
-    print("📊 Wizualizacje zapisane do: gameanalytics_advanced_analysis.png")
-
-    return fig
+    from visualization import FigureRenderer, panel_data
+
+    renderer = FigureRenderer(dpi=dpi, n_jobs=n_jobs)
+    figure = renderer.compose('GameAnalytics - Zaawansowana Analiza Data Science', panel_data(analyzer), path)
+
+    print(f"🖼️ Panele wyrenderowane: {len(figure['rendered'])}, z cache: {len(figure['cached'])}")
+    print(f"📊 Wizualizacje zapisane do: {path}")
+
+    return figure
 
 
 # Przykład użycia
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='GameAnalytics - analiza data science')
+    parser.add_argument('--profile', action='store_true', help='cProfile dla każdego etapu')
+    parser.add_argument('--trace-memory', action='store_true', help='szczyt alokacji (tracemalloc) dla każdego etapu')
+    parser.add_argument('--no-plots', action='store_true', help='pomiń wizualizacje (bez importu matplotlib/seaborn)')
+    parser.add_argument('--clustering', choices=['auto', 'full', 'elkan', 'minibatch'], default='auto',
+                        help='metoda K-means (auto: mini-batch dla dużych zbiorów)')
+    args = parser.parse_args()
+
     # Uruchom pełną analizę
-    analyzer = main()
+    analyzer = main(profile=args.profile, trace_memory=args.trace_memory, clustering_method=args.clustering)
 
     # Twórz wizualizacje
-    create_advanced_visualizations(analyzer)
+    if not args.no_plots:
+        create_advanced_visualizations(analyzer)
 
     # Wyświetl podsumowanie najważniejszych wyników
     print("\n🏆 NAJWAŻNIEJSZE WYNIKI:")
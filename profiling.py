@@ -0,0 +1,133 @@
+"""
+Pomiar czasu i pamięci etapów analizy GameAnalyticsDataScience
+
+Każdy etap (i ważniejsze pod-kroki) jest mierzony kontekstem
+``profiler.stage(nazwa)``: czas ścienny, czas CPU, zmiana RSS w trakcie
+etapu (``rss_delta_mb``) i szczytowe RSS procesu od startu
+(``process_peak_rss_mb`` - nie maleje, więc nie przypisuje pamięci etapom).
+Opcjonalnie (flagi) dla etapów najwyższego poziomu:
+- cProfile - najdroższe funkcje etapu (czas skumulowany)
+- tracemalloc - szczyt alokacji Pythona w trakcie etapu
+
+Raport jest listą słowników (gotowy do JSON/pickle), a podsumowanie
+drukowane jest jako tabela.
+"""
+
+import cProfile
+import functools
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+def _peak_rss_mb():
+    # ru_maxrss: kilobajty na Linuksie, bajty na macOS
+    divisor = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+
+def _current_rss_mb():
+    # Bieżące RSS z /proc (Linux); None, gdy niedostępne
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+class StageProfiler:
+    """Zbiera pomiary zagnieżdżonych etapów w kolejności wykonania"""
+
+    def __init__(self, cprofile=False, trace_memory=False, top_functions=10):
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.top_functions = top_functions
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        path = '/'.join(self._stack + [name])
+        top_level = not self._stack
+        record = {'stage': path, 'depth': len(self._stack)}
+        self.records.append(record)
+        self._stack.append(name)
+
+        # cProfile i tracemalloc tylko dla etapów najwyższego poziomu
+        # (dwa aktywne profilery naraz nie są dozwolone)
+        profiler = cProfile.Profile() if self.cprofile and top_level else None
+        tracing = self.trace_memory and top_level
+        if tracing:
+            tracemalloc.start()
+
+        rss_start = _current_rss_mb()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            record['wall_s'] = round(time.perf_counter() - wall_start, 4)
+            record['cpu_s'] = round(time.process_time() - cpu_start, 4)
+            rss_end = _current_rss_mb()
+            record['rss_delta_mb'] = round(rss_end - rss_start, 1) if rss_start is not None and rss_end is not None else None
+            record['process_peak_rss_mb'] = round(_peak_rss_mb(), 1)
+            if tracing:
+                record['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+                tracemalloc.stop()
+            if profiler:
+                record['top_functions'] = self._top_functions(profiler)
+            self._stack.pop()
+
+    def _top_functions(self, profiler):
+        stats = pstats.Stats(profiler)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': f"{filename}:{line}({function})",
+                'calls': calls,
+                'total_s': round(total_time, 4),
+                'cumulative_s': round(cumulative_time, 4)
+            }
+            for (filename, line, function), (_, calls, total_time, cumulative_time, _) in rows[:self.top_functions]
+        ]
+
+    def report(self):
+        return {
+            'stages': self.records,
+            'total_wall_s': round(sum(r.get('wall_s', 0) for r in self.records if r['depth'] == 0), 4),
+            'cprofile': self.cprofile,
+            'trace_memory': self.trace_memory
+        }
+
+    def print_summary(self):
+        total = sum(r.get('wall_s', 0) for r in self.records if r['depth'] == 0) or 1.0
+        print(f"{'Etap':<52} {'Czas [s]':>9} {'CPU [s]':>9} {'%':>6} {'ΔRSS [MB]':>10}")
+        print("-" * 90)
+        for record in self.records:
+            label = '  ' * record['depth'] + record['stage'].split('/')[-1]
+            delta = record.get('rss_delta_mb')
+            print(f"{label:<52} {record.get('wall_s', 0):>9.2f} {record.get('cpu_s', 0):>9.2f} "
+                  f"{record.get('wall_s', 0) / total * 100:>6.1f} {'-' if delta is None else f'{delta:+.1f}':>10}")
+        print("-" * 90)
+        print(f"{'RAZEM':<52} {total:>9.2f}")
+        if self.records:
+            print(f"Szczytowe RSS procesu: {max(r.get('process_peak_rss_mb', 0) for r in self.records):.1f} MB")
+
+
+def profiled_stage(name):
+    """Dekorator metody: cały etap mierzony przez self.profiler"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.profiler.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
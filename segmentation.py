@@ -0,0 +1,149 @@
+"""
+Wektoryzowana segmentacja rynku dla GameAnalyticsDataScience
+
+Wszystkie agregaty liczone są na kodach kategorii (``pd.factorize``) przez
+``np.bincount`` - bez lambd Pythona wywoływanych dla każdej grupy:
+- dominujący region gry: argmax na widoku NumPy kolumn regionalnych
+- najczęstsza kategoria w grupie (moda): bincount na parach kodów grupa×kategoria
+- liczba unikalnych wartości w grupie: unikalne pary kodów
+- segment Wydawca × Region: sprzedaż, udział i liczba gier dominujących
+- tytuły wieloplatformowe według kanonicznego ``Title_ID`` (backend/title_dedup.py)
+
+Kody każdej kolumny są liczone raz i współdzielone przez wszystkie segmenty,
+więc koszt rośnie liniowo z liczbą wierszy (miliony wierszy w sekundach).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class SegmentationEngine:
+    """Segmenty rynku liczone na kodach kategorii"""
+
+    REGIONS = {
+        'NA_Sales': 'North America',
+        'EU_Sales': 'Europe',
+        'JP_Sales': 'Japan',
+        'Other_Sales': 'Other'
+    }
+
+    def __init__(self, df):
+        self.df = df
+        self._factorized = {}
+        self._dominant_region = None
+
+    def factorize(self, column):
+        """Kody kategorii (brak wartości -> -1) i etykiety, liczone raz na kolumnę"""
+        if column not in self._factorized:
+            self._factorized[column] = pd.factorize(self.df[column])
+        return self._factorized[column]
+
+    def regional_sales(self):
+        values = self.df[list(self.REGIONS)].to_numpy(dtype=float)
+        return np.nan_to_num(values, nan=0.0)
+
+    def dominant_region(self):
+        """Indeks regionu z największą sprzedażą dla każdej gry (remis: pierwszy region)"""
+        if self._dominant_region is None:
+            values = self.df[list(self.REGIONS)].to_numpy(dtype=float)
+            # Jak idxmax(skipna=True): brakujące wartości nie wygrywają
+            self._dominant_region = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=1)
+        return self._dominant_region
+
+    def dominant_region_labels(self):
+        return pd.Categorical.from_codes(self.dominant_region(), categories=list(self.REGIONS.values()))
+
+    def group_stats(self, group_codes, n_groups, column='Global_Sales'):
+        """Liczba, suma i średnia wartości (bez NaN) w każdej grupie"""
+        values = self.df[column].to_numpy(dtype=float)
+        valid = (group_codes >= 0) & ~np.isnan(values)
+        count = np.bincount(group_codes[valid], minlength=n_groups)
+        total = np.bincount(group_codes[valid], weights=values[valid], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return count, total, total / count
+
+    def group_mode(self, group_codes, n_groups, column):
+        """Najczęstsza wartość ``column`` w każdej grupie (remis: kategoria występująca wcześniej)"""
+        codes, labels = self.factorize(column)
+        n_labels = len(labels)
+        valid = (group_codes >= 0) & (codes >= 0)
+        counts = np.bincount(group_codes[valid].astype(np.int64) * n_labels + codes[valid],
+                             minlength=n_groups * n_labels).reshape(n_groups, n_labels)
+        mode = np.asarray(labels, dtype=object)[counts.argmax(axis=1)]
+        mode[counts.max(axis=1) == 0] = None
+        return mode
+
+    def group_nunique(self, group_codes, n_groups, column):
+        """Liczba unikalnych wartości ``column`` w każdej grupie"""
+        codes, labels = self.factorize(column)
+        n_labels = len(labels)
+        valid = (group_codes >= 0) & (codes >= 0)
+        # Unikalne pary przez hashowanie (pd.unique), bez sortowania jak w np.unique
+        pairs = pd.unique(group_codes[valid].astype(np.int64) * n_labels + codes[valid])
+        return np.bincount(pairs // n_labels, minlength=n_groups)
+
+    def regional_dominance(self):
+        """Gry według dominującego regionu: liczba, sprzedaż, top gatunek i platforma"""
+        region = self.dominant_region()
+        n_regions = len(self.REGIONS)
+        games, total, mean = self.group_stats(region, n_regions)
+
+        table = pd.DataFrame({
+            'games': games,
+            'share': games / len(self.df) * 100,
+            'mean_sales': mean,
+            'total_sales': total,
+            'top_genre': self.group_mode(region, n_regions, 'Genre'),
+            'top_platform': self.group_mode(region, n_regions, 'Platform')
+        }, index=pd.Index(list(self.REGIONS.values()), name='Dominant_Region'))
+        return table[table['games'] > 0]
+
+    def platforms_per_title(self):
+        """Liczba platform dla każdego tytułu (faktoryzowane nazwy zamiast groupby na stringach)"""
+        names, labels = self.factorize('Name')
+        return pd.Series(self.group_nunique(names, len(labels), 'Platform'), index=labels, name='platforms')
+
+    def platforms_per_title_id(self):
+        """Liczba platform dla każdego kanonicznego tytułu (porty pod różnymi nazwami razem)"""
+        titles, labels = self.factorize('Title_ID')
+        return pd.Series(self.group_nunique(titles, len(labels), 'Platform'), index=labels, name='platforms')
+
+    def publisher_strategies(self, min_games=10):
+        """Portfel wydawców z co najmniej ``min_games`` grami, malejąco po sprzedaży"""
+        publishers, labels = self.factorize('Publisher')
+        n_publishers = len(labels)
+        games, total, mean = self.group_stats(publishers, n_publishers)
+        _, _, critic_mean = self.group_stats(publishers, n_publishers, 'Critic_Score')
+
+        table = pd.DataFrame({
+            'games': games,
+            'mean_sales': mean,
+            'total_sales': total,
+            'platforms': self.group_nunique(publishers, n_publishers, 'Platform'),
+            'genres': self.group_nunique(publishers, n_publishers, 'Genre'),
+            'avg_critic_score': critic_mean
+        }, index=pd.Index(labels, name='Publisher')).round(2)
+        return table[table['games'] >= min_games].sort_values('total_sales', ascending=False)
+
+    def publisher_region(self):
+        """Segment Wydawca × Region: sprzedaż, udział w sprzedaży wydawcy i liczba gier dominujących"""
+        publishers, labels = self.factorize('Publisher')
+        n_publishers, n_regions = len(labels), len(self.REGIONS)
+        valid = publishers >= 0
+        codes = publishers[valid]
+
+        sales = self.regional_sales()[valid]
+        region_sales = np.stack([
+            np.bincount(codes, weights=sales[:, r], minlength=n_publishers) for r in range(n_regions)
+        ], axis=1)
+        dominated = np.bincount(codes.astype(np.int64) * n_regions + self.dominant_region()[valid],
+                                minlength=n_publishers * n_regions).reshape(n_publishers, n_regions)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = region_sales / region_sales.sum(axis=1, keepdims=True) * 100
+
+        index = pd.MultiIndex.from_product([labels, list(self.REGIONS.values())], names=['Publisher', 'Region'])
+        return pd.DataFrame({
+            'sales': region_sales.ravel(),
+            'sales_share': share.ravel(),
+            'dominant_games': dominated.ravel()
+        }, index=index)
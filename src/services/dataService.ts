@@ -58,6 +58,10 @@ export interface FeatureImportance {
   importance: number;
 }
 
+// Sections streamed by /api/dashboard; each also has its own endpoint (/api/<section>)
+const DASHBOARD_SECTIONS = ['overview', 'regional', 'publishers', 'clustering', 'pca', 'predictions'] as const;
+type DashboardSection = typeof DASHBOARD_SECTIONS[number];
+
 // Sample data fallback when backend is not available
 const sampleSalesData = [
   { year: "2008", globalSales: 563.2, games: 1487 },
@@ -79,11 +83,71 @@ const sampleTopGames = [
 ];
 
 class DataService {
-  async fetchOverviewData() {
+  private dashboardSections: Map<DashboardSection, Promise<any>> | null = null;
+
+  // One streamed request for every section; each section resolves as soon as its line arrives,
+  // so the first charts render before the slower sections are built
+  private loadDashboard(): Map<DashboardSection, Promise<any>> {
+    if (this.dashboardSections) return this.dashboardSections;
+
+    const resolvers = new Map<string, { resolve: (data: any) => void; reject: (error: Error) => void }>();
+    const sections = new Map<DashboardSection, Promise<any>>();
+    for (const name of DASHBOARD_SECTIONS) {
+      const section = new Promise((resolve, reject) => resolvers.set(name, { resolve, reject }));
+      section.catch(() => undefined);  // sections nobody asked for must not raise unhandled rejections
+      sections.set(name, section);
+    }
+    this.dashboardSections = sections;
+
+    (async () => {
+      const response = await fetch(`${API_BASE_URL}/dashboard`);
+      if (!response.ok || !response.body) throw new Error('Backend not available');
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+          const line = buffer.slice(0, newline).trim();
+          buffer = buffer.slice(newline + 1);
+          if (!line) continue;
+          const message = JSON.parse(line);
+          const resolver = resolvers.get(message.section);
+          if (!resolver) continue;
+          if (message.error) resolver.reject(new Error(message.error));
+          else resolver.resolve(message.data);
+        }
+      }
+      // Settled promises ignore this; only sections missing from the stream are rejected
+      resolvers.forEach(({ reject }) => reject(new Error('Section missing from dashboard stream')));
+    })()
+      .catch((error) => resolvers.forEach(({ reject }) => reject(error)))
+      .finally(() => {
+        // Later page loads stream fresh data
+        this.dashboardSections = null;
+      });
+
+    return sections;
+  }
+
+  // Dashboard stream first, the section's own endpoint if the stream fails
+  private async fetchSection(name: DashboardSection) {
     try {
-      const response = await fetch(`${API_BASE_URL}/overview`);
+      return await this.loadDashboard().get(name);
+    } catch (error) {
+      const response = await fetch(`${API_BASE_URL}/${name}`);
       if (!response.ok) throw new Error('Backend not available');
       return response.json();
+    }
+  }
+
+  async fetchOverviewData() {
+    try {
+      return await this.fetchSection('overview');
     } catch (error) {
       console.log('Using sample data - backend not available');
       return {
@@ -95,9 +159,7 @@ class DataService {
 
   async fetchRegionalData() {
     try {
-      const response = await fetch(`${API_BASE_URL}/regional`);
-      if (!response.ok) throw new Error('Backend not available');
-      return response.json();
+      return await this.fetchSection('regional');
     } catch (error) {
       console.log('Using sample regional data');
       return {
@@ -123,9 +185,7 @@ class DataService {
 
   async fetchPublisherData() {
     try {
-      const response = await fetch(`${API_BASE_URL}/publishers`);
-      if (!response.ok) throw new Error('Backend not available');
-      return response.json();
+      return await this.fetchSection('publishers');
     } catch (error) {
       console.log('Using sample publisher data');
       return {
@@ -155,9 +215,7 @@ class DataService {
 
   async fetchClusteringData() {
     try {
-      const response = await fetch(`${API_BASE_URL}/clustering`);
-      if (!response.ok) throw new Error('Backend not available');
-      return response.json();
+      return await this.fetchSection('clustering');
     } catch (error) {
       console.log('Using sample clustering data');
       return {
@@ -182,9 +240,7 @@ class DataService {
 
   async fetchPCAData() {
     try {
-      const response = await fetch(`${API_BASE_URL}/pca`);
-      if (!response.ok) throw new Error('Backend not available');
-      return response.json();
+      return await this.fetchSection('pca');
     } catch (error) {
       console.log('Using sample PCA data');
       return {
@@ -211,9 +267,7 @@ class DataService {
 
   async fetchPredictionData() {
     try {
-      const response = await fetch(`${API_BASE_URL}/predictions`);
-      if (!response.ok) throw new Error('Backend not available');
-      return response.json();
+      return await this.fetchSection('predictions');
     } catch (error) {
       console.log('Using sample prediction data');
       return {
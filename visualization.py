@@ -0,0 +1,292 @@
+"""
+Równoległe renderowanie wizualizacji GameAnalyticsDataScience
+
+- dane paneli brane z wyników etapów (explore_data, time_series_analysis,
+  anomaly_detection) zamiast ponownych groupby na pełnym zbiorze; brakujące
+  etapy liczone na miejscu
+- panele dostają tylko zagregowane dane (histogram, sumy, siatki gęstości),
+  więc do procesów roboczych nie są kopiowane miliony wierszy
+- duże wykresy punktowe zastępowane siatką gęstości (histogram 2D w skali
+  log, rysowany jako raster) zamiast milionów markerów
+- każdy panel renderowany w osobnym procesie, potem składany w siatkę 2×3
+- PNG paneli cache'owane na dysku pod hashem danych panelu - wynik zmienia się
+  tylko razem z wersją danych, więc ponowne uruchomienie nie rysuje od nowa
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Powyżej tylu punktów wykres punktowy jest zastępowany siatką gęstości
+SCATTER_MAX_POINTS = 50000
+
+# Rozdzielczość siatki gęstości (x, y)
+DENSITY_BINS = (200, 150)
+
+# Rozmiar jednego panelu w calach (siatka 2×3 ma 20×12 cali jak wcześniej)
+PANEL_SIZE = (20 / 3, 6)
+TITLE_HEIGHT = 0.6
+
+REGIONAL_COLUMNS = ['NA_Sales', 'EU_Sales', 'JP_Sales', 'Other_Sales']
+
+# Zmiana wyglądu paneli unieważnia cache
+RENDER_VERSION = 1
+
+
+def _points_or_density(frame, x, y):
+    """Punkty (małe zbiory) albo histogram 2D z logarytmicznymi przedziałami y (duże zbiory)"""
+    frame = frame[[x, y]].dropna()
+    frame = frame[frame[y] > 0]
+    if len(frame) <= SCATTER_MAX_POINTS:
+        return {'points': (frame[x].to_numpy(), frame[y].to_numpy())}
+
+    x_values, y_values = frame[x].to_numpy(), frame[y].to_numpy()
+    x_edges = np.linspace(x_values.min(), x_values.max(), DENSITY_BINS[0] + 1)
+    y_edges = np.geomspace(y_values.min(), y_values.max(), DENSITY_BINS[1] + 1)
+    counts, _, _ = np.histogram2d(x_values, y_values, bins=(x_edges, y_edges))
+    return {'density': (counts.T, x_edges, y_edges), 'n': len(frame)}
+
+
+def panel_data(analyzer):
+    """Zagregowane dane wszystkich paneli, z wyników etapów gdy są dostępne"""
+    df = analyzer.df
+    results = analyzer.results
+    eda = results.get('eda', {})
+
+    counts, edges = np.histogram(df['Global_Sales'].dropna(), bins=50)
+
+    if 'time_series' in results:
+        yearly = results['time_series']['yearly_data'].set_index('Year')['Total_Sales']
+    elif 'basic_stats' in eda:
+        yearly = eda['basic_stats'][('Global_Sales', 'sum')]
+    else:
+        yearly = df.groupby('Year')['Global_Sales'].sum()
+
+    if 'platform_breakdown' in eda:
+        platform_sales = eda['platform_breakdown']
+    else:
+        platform_sales = df.groupby('Platform')['Global_Sales'].sum()
+
+    if 'genre_stats' in eda:
+        genre_data = eda['genre_stats']
+    else:
+        genre_data = df.groupby('Genre').agg({'Global_Sales': ['mean', 'count']}).round(2)
+        genre_data.columns = ['avg_sales', 'count']
+
+    if 'correlations' in eda:
+        corr_matrix = eda['correlations'].loc[REGIONAL_COLUMNS, REGIONAL_COLUMNS]
+    else:
+        corr_matrix = df[REGIONAL_COLUMNS].corr()
+
+    if 'anomaly_detection' in results:
+        anomaly = {
+            'normal': _points_or_density(results['anomaly_detection']['normal_data'], 'Critic_Score', 'Global_Sales'),
+            'anomalies': _points_or_density(results['anomaly_detection']['anomalies'], 'Critic_Score', 'Global_Sales')
+        }
+    else:
+        anomaly = {'all': _points_or_density(df, 'Critic_Score', 'Global_Sales')}
+
+    return {
+        'sales_histogram': {'counts': counts, 'edges': edges},
+        'yearly_trend': {'years': yearly.index.to_numpy(), 'sales': yearly.to_numpy()},
+        'top_platforms': platform_sales.sort_values(ascending=True).tail(10),
+        'genres': genre_data,
+        'regional_correlation': corr_matrix,
+        'anomalies': anomaly
+    }
+
+
+def _setup():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    return plt
+
+
+def _draw_sales_histogram(ax, data):
+    ax.hist(data['edges'][:-1], bins=data['edges'], weights=data['counts'],
+            alpha=0.7, color='skyblue', edgecolor='black')
+    ax.set_title('Rozkład Globalnej Sprzedaży Gier')
+    ax.set_xlabel('Sprzedaż (miliony)')
+    ax.set_ylabel('Liczba gier')
+    ax.set_yscale('log')
+
+
+def _draw_yearly_trend(ax, data):
+    ax.plot(data['years'], data['sales'], marker='o', linewidth=2, markersize=4)
+    ax.set_title('Trendy Sprzedaży w Czasie')
+    ax.set_xlabel('Rok')
+    ax.set_ylabel('Łączna sprzedaż (miliony)')
+    ax.grid(True, alpha=0.3)
+
+
+def _draw_top_platforms(ax, platform_sales):
+    ax.barh(range(len(platform_sales)), platform_sales.values, color='lightcoral')
+    ax.set_yticks(range(len(platform_sales)))
+    ax.set_yticklabels(platform_sales.index)
+    ax.set_title('Top 10 Platform - Łączna Sprzedaż')
+    ax.set_xlabel('Sprzedaż (miliony)')
+
+
+def _draw_genres(ax, genre_data):
+    ax.scatter(genre_data['count'], genre_data['avg_sales'],
+               s=100, alpha=0.7, c=range(len(genre_data)), cmap='viridis')
+    ax.set_title('Gatunki: Liczba Gier vs Średnia Sprzedaż')
+    ax.set_xlabel('Liczba gier')
+    ax.set_ylabel('Średnia sprzedaż (miliony)')
+
+    # Dodaj etykiety gatunków
+    for genre, row in genre_data.iterrows():
+        ax.annotate(genre, (row['count'], row['avg_sales']),
+                    xytext=(5, 5), textcoords='offset points', fontsize=8)
+
+
+def _draw_regional_correlation(ax, corr_matrix):
+    labels = [col.replace('_Sales', '') for col in corr_matrix.columns]
+    ax.imshow(corr_matrix, cmap='coolwarm', vmin=-1, vmax=1)
+    ax.set_title('Korelacje Między Regionami')
+    ax.set_xticks(range(len(labels)))
+    ax.set_yticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    ax.set_yticklabels(labels)
+
+    # Dodaj wartości korelacji
+    for i in range(len(labels)):
+        for j in range(len(labels)):
+            ax.text(j, i, f'{corr_matrix.iloc[i, j]:.2f}', ha='center', va='center', fontweight='bold')
+
+
+def _draw_layer(ax, layer, label, color, cmap, size, marker):
+    """Warstwa punktów albo zrasteryzowanej siatki gęstości (puste komórki przezroczyste)"""
+    from matplotlib.colors import LogNorm
+
+    if 'points' in layer:
+        x, y = layer['points']
+        ax.scatter(x, y, alpha=0.5 if marker == 'o' else 0.8, c=color, label=label, s=size, marker=marker)
+        return
+    counts, x_edges, y_edges = layer['density']
+    ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts, 0), cmap=cmap,
+                  norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)), alpha=0.8, rasterized=True)
+    # Pusty uchwyt, żeby warstwa miała wpis w legendzie
+    ax.scatter([], [], c=color, marker='s', label=f"{label} (gęstość, {layer['n']:,} gier)")
+
+
+def _draw_anomalies(ax, anomaly):
+    if 'all' in anomaly:
+        _draw_layer(ax, anomaly['all'], None, None, 'viridis', 20, 'o')
+        ax.set_title('Critic Score vs Global Sales')
+    else:
+        _draw_layer(ax, anomaly['normal'], 'Normalne', 'blue', 'Blues', 20, 'o')
+        _draw_layer(ax, anomaly['anomalies'], 'Anomalie', 'red', 'Reds', 50, '^')
+        ax.set_title('Wykryte Anomalie')
+        ax.legend()
+    ax.set_xlabel('Critic Score')
+    ax.set_ylabel('Global Sales')
+    ax.set_yscale('log')
+
+
+# Kolejność paneli w siatce 2×3 (wierszami)
+PANELS = {
+    'sales_histogram': _draw_sales_histogram,
+    'yearly_trend': _draw_yearly_trend,
+    'top_platforms': _draw_top_platforms,
+    'genres': _draw_genres,
+    'regional_correlation': _draw_regional_correlation,
+    'anomalies': _draw_anomalies
+}
+
+
+def render_panel(name, data, dpi):
+    """PNG jednego panelu (wywoływane w procesie roboczym)"""
+    plt = _setup()
+    fig, ax = plt.subplots(figsize=PANEL_SIZE)
+    PANELS[name](ax, data)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_title(title, dpi):
+    plt = _setup()
+    fig = plt.figure(figsize=(3 * PANEL_SIZE[0], TITLE_HEIGHT))
+    fig.text(0.5, 0.5, title, ha='center', va='center', fontsize=16, fontweight='bold')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+class FigureRenderer:
+    """Renderuje panele równolegle w procesach i cache'uje PNG pod hashem danych"""
+
+    def __init__(self, dpi=300, n_jobs=None, cache_dir='.figure_cache'):
+        self.dpi = dpi
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, name, payload):
+        digest = hashlib.blake2b(pickle.dumps((name, payload, self.dpi, RENDER_VERSION)), digest_size=16)
+        return os.path.join(self.cache_dir, f'{name}-{digest.hexdigest()}.png')
+
+    def render(self, tasks):
+        """Zwróć PNG dla zadań {nazwa: (funkcja, argumenty)}, z cache lub renderując brakujące"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        images, missing = {}, {}
+        for name, (function, args) in tasks.items():
+            path = self._cache_path(name, args)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    images[name] = f.read()
+            else:
+                missing[name] = (function, args, path)
+
+        if len(missing) > 1 and self.n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(missing))) as pool:
+                futures = {name: pool.submit(function, *args) for name, (function, args, _) in missing.items()}
+                rendered = {name: future.result() for name, future in futures.items()}
+        else:
+            rendered = {name: function(*args) for name, (function, args, _) in missing.items()}
+
+        for name, image in rendered.items():
+            with open(missing[name][2], 'wb') as f:
+                f.write(image)
+        images.update(rendered)
+        return images, sorted(rendered)
+
+    def compose(self, title, panels, path, columns=3):
+        """Złóż tytuł i panele (w kolejności PANELS) w jeden obraz"""
+        from PIL import Image
+
+        tasks = {'title': (render_title, (title, self.dpi))}
+        tasks.update({name: (render_panel, (name, data, self.dpi)) for name, data in panels.items()})
+
+        # Złożony obraz też jest w cache - pod hashem kluczy swoich paneli
+        keys = [self._cache_path(name, args) for name, (_, args) in tasks.items()]
+        composite = self._cache_path('composite', (keys, columns))
+        if os.path.exists(composite):
+            shutil.copyfile(composite, path)
+            return {'path': path, 'rendered': [], 'cached': sorted(tasks)}
+
+        images, rendered = self.render(tasks)
+        decoded = {name: Image.open(io.BytesIO(image)) for name, image in images.items()}
+        width, height = decoded[next(iter(panels))].size
+        rows = -(-len(panels) // columns)
+        title_image = decoded['title']
+        canvas = Image.new('RGB', (columns * width, title_image.height + rows * height), 'white')
+        canvas.paste(title_image, (0, 0))
+        for i, name in enumerate(panels):
+            canvas.paste(decoded[name], ((i % columns) * width, title_image.height + (i // columns) * height))
+        canvas.save(composite, format='png', dpi=(self.dpi, self.dpi))
+        shutil.copyfile(composite, path)
+        return {'path': path, 'rendered': rendered, 'cached': sorted(set(images) - set(rendered))}